@@ -0,0 +1,124 @@
+"""
+Veritas - Analysis Result Cache
+-------------------------------
+In-memory response cache for /analyze_text:
+  - key: (normalized URL, sha256 of page text, corpus index version)
+  - TTL expiry plus LRU eviction beyond max_entries
+  - single-flight: concurrent identical requests share one computation
+  - hit / miss / coalesced / eviction counters for /health
+
+A new corpus index version changes every key, so stale verdicts are never
+served after the corpus is rebuilt; they simply age out of the LRU.
+"""
+
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# ======== CONFIG ========
+CACHE_MAX_ENTRIES = 2048
+CACHE_TTL_S = 6 * 3600
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+
+
+def normalize_url(url):
+    """
+    Canonical form of a page URL: lowercase scheme/host, no fragment, no
+    tracking parameters, sorted query, no trailing slash.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def cache_key(url, text, index_version):
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return (normalize_url(url), digest, index_version)
+
+
+class ResultCache:
+    """
+    TTL + LRU cache of analysis results with single-flight computation.
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl_s=CACHE_TTL_S):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._inflight = {}             # key -> asyncio.Task
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(self, key, compute):
+        """
+        Return (value, cached). `compute` is a zero-argument coroutine
+        function; it runs at most once per key at a time, and only
+        successful results are stored.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value, True
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+
+        # shield: one caller disconnecting must not cancel the shared work.
+        return await asyncio.shield(task), False
+
+    def _finish(self, key, task):
+        self._inflight.pop(key, None)
+        if task.cancelled():
+            return
+        if task.exception() is None:
+            self.put(key, task.result())
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
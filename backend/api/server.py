@@ -0,0 +1,359 @@
+"""
+Veritas - Analysis API
+----------------------
+HTTP backend for the browser extension:
+  POST /analyze_text  {url, title, text}
+    → {verdict: {label, score}, claims: [{label, text, evidence: [{url, source, stance}]}]}
+  GET  /health        models, corpus size, queue depth, latency percentiles
+                      and result-cache counters
+  GET  /metrics       per-stage timings and counters (instrumentation.py)
+                      in Prometheus text format
+
+Identical requests (same normalized URL, page text and corpus version)
+are answered from an in-memory cache (cache.py), and concurrent
+duplicates share a single computation.
+
+Models are warmed at startup and kept in memory (model_registry). Claim
+extraction and matching are CPU-bound, so they run in a bounded thread
+pool: requests beyond the worker count wait in a short queue, and once
+the queue is full the service answers 503 instead of piling up work.
+Each request is capped at REQUEST_TIMEOUT_S (504 when exceeded).
+
+Run from the repository root:
+    python backend/api/server.py --port 8000
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.join(BACKEND_DIR, "claim_extraction"))
+sys.path.append(os.path.join(BACKEND_DIR, "comparison"))
+
+import model_registry as models
+from extract_claims import extract_claims_batch
+from compare_claims import (
+    CLAIM_DIR, MODEL_NAME, ANN_RADIUS, load_all_claims, encode_claims, update_ann_index,
+    annotate_polarity, label_pair,
+)
+from embedding_store import EmbeddingStore, sentence_key, store_lock
+from ann_index import INDEX_PATH
+from cache import ResultCache, cache_key
+from instrumentation import metrics
+
+# ======== CONFIG ========
+HOST = "127.0.0.1"
+PORT = 8000
+WORKERS = 2                 # concurrent inference jobs
+MAX_QUEUE = 8               # jobs allowed to wait for a worker
+REQUEST_TIMEOUT_S = 15.0    # hard per-request limit (504)
+LATENCY_TARGET_MS = 3000    # p95 target reported by /health
+MAX_TEXT_CHARS = 20_000     # page text analyzed per request
+MAX_CLAIMS = 15             # claims returned per page
+EVIDENCE_PER_CLAIM = 4      # popup shows up to 4 sources
+NEIGHBOURS_PER_CLAIM = 32   # ANN neighbours fetched before filtering
+
+
+# ======== CORPUS ========
+
+class Corpus:
+    """
+    Pre-built claim corpus: the IVF index plus claim metadata by sentence key.
+    """
+
+    def __init__(self):
+        self.index = None
+        self.claims_by_key = defaultdict(list)
+        self.version = "empty"
+        # Sentiment labels of corpus sentences, shared by the pool's threads.
+        self.polarity = {}
+        self._polarity_lock = threading.Lock()
+
+    def load(self, index_path=INDEX_PATH):
+        all_claims = load_all_claims() if os.path.isdir(CLAIM_DIR) else []
+        if not all_claims:
+            print("[!] No claims in corpus — every claim will be 'Unknown'.")
+            return self
+
+        # Embeddings come from the persistent store, so this is cheap
+        # after the nightly comparison run has populated it. That run
+        # writes the same store and index, so wait for it to finish.
+        with store_lock(wait_message="⏳ compare_claims is updating the embedding store; waiting..."):
+            store = EmbeddingStore(MODEL_NAME)
+            embeddings, rows = encode_claims(all_claims, store=store)
+            self.index = update_ann_index(all_claims, embeddings, rows, index_path)
+
+        keys = np.array([sentence_key(c["sentence"]) for c in all_claims], dtype="S20")
+        for key, c in zip(keys.tolist(), all_claims):
+            self.claims_by_key[key].append(c)
+        self.version = f"{len(self.index)}-{int(os.path.getmtime(index_path))}"
+        print(f"📚 Corpus ready: {len(all_claims)} claims, index version {self.version}")
+        return self
+
+    def evidence_for(self, claims, exclude_url=""):
+        """
+        For each page claim, return corpus evidence sorted by similarity:
+        [(corpus_claim, similarity, stance)].
+        """
+        if self.index is None or not claims:
+            return [[] for _ in claims]
+
+        embeddings = models.get("embedder").encode(
+            [c["sentence"] for c in claims], convert_to_numpy=True, normalize_embeddings=True
+        )
+        neighbour_rows, neighbour_sims = self.index.search(
+            embeddings, k=NEIGHBOURS_PER_CLAIM, radius=ANN_RADIUS
+        )
+
+        # Corpus claims are shared between requests: annotate copies, and
+        # remember their labels so each sentence is classified once.
+        matches = []
+        for found, sims in zip(neighbour_rows, neighbour_sims):
+            matches.append([
+                (dict(c), float(sim))
+                for key, sim in zip(self.index.keys[found].tolist(), sims.tolist())
+                for c in self.claims_by_key.get(key, ())
+                if not exclude_url or c.get("url") != exclude_url
+            ])
+
+        evidence_claims = [c for m in matches for c, _ in m]
+        with self._polarity_lock:
+            for c in evidence_claims:
+                if c["sentence"] in self.polarity:
+                    c["polarity"] = self.polarity[c["sentence"]]
+        annotate_polarity(list(claims) + evidence_claims)
+        with self._polarity_lock:
+            self.polarity.update((c["sentence"], c["polarity"]) for c in evidence_claims)
+
+        results = []
+        for claim, candidates in zip(claims, matches):
+            evidence, seen_urls = [], set()
+            for c, sim in candidates:
+                stance = label_pair(claim, c, sim)
+                if not stance or c.get("url") in seen_urls:
+                    continue
+                seen_urls.add(c.get("url"))
+                evidence.append((c, sim, stance))
+                if len(evidence) >= EVIDENCE_PER_CLAIM:
+                    break
+            results.append(evidence)
+        return results
+
+
+def overall_verdict(claims):
+    """
+    Most common claim label (ties favour Disputed, then Partial) and the
+    share of page claims that carry it.
+    """
+    counts = Counter(c["label"] for c in claims if c["label"] != "Unknown")
+    if not counts:
+        return {"label": "Unknown", "score": 0.0}
+    label = max(["Disputed", "Partial", "Core"], key=lambda l: counts[l])
+    return {"label": label, "score": round(counts[label] / len(claims), 3)}
+
+
+def analyze(corpus, url, title, text):
+    """
+    Full CPU-bound analysis of one page. Runs in the inference pool.
+    """
+    claims = next(extract_claims_batch([text[:MAX_TEXT_CHARS]]), [])[:MAX_CLAIMS]
+    evidence = corpus.evidence_for(claims, exclude_url=url)
+
+    out = []
+    for claim, matches in zip(claims, evidence):
+        out.append({
+            "label": matches[0][2] if matches else "Unknown",
+            "text": claim["sentence"],
+            "evidence": [
+                {
+                    "url": c.get("url", ""),
+                    "source": c.get("source", ""),
+                    "title": c.get("title", ""),
+                    "stance": stance,
+                    "similarity": round(sim, 3)
+                }
+                for c, sim, stance in matches
+            ]
+        })
+
+    return {"url": url, "title": title, "verdict": overall_verdict(out), "claims": out}
+
+
+# ======== INFERENCE POOL ========
+
+class PoolFull(Exception):
+    pass
+
+
+class InferencePool:
+    """
+    Bounded thread pool for blocking model work, with admission control.
+    Only touched from the event loop thread, so the counter needs no lock.
+
+    A job counts as pending until its worker thread is done with it: a
+    request that times out stops waiting, but the work it started still
+    holds a worker and keeps counting against the limit.
+    """
+
+    def __init__(self, workers=WORKERS, max_queue=MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="veritas-infer")
+
+    def submit(self, fn, *args):
+        if self.pending >= self.workers + self.max_queue:
+            raise PoolFull()
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+
+        def job():
+            try:
+                return fn(*args)
+            finally:
+                self._release_from(loop)
+
+        future = self.executor.submit(job)
+        # A job cancelled before a worker picked it up never runs job().
+        future.add_done_callback(lambda f: f.cancelled() and self._release_from(loop))
+        return asyncio.wrap_future(future, loop=loop)
+
+    def _release_from(self, loop):
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            pass  # loop already closed (shutdown)
+
+    def _release(self):
+        self.pending -= 1
+
+    @property
+    def queued(self):
+        return max(self.pending - self.workers, 0)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class LatencyTracker:
+    """
+    Rolling window of request latencies for /health.
+    """
+
+    def __init__(self, window=1000):
+        self.samples = deque(maxlen=window)
+
+    def record(self, ms):
+        self.samples.append(ms)
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        return round(float(np.percentile(np.fromiter(self.samples, dtype=float), q)), 1)
+
+
+# ======== APP ========
+
+corpus = Corpus()
+pool = InferencePool()
+latency = LatencyTracker()
+cache = ResultCache()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    await loop.run_in_executor(None, models.warm_up, "spacy", "ner", "embedder", "sentiment")
+    await loop.run_in_executor(None, corpus.load)
+    print(f"🔥 Veritas API warm in {time.perf_counter() - started:.1f}s")
+    yield
+    pool.shutdown()
+
+
+app = FastAPI(title="Veritas API", lifespan=lifespan)
+
+
+class AnalyzeRequest(BaseModel):
+    url: str = ""
+    title: str = ""
+    text: str
+
+
+async def run_analysis(req):
+    """
+    Submit one analysis to the inference pool and wait for it.
+    """
+    try:
+        future = pool.submit(analyze, corpus, req.url, req.title, req.text)
+    except PoolFull:
+        raise HTTPException(status_code=503, detail="Veritas is busy, please retry shortly.")
+
+    try:
+        return await asyncio.wait_for(future, timeout=REQUEST_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Analysis timed out.")
+
+
+@app.post("/analyze_text")
+async def analyze_text(req: AnalyzeRequest):
+    started = time.perf_counter()
+    key = cache_key(req.url, req.text, corpus.version)
+    failed = 1
+    try:
+        result, cached = await cache.get_or_compute(key, lambda: run_analysis(req))
+        failed = 0
+    finally:
+        latency.record(1000 * (time.perf_counter() - started))
+        metrics.record("request", time.perf_counter() - started, errors=failed)
+    metrics.cache("request", hits=int(cached), misses=int(not cached))
+
+    return {**result, "cached": cached, "latency_ms": round(1000 * (time.perf_counter() - started), 1)}
+
+
+@app.get("/health")
+async def health():
+    return {
+        "models": models.loaded(),
+        "corpus_version": corpus.version,
+        "workers": pool.workers,
+        "in_flight": pool.pending,
+        "queued": pool.queued,
+        "cache": cache.stats(),
+        "latency_ms": {
+            "p50": latency.percentile(50),
+            "p95": latency.percentile(95),
+            "target_p95": LATENCY_TARGET_MS
+        }
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    lines = [metrics.prometheus()]
+    for name, value in (("in_flight", pool.pending), ("queued", pool.queued),
+                        ("result_cache_entries", cache.stats()["entries"])):
+        lines.append(f"# TYPE veritas_{name} gauge\nveritas_{name} {value}\n")
+    return PlainTextResponse("".join(lines), media_type="text/plain; version=0.0.4")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Veritas analysis API")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,156 @@
+"""
+Veritas - Claim Extraction Manifest
+-----------------------------------
+Remembers what has already been extracted so nightly runs only touch new
+or edited articles:
+  - files:     raw file size/mtime at the last run (unchanged files are
+               skipped without being read)
+  - articles:  content hash (url + text) of every processed article
+  - duplicates: near-duplicate articles (see dedup.py) and the canonical
+               article whose claims they share
+  - meta:      extractor fingerprint (model names + library versions +
+               EXTRACTOR_VERSION); a different fingerprint invalidates
+               everything and the next run recomputes all claims
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+
+from ingestion import article_key
+
+# ======== CONFIG ========
+MANIFEST_PATH = "data/claims/manifest.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    raw_path     TEXT PRIMARY KEY,
+    signature    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS articles (
+    article_key  TEXT PRIMARY KEY,
+    content_hash BLOB NOT NULL,
+    raw_path     TEXT NOT NULL,
+    processed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS duplicates (
+    article_key   TEXT PRIMARY KEY,
+    canonical_key TEXT NOT NULL,
+    source        TEXT,
+    url           TEXT,
+    bias          TEXT,
+    title         TEXT,
+    date          TEXT
+);
+CREATE INDEX IF NOT EXISTS duplicates_canonical_idx ON duplicates (canonical_key);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def content_hash(url, text):
+    h = hashlib.sha1()
+    h.update((url or "").encode("utf-8"))
+    h.update(b"\0")
+    h.update((text or "").encode("utf-8"))
+    return h.digest()
+
+
+def file_signature(path):
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+class ClaimsManifest:
+    """Per-article extraction state. Use from a single thread."""
+
+    def __init__(self, fingerprint, path=MANIFEST_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.fingerprint = fingerprint
+
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+        self.previous_fingerprint = row[0] if row else None
+        if self.previous_fingerprint != fingerprint:
+            self.reset()
+
+    @property
+    def invalidated(self):
+        """True when an earlier manifest was built by a different extractor."""
+        return self.previous_fingerprint not in (None, self.fingerprint)
+
+    def reset(self):
+        """Forget everything: the next run recomputes all claims."""
+        self.db.execute("DELETE FROM files")
+        self.db.execute("DELETE FROM articles")
+        self.db.execute("DELETE FROM duplicates")
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)",
+                        (self.fingerprint,))
+        self.db.commit()
+
+    # ---------- files ----------
+    def file_unchanged(self, raw_path):
+        row = self.db.execute("SELECT signature FROM files WHERE raw_path = ?", (raw_path,)).fetchone()
+        return row is not None and row[0] == file_signature(raw_path)
+
+    def mark_file(self, raw_path):
+        self.db.execute("INSERT OR REPLACE INTO files (raw_path, signature) VALUES (?, ?)",
+                        (raw_path, file_signature(raw_path)))
+        self.db.commit()
+
+    # ---------- articles ----------
+    def is_current(self, key, digest):
+        row = self.db.execute("SELECT content_hash FROM articles WHERE article_key = ?", (key,)).fetchone()
+        return row is not None and row[0] == digest
+
+    def record(self, rows, raw_path):
+        """Store (key, digest) pairs processed from `raw_path`."""
+        now = time.time()
+        self.db.executemany(
+            "INSERT OR REPLACE INTO articles (article_key, content_hash, raw_path, processed_at) "
+            "VALUES (?, ?, ?, ?)",
+            ((key, digest, raw_path, now) for key, digest in rows)
+        )
+        self.db.commit()
+
+    # ---------- near-duplicates ----------
+    def record_duplicates(self, rows):
+        """Store (article, canonical_key) pairs for articles whose claims
+        come from their canonical copy."""
+        self.db.executemany(
+            "INSERT OR REPLACE INTO duplicates (article_key, canonical_key, source, url, bias, title, date) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((article_key(a.url, a.source, a.title), canonical, a.source, a.url, a.bias, a.title,
+              a.published_at) for a, canonical in rows)
+        )
+        self.db.commit()
+
+    def clear_duplicates(self, keys):
+        """Articles extracted on their own are no longer duplicates."""
+        self.db.executemany("DELETE FROM duplicates WHERE article_key = ?", ((k,) for k in keys))
+        self.db.commit()
+
+    def duplicate_groups(self):
+        """Yield {canonical, members: [{source, url, bias, title, date}]}."""
+        group, members = None, []
+        for canonical, *fields in self.db.execute(
+                "SELECT canonical_key, source, url, bias, title, date FROM duplicates "
+                "ORDER BY canonical_key, article_key"):
+            if canonical != group and members:
+                yield {"canonical": group, "members": members}
+                members = []
+            group = canonical
+            members.append(dict(zip(("source", "url", "bias", "title", "date"), fields)))
+        if members:
+            yield {"canonical": group, "members": members}
+
+    def duplicate_count(self):
+        return self.db.execute("SELECT COUNT(*) FROM duplicates").fetchone()[0]
+
+    def article_count(self):
+        return self.db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        self.db.close()
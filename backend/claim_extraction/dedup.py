@@ -0,0 +1,137 @@
+"""
+Veritas - Near-Duplicate Article Detection
+------------------------------------------
+Wire copy (Reuters/AFP) republished by several outlets, or LBC and MTV
+carrying near-identical text, should go through the NLP models once.
+
+  - word 5-gram shingles, hashed with crc32
+  - MinHash signatures (NUM_PERM universal hashes, pure NumPy)
+  - LSH banding: articles sharing any band bucket are candidates,
+    confirmed when the estimated Jaccard similarity >= THRESHOLD
+  - the first article of a group is its canonical copy; later ones point
+    to it (index saved as data/claims/minhash.npz so groups span runs)
+"""
+
+import os
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+# ======== CONFIG ========
+INDEX_PATH = "data/claims/minhash.npz"
+SHINGLE_WORDS = 5
+NUM_PERM = 64
+BANDS = 16                 # NUM_PERM / BANDS rows per band
+THRESHOLD = 0.8            # estimated Jaccard to count as a duplicate
+MIN_WORDS = 30             # shorter texts are never grouped
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(42)
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text, k=SHINGLE_WORDS):
+    """crc32 hashes of the text's lowercase word k-grams (None if too short)."""
+    words = _WORD.findall(text.lower())
+    if len(words) < MIN_WORDS:
+        return None
+    grams = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash(text):
+    """uint32 signature of length NUM_PERM, or None for short texts."""
+    hashes = shingles(text)
+    if hashes is None:
+        return None
+    # (a * x + b) mod p stays below 2^63 for 32-bit x and 31-bit a, b.
+    return ((np.outer(_A, hashes) + _B[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+class LSHIndex:
+    """
+    Banded MinHash index of canonical articles, keyed by article key.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.signatures = np.zeros((0, NUM_PERM), dtype=np.uint32)
+        self._rows = {}
+        self._buckets = defaultdict(list)
+        self._pending = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _band_keys(self, sig):
+        rows = NUM_PERM // BANDS
+        return [(b, sig[b * rows:(b + 1) * rows].tobytes()) for b in range(BANDS)]
+
+    def _signature(self, row):
+        n = len(self.signatures)
+        return self.signatures[row] if row < n else self._pending[row - n]
+
+    def query(self, sig, threshold=THRESHOLD):
+        """Key of the most similar indexed article above threshold, or None."""
+        candidates = {row for band in self._band_keys(sig) for row in self._buckets.get(band, ())}
+        best, best_sim = None, threshold
+        for row in candidates:
+            sim = float(np.mean(self._signature(row) == sig))
+            if sim >= best_sim:
+                best, best_sim = row, sim
+        return None if best is None else self.keys[best]
+
+    def add(self, key, sig):
+        row = self._rows.get(key)
+        if row is not None:
+            # Edited article: re-bucket under its new signature.
+            old = self._signature(row)
+            for band in self._band_keys(old):
+                self._buckets[band].remove(row)
+            if row < len(self.signatures):
+                self.signatures[row] = sig
+            else:
+                self._pending[row - len(self.signatures)] = sig
+        else:
+            row = len(self.keys)
+            self.keys.append(key)
+            self._rows[key] = row
+            self._pending.append(sig)
+        for band in self._band_keys(sig):
+            self._buckets[band].append(row)
+
+    # ======== PERSISTENCE ========
+
+    def _flush(self):
+        if self._pending:
+            self.signatures = np.vstack([self.signatures, np.array(self._pending, dtype=np.uint32)])
+            self._pending = []
+
+    def save(self, path=INDEX_PATH):
+        self._flush()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, keys=np.array(self.keys, dtype=np.str_), signatures=self.signatures,
+                 num_perm=NUM_PERM, bands=BANDS)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_or_create(cls, path=INDEX_PATH):
+        index = cls()
+        if not os.path.exists(path):
+            return index
+        with np.load(path) as data:
+            if int(data["num_perm"]) != NUM_PERM or int(data["bands"]) != BANDS:
+                print(f"[!] MinHash index at {path} uses other parameters — starting fresh.")
+                return index
+            index.keys = data["keys"].tolist()
+            index.signatures = data["signatures"]
+        index._rows = {key: row for row, key in enumerate(index.keys)}
+        for row, sig in enumerate(index.signatures):
+            for band in index._band_keys(sig):
+                index._buckets[band].append(row)
+        return index
@@ -5,25 +5,56 @@ Extracts structured factual claims from scraped news articles:
   - Splits text into factual sentences
   - Extracts key entities (Who, What, When, Where, How much)
   - Prepares JSON data for Cross-Source Comparison
+
+Input comes from every scraper (RSS, LBC, MTV) through the shared
+ingestion.Article schema, in a single pass.
+
+Articles are streamed through spaCy's nlp.pipe and their candidate
+sentences are sent to the NER pipeline in large batches, then mapped
+back to their articles.
+
+Runs are incremental: claims_manifest.py records a content hash per
+article and the extractor fingerprint, so only new or edited articles
+are processed and their claims merged into the existing claims files.
+Use --force (or change models / EXTRACTOR_VERSION) to recompute all.
+
+Near-duplicate articles (the same wire story on several outlets) are
+grouped by dedup.py before extraction: only the first copy goes through
+the models, the others are listed in duplicate_groups, and
+compare_claims attaches their sources to the shared claims.
 """
 
 import os
-import json
 import re
+import time
+import sys
+import argparse
+from collections import deque
 from datetime import datetime
-import spacy
-from transformers import pipeline
 from tqdm import tqdm
 
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+import model_registry as models
+import storage
+import ingestion
+from ingestion import article_key
+from instrumentation import metrics
+from claims_manifest import ClaimsManifest, content_hash
+from dedup import LSHIndex, minhash
+
 # ======== CONFIG ========
 RAW_DIR = "data/raw"
 SAVE_DIR = "data/claims"
-os.makedirs(SAVE_DIR, exist_ok=True)
+GROUPS_STEM = "duplicate_groups"   # canonical article -> near-duplicate copies
+N_PROCESS = 1            # spaCy worker processes (--workers)
+SPACY_BATCH_SIZE = 64    # articles per nlp.pipe batch
+NER_BATCH_SIZE = 64      # sentences per NER forward pass
+NER_FLUSH_SENTENCES = 2048  # buffered sentences before running NER
+EXTRACTOR_VERSION = 2    # bump when claim logic changes to invalidate the manifest
 
-# ======== MODELS ========
-print("🧠 Loading NLP models...")
-nlp = spacy.load("en_core_web_sm")  # POS tagging, sentence segmentation, dependency parsing
-ner = pipeline("ner", model="dslim/bert-base-NER", aggregation_strategy="simple")
+# Models ("spacy", "ner") are loaded lazily through model_registry.
 
 # ======== HELPERS ========
 
@@ -40,6 +71,15 @@ def extract_entities(sentence: str):
     """
     Extract entities (Who, What, When, Where, How much) using NER.
     """
+    ner = models.get("ner")
+    with models.call_lock("ner"):
+        return group_entities(ner(sentence))
+
+
+def group_entities(results):
+    """
+    Bucket raw NER results into Who / What / When / Where / How much.
+    """
     entities = {
         "WHO": [],
         "WHAT": [],
@@ -48,7 +88,6 @@ def extract_entities(sentence: str):
         "HOW_MUCH": []
     }
 
-    results = ner(sentence)
     for r in results:
         label = r["entity_group"]
         text = r["word"]
@@ -71,70 +110,287 @@ def extract_entities(sentence: str):
     return entities
 
 
-def extract_claims_from_text(text: str):
+def candidate_sentences(doc):
     """
-    Split article into sentences and extract structured factual claims.
+    Cleaned sentences of a parsed doc that are long enough to hold a claim.
     """
-    doc = nlp(text)
-    claims = []
-
     for sent in doc.sents:
         sentence = clean_sentence(sent.text)
         if len(sentence.split()) < 6:  # ignore very short sentences
             continue
+        yield sentence
 
-        entities = extract_entities(sentence)
-        total_entities = sum(len(v) for v in entities.values())
-
-        # Only keep sentences with enough factual info
-        if total_entities >= 2:
-            claims.append({
-                "sentence": sentence,
-                "entities": list(set(
-                    entities["WHO"] + entities["WHAT"] + entities["WHEN"] + entities["WHERE"] + entities["HOW_MUCH"]
-                )),
-                "structure": entities
-            })
+
+def build_claim(sentence: str, entities):
+    """
+    Turn a sentence and its grouped entities into a claim, or None if it
+    doesn't carry enough factual info.
+    """
+    total_entities = sum(len(v) for v in entities.values())
+
+    # Only keep sentences with enough factual info
+    if total_entities >= 2:
+        return {
+            "sentence": sentence,
+            "entities": list(set(
+                entities["WHO"] + entities["WHAT"] + entities["WHEN"] + entities["WHERE"] + entities["HOW_MUCH"]
+            )),
+            "structure": entities
+        }
+    return None
+
+
+def extract_claims_from_text(text: str):
+    """
+    Split article into sentences and extract structured factual claims.
+    """
+    doc = models.get("spacy")(text)
+    claims = []
+
+    for sentence in candidate_sentences(doc):
+        claim = build_claim(sentence, extract_entities(sentence))
+        if claim:
+            claims.append(claim)
     return claims
 
 
+def _claims_for_pending(pending, ner_batch_size):
+    """
+    Run NER over every buffered sentence at once and yield each article's
+    claims in input order.
+    """
+    flat = [s for sentences in pending for s in sentences]
+    ner = models.get("ner")
+    with metrics.stage("ner", items=len(flat)), models.call_lock("ner"):
+        results = iter(ner(flat, batch_size=ner_batch_size) if flat else [])
+    for sentences in pending:
+        claims = []
+        for sentence in sentences:
+            claim = build_claim(sentence, group_entities(next(results)))
+            if claim:
+                claims.append(claim)
+        yield claims
+
+
+def extract_claims_batch(texts, n_process=N_PROCESS, batch_size=SPACY_BATCH_SIZE,
+                         ner_batch_size=NER_BATCH_SIZE, flush_sentences=NER_FLUSH_SENTENCES):
+    """
+    Batched equivalent of extract_claims_from_text over an iterable of texts.
+
+    Texts are streamed through nlp.pipe; candidate sentences from many
+    articles are buffered and sent to NER together. Yields one claims list
+    per input text, in order.
+    """
+    pending = []
+    buffered = 0
+    nlp = models.get("spacy")
+    # "sentences" is the time spent waiting on nlp.pipe, which includes
+    # pulling the next input texts.
+    for doc in metrics.timed_iter("sentences", nlp.pipe(texts, n_process=n_process, batch_size=batch_size)):
+        sentences = list(candidate_sentences(doc))
+        pending.append(sentences)
+        buffered += len(sentences)
+        if buffered >= flush_sentences:
+            yield from _claims_for_pending(pending, ner_batch_size)
+            pending, buffered = [], 0
+    if pending:
+        yield from _claims_for_pending(pending, ner_batch_size)
+
+
 # ======== MAIN PIPELINE ========
 
-def process_articles():
-    print("🚀 Starting claim extraction...")
-    for file in os.listdir(RAW_DIR):
-        if not file.endswith(".json"):
-            continue
+def extractor_fingerprint():
+    return f"{models.fingerprint('spacy', 'ner')};extractor:{EXTRACTOR_VERSION}"
+
+
+def claims_stem(path):
+    return f"claims_{storage.stem_of(path)}"
+
+
+def existing_claims_file(stem):
+    """Current file for a claims stem, in whatever format it was written."""
+    for p in storage.list_record_files(SAVE_DIR, stem):
+        if storage.stem_of(p) == stem:
+            return p
+    return None
+
 
-        path = os.path.join(RAW_DIR, file)
-        with open(path, "r", encoding="utf-8") as f:
-            articles = json.load(f)
+def process_file(path, kind="rss", n_process=N_PROCESS, fmt=None, manifest=None, dedup_index=None,
+                 languages=None):
+    """
+    Stream one scraper output file (`kind` selects the ingestion adapter)
+    through extraction into claims_<stem>. Articles are read, processed and
+    written one at a time, so memory stays flat however large the file is.
 
-        processed_articles = []
+    With a manifest, articles whose content hash is already recorded are
+    skipped, and claims of untouched articles are carried over from the
+    existing claims file. With a dedup index, near-duplicates of an
+    already-indexed article are recorded in the manifest instead of being
+    extracted. `languages` drops articles in other languages (langfilter).
+    Returns a dict of counts and the save path.
+    """
+    stem = claims_stem(path)
+    save_path = storage.path_for(SAVE_DIR, stem, fmt)
+    old_path = existing_claims_file(stem)
+    # Articles handed to nlp.pipe but not yet matched to a result.
+    in_flight = deque()
+    duplicates = []
+    stats = {"processed": 0, "unchanged": 0, "duplicates": 0,
+             "processed_chars": 0, "duplicate_chars": 0}
 
-        for a in tqdm(articles, desc=f"Processing {file}"):
-            text = a.get("text", "")
-            if not text.strip():
+    def texts():
+        for a in ingestion.iter_source(path, kind, languages):
+            if not a.text.strip():
                 continue
+            key, digest = article_key(a.url, a.source, a.title), content_hash(a.url, a.text)
+            if manifest is not None and manifest.is_current(key, digest):
+                stats["unchanged"] += 1
+                continue
+            if dedup_index is not None:
+                sig = minhash(a.text)
+                if sig is not None:
+                    canonical = dedup_index.query(sig)
+                    if canonical is not None and canonical != key:
+                        duplicates.append((a, key, digest, canonical))
+                        stats["duplicate_chars"] += len(a.text)
+                        continue
+                    dedup_index.add(key, sig)
+            in_flight.append((a, key, digest))
+            stats["processed_chars"] += len(a.text)
+            yield a.text
 
-            claims = extract_claims_from_text(text)
+    done = []
+    writer = storage.RecordWriter(save_path, schema="claims")
+    try:
+        results = extract_claims_batch(texts(), n_process=n_process)
+        for claims in tqdm(results, desc=f"Processing {os.path.basename(path)}"):
+            a, key, digest = in_flight.popleft()
+            done.append((key, digest))
             if claims:
-                processed_articles.append({
-                    "source": a["source"],
-                    "bias": a["bias"],
-                    "title": a["title"],
-                    "url": a["url"],
-                    "date": a.get("date", ""),
+                writer.write({
+                    "source": a.source,
+                    "bias": a.bias,
+                    "title": a.title,
+                    "url": a.url,
+                    "date": a.published_at or "",
                     "claims": claims
                 })
 
-        # Save extracted claims
-        save_path = os.path.join(SAVE_DIR, f"claims_{file}")
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(processed_articles, f, ensure_ascii=False, indent=2)
+        # Merge: keep the previous claims of every article not redone
+        # (articles that became duplicates now share their canonical's).
+        redone = {key for key, _ in done} | {key for _, key, _, _ in duplicates}
+        if redone and old_path:
+            writer.write_many(
+                r for r in storage.iter_records(old_path)
+                if article_key(r.get("url"), r.get("source"), r.get("title")) not in redone
+            )
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+    if redone and old_path and (old_path != save_path or not writer.count):
+        os.remove(old_path)
+    if dedup_index is not None and done:
+        # Saved before the manifest marks these articles current: a run that
+        # dies later must not skip them without their signatures indexed.
+        dedup_index.save()
+    if manifest is not None:
+        manifest.record(done + [(key, digest) for _, key, digest, _ in duplicates], path)
+        manifest.clear_duplicates(key for key, _ in done)
+        manifest.record_duplicates((a, canonical) for a, _, _, canonical in duplicates)
+        manifest.mark_file(path)
+    stats.update(processed=len(done), duplicates=len(duplicates), saved=writer.count, save_path=save_path)
+    metrics.cache("manifest", hits=stats["unchanged"], misses=len(done) + len(duplicates))
+    metrics.cache("dedup", hits=len(duplicates), misses=len(done))
+    return stats
+
+
+def write_duplicate_groups(manifest, fmt=None):
+    """Export the manifest's duplicate groups for compare_claims."""
+    path = storage.path_for(SAVE_DIR, GROUPS_STEM, fmt)
+    count = storage.write_records(path, manifest.duplicate_groups(), fmt, schema="duplicate_groups")
+    for p in storage.list_record_files(SAVE_DIR, GROUPS_STEM):
+        if storage.stem_of(p) == GROUPS_STEM and (p != path or not count):
+            os.remove(p)
+    return count, path
+
+
+def process_articles(n_process=N_PROCESS, fmt=None, force=False, dedup=True, languages=None):
+    print("🚀 Starting claim extraction...")
+    os.makedirs(SAVE_DIR, exist_ok=True)
+    manifest = ClaimsManifest(extractor_fingerprint())
+    if force:
+        manifest.reset()
+        print("♻️  --force: recomputing claims for every article.")
+    elif manifest.invalidated:
+        print("♻️  Extractor models changed since the last run: recomputing all claims.")
+    dedup_index = None
+    if dedup:
+        # A reset manifest forgot every group, so the index starts over too.
+        dedup_index = LSHIndex() if force or manifest.invalidated else LSHIndex.load_or_create()
+
+    totals = {"processed": 0, "unchanged": 0, "duplicates": 0, "processed_chars": 0, "duplicate_chars": 0}
+    skipped_files = 0
+    extract_seconds = 0.0
+    started = time.perf_counter()
+
+    try:
+        for path, kind in ingestion.input_files(raw_dir=RAW_DIR):
+            if manifest.file_unchanged(path):
+                skipped_files += 1
+                continue
+
+            file_started = time.perf_counter()
+            stats = process_file(path, kind, n_process, fmt, manifest, dedup_index, languages)
+            elapsed = time.perf_counter() - file_started
+            extract_seconds += elapsed
+            for k in totals:
+                totals[k] += stats[k]
+
+            if stats["processed"] or stats["duplicates"]:
+                print(f"✅ Saved {stats['saved']} processed articles → {stats['save_path']} "
+                      f"({stats['processed']} new/changed, {stats['duplicates']} near-duplicates, "
+                      f"{stats['unchanged']} unchanged, "
+                      f"{stats['processed'] / max(elapsed, 1e-9):.1f} articles/sec)")
+        if dedup_index is not None:
+            dedup_index.save()
+        groups, groups_path = write_duplicate_groups(manifest, fmt)
+        if groups:
+            print(f"🔗 {manifest.duplicate_count()} near-duplicate articles in {groups} groups → {groups_path}")
+    finally:
+        manifest.close()
+        metrics.count("articles_extracted", totals["processed"])
+        metrics.count("files_unchanged", skipped_files)
+        print(f"📊 Run report: {metrics.write_report(SAVE_DIR, 'extract_claims', workers=n_process)}")
 
-        print(f"✅ Saved {len(processed_articles)} processed articles → {save_path}")
+    elapsed = time.perf_counter() - started
+    processed, duplicates = totals["processed"], totals["duplicates"]
+    print(f"⏱  {processed} articles extracted in {elapsed:.1f}s "
+          f"({processed / max(elapsed, 1e-9):.1f} articles/sec, {n_process} worker(s)); "
+          f"{totals['unchanged']} unchanged articles and {skipped_files} unchanged files skipped.")
+    if duplicates:
+        # Extraction time scales with text length, so estimate the saving
+        # from the characters this run actually pushed through the models.
+        per_char = extract_seconds / max(totals["processed_chars"], 1)
+        print(f"🧬 Dedup ratio {duplicates / (processed + duplicates):.1%}: {duplicates} of "
+              f"{processed + duplicates} articles shared claims with a near-duplicate "
+              f"({totals['duplicate_chars'] / 1e6:.2f}M chars, ~{per_char * totals['duplicate_chars']:.1f}s "
+              f"of extraction saved).")
 
 
 if __name__ == "__main__":
-    process_articles()
+    parser = argparse.ArgumentParser(description="Veritas claim extraction")
+    parser.add_argument("--workers", type=int, default=N_PROCESS,
+                        help="spaCy worker processes for nlp.pipe")
+    parser.add_argument("--format", choices=sorted(storage.EXTENSIONS), default=None,
+                        help="claims file format (default: storage.DEFAULT_FORMAT)")
+    parser.add_argument("--force", action="store_true",
+                        help="ignore the manifest and recompute claims for every article")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="extract every article, even near-duplicates of one already seen")
+    parser.add_argument("--languages", nargs="+", metavar="LANG",
+                        help="only extract articles in these languages, e.g. --languages en")
+    args = parser.parse_args()
+    process_articles(n_process=args.workers, fmt=args.format, force=args.force, dedup=not args.no_dedup,
+                     languages=args.languages)
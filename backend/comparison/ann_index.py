@@ -0,0 +1,281 @@
+"""
+Veritas - Approximate Nearest-Neighbour Index
+---------------------------------------------
+Pure NumPy IVF (inverted file) index over normalized claim embeddings:
+  - spherical k-means coarse quantizer trained on a sample
+  - vectors stored contiguously, grouped by their nearest centroid
+  - top-k / radius queries probe only the `nprobe` closest lists
+  - incremental inserts keyed by sentence sha1 (see embedding_store)
+  - saved as a single .npz under data/index/
+
+Run directly to benchmark recall against exhaustive search on a sample
+of the embedding store:
+    python backend/comparison/ann_index.py --sample 2000 --k 10
+"""
+
+import os
+import time
+import hashlib
+import argparse
+import numpy as np
+
+# ======== CONFIG ========
+INDEX_PATH = "data/index/claims_ivf.npz"
+DEFAULT_NPROBE = 8
+KMEANS_ITERS = 15
+TRAIN_SAMPLE = 50_000
+RETRAIN_GROWTH = 4  # retrain once the index is this many times its training size
+
+
+def _normalize(x):
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+def spherical_kmeans(vectors, n_lists, iters=KMEANS_ITERS, seed=0):
+    """
+    Cosine k-means: returns n_lists normalized centroids.
+    """
+    rng = np.random.default_rng(seed)
+    n_lists = min(n_lists, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        empty = np.bincount(assign, minlength=n_lists) == 0
+        # Re-seed empty lists with random points so every list stays usable.
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file ANN index over unit vectors (inner product = cosine).
+    """
+
+    def __init__(self, dim, n_lists=None):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.centroids = None
+        self.trained_size = 0
+        self.keys = np.zeros(0, dtype="S20")
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.list_ids = np.zeros(0, dtype=np.int32)
+        self._build_lists()
+
+    def __len__(self):
+        return len(self.keys)
+
+    # ======== BUILD ========
+
+    def _build_lists(self):
+        """
+        Sort rows by list so each inverted list is a contiguous slice.
+        """
+        n_lists = 0 if self.centroids is None else len(self.centroids)
+        self._order = np.argsort(self.list_ids, kind="stable")
+        counts = np.bincount(self.list_ids, minlength=n_lists)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._sorted_vectors = self.vectors[self._order]
+        self._key_order = np.argsort(self.keys, kind="stable")
+
+    def train(self, vectors, n_lists=None, seed=0):
+        vectors = _normalize(vectors)
+        if n_lists is None:
+            n_lists = self.n_lists or max(1, int(np.sqrt(len(vectors))))
+        sample = vectors
+        if len(vectors) > TRAIN_SAMPLE:
+            rng = np.random.default_rng(seed)
+            sample = vectors[rng.choice(len(vectors), TRAIN_SAMPLE, replace=False)]
+        self.centroids = spherical_kmeans(sample, n_lists, seed=seed)
+        self.n_lists = len(self.centroids)
+        self.trained_size = len(vectors)
+        if len(self.vectors):
+            self.list_ids = self._assign(self.vectors)
+        self._build_lists()
+
+    def needs_training(self):
+        return self.centroids is None or len(self) > RETRAIN_GROWTH * max(self.trained_size, 1)
+
+    def _assign(self, vectors):
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), 65536):
+            block = vectors[start:start + 65536]
+            out[start:start + 65536] = np.argmax(block @ self.centroids.T, axis=1)
+        return out
+
+    def contains(self, keys):
+        """
+        Boolean mask of which keys are already indexed.
+        """
+        keys = np.asarray(keys, dtype="S20")
+        if not len(self):
+            return np.zeros(len(keys), dtype=bool)
+        sorted_keys = self.keys[self._key_order]
+        pos = np.minimum(np.searchsorted(sorted_keys, keys), len(self) - 1)
+        return sorted_keys[pos] == keys
+
+    def add(self, keys, vectors):
+        """
+        Insert vectors whose keys are not indexed yet. Returns how many were
+        added. Trains the quantizer on first use.
+        """
+        keys = np.asarray(keys, dtype="S20")
+        vectors = _normalize(vectors)
+        # Drop keys already indexed, and duplicates within this batch.
+        keys, first = np.unique(keys, return_index=True)
+        vectors = vectors[first]
+        new = ~self.contains(keys)
+        if not new.any():
+            return 0
+        keys, vectors = keys[new], vectors[new]
+
+        if self.centroids is None:
+            self.train(vectors)
+        self.keys = np.concatenate([self.keys, keys])
+        self.vectors = np.concatenate([self.vectors, vectors])
+        self.list_ids = np.concatenate([self.list_ids, self._assign(vectors)])
+        if self.needs_training():
+            self.train(self.vectors, n_lists=max(1, int(np.sqrt(len(self)))))
+        else:
+            self._build_lists()
+        return len(keys)
+
+    # ======== QUERY ========
+
+    def search(self, queries, k=10, nprobe=DEFAULT_NPROBE, radius=None):
+        """
+        Return (rows, sims) for each query: index rows of the best k
+        neighbours (descending similarity), optionally restricted to
+        similarity >= radius. Rows are positions in self.keys.
+        """
+        queries = _normalize(queries)
+        if not len(self):
+            return [np.zeros(0, dtype=np.int64) for _ in queries], [np.zeros(0, dtype=np.float32) for _ in queries]
+
+        nprobe = min(nprobe, self.n_lists)
+        probe = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+
+        out_rows, out_sims = [], []
+        for q, lists in zip(queries, probe):
+            cand = np.concatenate([np.arange(self._offsets[l], self._offsets[l + 1]) for l in lists])
+            sims = self._sorted_vectors[cand] @ q
+            if radius is not None:
+                keep = sims >= radius
+                cand, sims = cand[keep], sims[keep]
+            if len(sims) > k:
+                top = np.argpartition(-sims, k - 1)[:k]
+                cand, sims = cand[top], sims[top]
+            best = np.argsort(-sims, kind="stable")
+            out_rows.append(self._order[cand[best]])
+            out_sims.append(sims[best])
+        return out_rows, out_sims
+
+    # ======== PERSISTENCE ========
+
+    def save(self, path=INDEX_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            dim=self.dim,
+            n_lists=self.n_lists or 0,
+            trained_size=self.trained_size,
+            centroids=self.centroids if self.centroids is not None else np.zeros((0, self.dim), np.float32),
+            keys=self.keys,
+            vectors=self.vectors,
+            list_ids=self.list_ids,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with np.load(path) as data:
+            index = cls(int(data["dim"]), int(data["n_lists"]) or None)
+            if len(data["centroids"]):
+                index.centroids = data["centroids"]
+            index.trained_size = int(data["trained_size"])
+            index.keys = data["keys"]
+            index.vectors = data["vectors"]
+            index.list_ids = data["list_ids"]
+        index._build_lists()
+        return index
+
+    @classmethod
+    def load_or_create(cls, dim, path=INDEX_PATH):
+        if os.path.exists(path):
+            index = cls.load(path)
+            if index.dim == dim:
+                return index
+            print(f"[!] Index at {path} has dim {index.dim}, expected {dim} — rebuilding.")
+        return cls(dim)
+
+
+# ======== BENCHMARK ========
+
+def benchmark_recall(vectors, sample=1000, k=10, nprobe=DEFAULT_NPROBE, seed=0):
+    """
+    Compare IVF top-k against exhaustive search on a random query sample.
+    Returns recall@k and per-query timings.
+    """
+    vectors = _normalize(vectors)
+    rng = np.random.default_rng(seed)
+    keys = np.array([hashlib.sha1(str(i).encode()).digest() for i in range(len(vectors))], dtype="S20")
+
+    t0 = time.perf_counter()
+    index = IVFIndex(vectors.shape[1])
+    index.add(keys, vectors)
+    build_s = time.perf_counter() - t0
+
+    queries = vectors[rng.choice(len(vectors), min(sample, len(vectors)), replace=False)]
+
+    t0 = time.perf_counter()
+    exact = np.argsort(-(queries @ vectors.T), axis=1)[:, :k]
+    exact_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    rows, _ = index.search(queries, k=k, nprobe=nprobe)
+    ann_s = time.perf_counter() - t0
+
+    # Map index rows back to original vector positions.
+    position_of = {key: i for i, key in enumerate(keys.tolist())}
+    position = np.array([position_of[key] for key in index.keys.tolist()])
+    hits = sum(len(set(e.tolist()) & set(position[r].tolist())) for e, r in zip(exact, rows))
+
+    return {
+        "vectors": len(vectors),
+        "queries": len(queries),
+        "k": k,
+        "nprobe": nprobe,
+        "n_lists": index.n_lists,
+        "recall_at_k": round(hits / (len(queries) * k), 4),
+        "build_s": round(build_s, 3),
+        "exact_ms_per_query": round(1000 * exact_s / len(queries), 3),
+        "ann_ms_per_query": round(1000 * ann_s / len(queries), 3),
+    }
+
+
+if __name__ == "__main__":
+    from embedding_store import EmbeddingStore, store_lock
+
+    parser = argparse.ArgumentParser(description="IVF recall-vs-exhaustive benchmark")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--sample", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, DEFAULT_NPROBE, 16])
+    args = parser.parse_args()
+
+    with store_lock(wait_message="⏳ Waiting for another process using the embedding store..."):
+        store = EmbeddingStore(args.model)
+        if not store.count:
+            raise SystemExit("Embedding store is empty — run compare_claims.py first.")
+        vectors = np.asarray(np.memmap(store.vectors_path, dtype=store.dtype, mode="r",
+                                       shape=(store.count, store.dim)), dtype=np.float32)
+
+    print(f"📐 Benchmarking IVF on {store.count} stored embeddings...")
+    for nprobe in args.nprobe:
+        print(benchmark_recall(vectors, sample=args.sample, k=args.k, nprobe=nprobe))
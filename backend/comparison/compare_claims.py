@@ -7,31 +7,46 @@ Compares factual claims extracted from multiple news outlets to detect:
 ⚠ Disputed (contradiction)
 
 Implements:
-  - Entity-based prefiltering
-  - Date-based filtering (±2 days)
-  - Sentence-BERT semantic similarity
+  - Blocked candidate generation (inverted entity index, ±2 day buckets)
+    or approximate nearest-neighbour search (IVF index, see ann_index.py)
+  - Sentence-BERT semantic similarity (one batched encoding pass per run)
   - Sentiment-based contradiction detection
-  - Graph clustering (NetworkX) to group same-event claims
+  - Incremental union-find clustering of same-event claims (event_clusters.py)
 """
 
 import os
-import json
+import sys
+import time
+import argparse
+from collections import defaultdict
 from itertools import combinations
-from sentence_transformers import SentenceTransformer, util
-from transformers import pipeline
-import networkx as nx
+import numpy as np
 from datetime import datetime, timedelta
 from tqdm import tqdm
 
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+import model_registry as models
+import storage
+from ingestion import article_key
+from instrumentation import metrics
+from embedding_store import EmbeddingStore, sentence_key, store_lock
+from ann_index import IVFIndex, INDEX_PATH
+from event_clusters import EventClusters, EVENTS_DB
+
 # ======== CONFIG ========
 CLAIM_DIR = "data/claims"
 SAVE_DIR = "data/events"
-os.makedirs(SAVE_DIR, exist_ok=True)
+MODEL_NAME = models.EMBEDDING_MODEL
+EMBED_BATCH_SIZE = 64      # sentences per SentenceTransformer forward pass
+PAIR_CHUNK_SIZE = 50_000   # candidate pairs scored per NumPy chunk
+ANN_TOP_K = 50             # neighbours requested per sentence in ANN mode
+ANN_RADIUS = 0.6           # lowest similarity any label can use (Disputed)
+SENTIMENT_BATCH_SIZE = 32  # sentences per sentiment pipeline call
+SENTIMENT_MAX_TOKENS = 512 # truncation length for the sentiment model
 
-# ======== MODELS ========
-print("🧠 Loading models...")
-model = SentenceTransformer("all-MiniLM-L6-v2")
-sentiment_model = pipeline("sentiment-analysis")
+# Models ("embedder", "sentiment") are loaded lazily through model_registry.
 
 # ======== HELPERS ========
 
@@ -70,30 +85,285 @@ def same_topic(c1, c2):
     return len(set1.intersection(set2)) >= 1
 
 
+def build_entity_index(all_claims):
+    """
+    Build an inverted index: lowercased entity -> {day ordinal -> [claim ids]}.
+    Claims without a parseable date go into the None bucket of each entity.
+    """
+    index = defaultdict(lambda: defaultdict(list))
+    days_of = []
+    for i, c in enumerate(all_claims):
+        d = parse_date(c.get("date", ""))
+        days_of.append(d)
+        day = d.toordinal() if d else None
+        for ent in set(map(str.lower, c.get("entities", []))):
+            index[ent][day].append(i)
+    return index, days_of
+
+
+def generate_candidate_pairs(all_claims, days=2, stats=None):
+    """
+    Yield (i, j) index pairs (i < j) of cross-source claims that share at least
+    one entity and fall within ±days of each other.
+
+    Only the postings of the claim's own entities and neighbouring day buckets
+    are visited, so work and memory follow the number of real candidates
+    instead of n². Per-stage counts are accumulated into `stats` if given.
+    """
+    if stats is None:
+        stats = {}
+    n = len(all_claims)
+    stats["blocking"] = "entity"
+    stats["window_days"] = days
+    stats["total_pairs"] = n * (n - 1) // 2
+    stats["blocked_pairs"] = 0
+    stats["same_source_pairs"] = 0
+    stats["out_of_window_pairs"] = 0
+    stats["candidate_pairs"] = 0
+
+    index, dates = build_entity_index(all_claims)
+    # Day ordinals are a superset of the window; the exact check below keeps
+    # the same semantics as same_time_window().
+    reach = days + 1
+
+    for i, c1 in enumerate(all_claims):
+        d1 = dates[i]
+        seen = set()
+        for ent in set(map(str.lower, c1.get("entities", []))):
+            buckets = index[ent]
+            if d1 is None:
+                postings = buckets.values()
+            else:
+                day = d1.toordinal()
+                postings = [buckets.get(k, ()) for k in range(day - reach, day + reach + 1)]
+                postings.append(buckets.get(None, ()))
+            for ids in postings:
+                for j in ids:
+                    if j > i:
+                        seen.add(j)
+
+        for j in sorted(seen):
+            stats["blocked_pairs"] += 1
+            c2 = all_claims[j]
+            if c1["source"] == c2["source"]:
+                stats["same_source_pairs"] += 1
+                continue
+            d2 = dates[j]
+            if d1 and d2 and abs((d1 - d2).days) > days:
+                stats["out_of_window_pairs"] += 1
+                continue
+            stats["candidate_pairs"] += 1
+            yield i, j
+
+
+def reference_candidate_pairs(all_claims, days=2):
+    """
+    The original all-pairs filter (same_topic + same_time_window over every
+    cross-source pair), for checking generate_candidate_pairs against.
+    """
+    for (i, c1), (j, c2) in combinations(enumerate(all_claims), 2):
+        if c1["source"] == c2["source"]:
+            continue
+        if same_topic(c1, c2) and same_time_window(c1, c2, days):
+            yield i, j
+
+
+def generate_ann_pairs(all_claims, embeddings, rows, index, k=ANN_TOP_K,
+                       radius=ANN_RADIUS, days=2, stats=None):
+    """
+    Yield (i, j) claim pairs (i < j) whose sentences are ANN neighbours
+    (similarity >= radius), across sources and within ±days.
+
+    Unlike entity blocking this also catches paraphrases with different
+    entity surface forms. `index` must already contain every sentence.
+    """
+    if stats is None:
+        stats = {}
+    n = len(all_claims)
+    stats["blocking"] = "ann"
+    stats["window_days"] = days
+    stats["total_pairs"] = n * (n - 1) // 2
+    stats["blocked_pairs"] = 0
+    stats["same_source_pairs"] = 0
+    stats["out_of_window_pairs"] = 0
+    stats["candidate_pairs"] = 0
+
+    sentences = [None] * len(embeddings)
+    claims_of = defaultdict(list)
+    for i, (c, r) in enumerate(zip(all_claims, rows.tolist())):
+        sentences[r] = c["sentence"]
+        claims_of[r].append(i)
+    dates = [parse_date(c.get("date", "")) for c in all_claims]
+
+    # Index rows -> rows of this run's embedding matrix (-1 if not loaded now).
+    # Round-trip through an S20 array so digests compare the way numpy
+    # stores them (trailing NUL bytes stripped).
+    local_keys = np.array([sentence_key(s) for s in sentences], dtype="S20")
+    row_of_key = {key: u for u, key in enumerate(local_keys.tolist())}
+    to_local = np.array([row_of_key.get(key, -1) for key in index.keys.tolist()], dtype=np.int64)
+
+    seen = set()
+    for start in range(0, len(embeddings), 1024):
+        neighbours, _ = index.search(embeddings[start:start + 1024], k=k, radius=radius)
+        for offset, found in enumerate(neighbours):
+            u = start + offset
+            for v in to_local[found].tolist():
+                if v < 0:
+                    continue
+                a, b = min(u, v), max(u, v)
+                if (a, b) in seen:
+                    continue
+                seen.add((a, b))
+
+                for x in claims_of[a]:
+                    for y in claims_of[b]:
+                        if x == y or (a == b and x > y):
+                            continue
+                        i, j = min(x, y), max(x, y)
+                        stats["blocked_pairs"] += 1
+                        if all_claims[i]["source"] == all_claims[j]["source"]:
+                            stats["same_source_pairs"] += 1
+                            continue
+                        d1, d2 = dates[i], dates[j]
+                        if d1 and d2 and abs((d1 - d2).days) > days:
+                            stats["out_of_window_pairs"] += 1
+                            continue
+                        stats["candidate_pairs"] += 1
+                        yield i, j
+
+
+def update_ann_index(all_claims, embeddings, rows, index_path=INDEX_PATH):
+    """
+    Insert this run's sentences into the persistent IVF index and save it.
+    """
+    index = IVFIndex.load_or_create(embeddings.shape[1], index_path)
+    keys = np.empty(len(embeddings), dtype="S20")
+    for c, r in zip(all_claims, rows.tolist()):
+        keys[r] = sentence_key(c["sentence"])
+    added = index.add(keys, embeddings)
+    index.save(index_path)
+    print(f"🗂  ANN index: {len(index)} sentences ({added} new), {index.n_lists} lists → {index_path}")
+    return index
+
+
+def encode_claims(all_claims, batch_size=EMBED_BATCH_SIZE, store=None):
+    """
+    Batch-encode every unique claim sentence exactly once.
+
+    Returns (embeddings, rows): a normalized float32 matrix with one row per
+    unique sentence, and an int array mapping claim index -> matrix row.
+    With an EmbeddingStore, only sentences missing from the store are encoded.
+    """
+    row_of = {}
+    rows = np.empty(len(all_claims), dtype=np.int64)
+    for i, c in enumerate(all_claims):
+        rows[i] = row_of.setdefault(c["sentence"], len(row_of))
+
+    sentences = list(row_of)
+    if not sentences:
+        return np.zeros((0, 0), dtype=np.float32), rows
+
+    def encode(batch):
+        print(f"🧮 Encoding {len(batch)} sentences ({len(all_claims)} claims)...")
+        with metrics.stage("embed", items=len(batch)):
+            return models.get("embedder").encode(
+                batch,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=True,
+            )
+
+    if store is not None:
+        hits, misses = store.hits, store.misses
+        embeddings = store.get_or_encode(sentences, encode)
+        store.save()
+        metrics.cache("embed", hits=store.hits - hits, misses=store.misses - misses)
+    else:
+        embeddings = encode(sentences)
+    return np.asarray(embeddings, dtype=np.float32), rows
+
+
+def iter_pair_chunks(pairs, chunk_size=PAIR_CHUNK_SIZE):
+    """
+    Group an (i, j) pair stream into NumPy index arrays of at most chunk_size.
+    """
+    left, right = [], []
+    for i, j in pairs:
+        left.append(i)
+        right.append(j)
+        if len(left) >= chunk_size:
+            yield np.array(left, dtype=np.int64), np.array(right, dtype=np.int64)
+            left, right = [], []
+    if left:
+        yield np.array(left, dtype=np.int64), np.array(right, dtype=np.int64)
+
+
+def pair_similarities(embeddings, rows, left, right):
+    """
+    Cosine similarity for each (left[k], right[k]) claim pair. Rows are
+    normalized, so this is a row-wise dot product.
+    """
+    return np.einsum("ij,ij->i", embeddings[rows[left]], embeddings[rows[right]])
+
+
 def sentiment_polarity(sentence):
     """
     Get sentiment label: POSITIVE, NEGATIVE, or NEUTRAL
     """
     try:
-        res = sentiment_model(sentence[:512])[0]
+        sentiment_model = models.get("sentiment")
+        with models.call_lock("sentiment"):
+            res = sentiment_model(sentence[:512])[0]
         return res["label"]
     except Exception:
         return "NEUTRAL"
 
 
+def annotate_polarity(claims, batch_size=SENTIMENT_BATCH_SIZE, max_tokens=SENTIMENT_MAX_TOKENS):
+    """
+    Classify each unique sentence once, in batches, and store the label on
+    every claim as claim["polarity"]. Returns the number of unique sentences.
+    """
+    sentences = list(dict.fromkeys(c["sentence"] for c in claims if "polarity" not in c))
+    polarity = {}
+    if not sentences:
+        return 0
+    sentiment_model = models.get("sentiment")
+    for start in tqdm(range(0, len(sentences), batch_size), desc="Sentiment", unit="batch"):
+        batch = sentences[start:start + batch_size]
+        try:
+            with metrics.stage("sentiment", items=len(batch)), models.call_lock("sentiment"):
+                results = sentiment_model(batch, batch_size=batch_size,
+                                          truncation=True, max_length=max_tokens)
+            labels = [r["label"] for r in results]
+        except Exception:
+            labels = [sentiment_polarity(s) for s in batch]
+        polarity.update(zip(batch, labels))
+
+    for c in claims:
+        if "polarity" not in c:
+            c["polarity"] = polarity[c["sentence"]]
+    return len(sentences)
+
+
 def detect_contradiction(c1, c2, sim_score):
     """
     Detect potential contradictions between two semantically similar sentences
-    based on polarity differences or negation keywords.
+    based on polarity differences or negation keywords. Uses the precomputed
+    claim["polarity"] when present (see annotate_polarity).
     """
+    if sim_score <= 0.6:
+        return False
+
     neg_words = {"not", "no", "never", "deny", "denied", "rejected", "false"}
     s1, s2 = c1["sentence"].lower(), c2["sentence"].lower()
 
     neg1 = any(w in s1 for w in neg_words)
     neg2 = any(w in s2 for w in neg_words)
 
-    pol1 = sentiment_polarity(c1["sentence"])
-    pol2 = sentiment_polarity(c2["sentence"])
+    pol1 = c1.get("polarity") or sentiment_polarity(c1["sentence"])
+    pol2 = c2.get("polarity") or sentiment_polarity(c2["sentence"])
 
     contradictory = (
         sim_score > 0.6
@@ -102,58 +372,102 @@ def detect_contradiction(c1, c2, sim_score):
     return contradictory
 
 
+def label_pair(c1, c2, sim):
+    """
+    Core / Partial / Disputed label for a scored claim pair, or None.
+    """
+    if detect_contradiction(c1, c2, sim):
+        return "Disputed"
+    if sim > 0.85:
+        return "Core"
+    if sim > 0.65:
+        return "Partial"
+    return None
+
+
+CLAIM_FIELDS = ["source", "title", "url", "date", "claims"]
+GROUPS_PREFIX = "duplicate_groups"   # written by extract_claims (near-duplicate copies)
+
+
+def load_duplicate_groups():
+    """canonical article key -> the near-duplicate copies that share its claims."""
+    return {g["canonical"]: g["members"] for g in storage.iter_dir(CLAIM_DIR, prefix=GROUPS_PREFIX)}
+
+
 def load_all_claims():
     """
-    Load all claim-level data from data/claims/
+    Load all claim-level data from data/claims/. Only the fields used for
+    comparison are read, and files are streamed one article at a time.
+
+    Claims of an article with near-duplicate copies also list every
+    outlet that carried it ("sources", "urls").
     """
     all_claims = []
-    for file in os.listdir(CLAIM_DIR):
-        if file.endswith(".json"):
-            with open(os.path.join(CLAIM_DIR, file), "r", encoding="utf-8") as f:
-                articles = json.load(f)
-                for a in articles:
-                    for c in a.get("claims", []):
-                        all_claims.append({
-                            "source": a["source"],
-                            "title": a["title"],
-                            "sentence": c["sentence"],
-                            "entities": c.get("entities", []),
-                            "date": a.get("date", "")
-                        })
-    print(f"📄 Loaded {len(all_claims)} total claims.")
+    groups = load_duplicate_groups()
+    for a in storage.iter_dir(CLAIM_DIR, prefix="claims_", columns=CLAIM_FIELDS):
+        members = groups.get(article_key(a.get("url"), a.get("source"), a.get("title")), ())
+        sources = list(dict.fromkeys([a["source"]] + [m["source"] for m in members]))
+        urls = [u for u in [a.get("url")] + [m["url"] for m in members] if u]
+        for c in a.get("claims") or []:
+            all_claims.append({
+                "source": a["source"],
+                "sources": sources,
+                "urls": urls,
+                "title": a["title"],
+                "url": a.get("url") or "",
+                "sentence": c["sentence"],
+                "entities": c.get("entities") or [],
+                "date": a.get("date") or ""
+            })
+    print(f"📄 Loaded {len(all_claims)} total claims"
+          f"{f' ({sum(map(len, groups.values()))} near-duplicate articles folded in)' if groups else ''}.")
     return all_claims
 
 
 # ======== MAIN COMPARISON LOGIC ========
 
-def compare_claims(all_claims):
+def compare_claims(all_claims, store=None, candidates="entity", index_path=INDEX_PATH):
     """
     Compare claims pairwise across sources using semantic similarity,
     entity and date filtering.
+
+    candidates="entity" blocks on shared entities; candidates="ann" uses the
+    persistent IVF index, inserting this run's new sentences before querying.
     """
     comparisons = []
-    pairs = list(combinations(all_claims, 2))
-
-    for c1, c2 in tqdm(pairs, desc="Comparing cross-source claims"):
-        if c1["source"] == c2["source"]:
-            continue
-        if not same_topic(c1, c2):
-            continue
-        if not same_time_window(c1, c2, days=2):
-            continue
-
-        emb1 = model.encode(c1["sentence"], convert_to_tensor=True)
-        emb2 = model.encode(c2["sentence"], convert_to_tensor=True)
-        sim = util.cos_sim(emb1, emb2).item()
-
-        label = None
-        if detect_contradiction(c1, c2, sim):
-            label = "Disputed"
-        elif sim > 0.85:
-            label = "Core"
-        elif sim > 0.65:
-            label = "Partial"
-
+    stats = {}
+    embeddings, rows = encode_claims(all_claims, store=store)
+
+    if candidates == "ann" and len(embeddings):
+        index = update_ann_index(all_claims, embeddings, rows, index_path)
+        pairs = generate_ann_pairs(all_claims, embeddings, rows, index, days=2, stats=stats)
+    else:
+        pairs = generate_candidate_pairs(all_claims, days=2, stats=stats)
+    progress = tqdm(desc="Comparing cross-source claims", unit="pair")
+
+    # Pass 1: score every candidate; only pairs above 0.6 can get a label.
+    # Timed as "compare" together with candidate generation, which the
+    # pair generator does lazily inside this loop.
+    t0 = time.perf_counter()
+    similar = []
+    for left, right in iter_pair_chunks(pairs):
+        sims = pair_similarities(embeddings, rows, left, right)
+        progress.update(len(sims))
+        keep = np.flatnonzero(sims > 0.6)
+        similar.extend(zip(left[keep].tolist(), right[keep].tolist(), sims[keep].tolist()))
+
+    progress.close()
+    metrics.record("compare", time.perf_counter() - t0, items=progress.n)
+
+    # Pass 2: sentiment once per unique sentence involved, then label.
+    t0 = time.perf_counter()
+    involved = {k for i, j, _ in similar for k in (i, j)}
+    classified = annotate_polarity([all_claims[k] for k in sorted(involved)])
+    print(f"🎭 Sentiment: {classified} unique sentences in {time.perf_counter() - t0:.1f}s")
+
+    for i, j, sim in similar:
+        c1, c2 = all_claims[i], all_claims[j]
+        label = label_pair(c1, c2, sim)
         if label:
             comparisons.append({
                 "claim1": c1,
@@ -162,60 +476,82 @@ def compare_claims(all_claims):
                 "label": label
             })
 
+    print_pruning_report(stats, len(comparisons))
     print(f"🔎 Found {len(comparisons)} significant cross-source matches.")
     return comparisons
 
 
-# ======== EVENT CLUSTERING ========
-
-def cluster_events(comparisons):
+def print_pruning_report(stats, matches):
     """
-    Build a graph of claims and cluster them into same-event groups.
+    Print how many pairs were dropped at each candidate-generation stage.
     """
-    G = nx.Graph()
+    total = stats.get("total_pairs", 0)
+    not_blocked = total - stats.get("blocked_pairs", 0)
+    candidates = stats.get("candidate_pairs", 0)
+    reason = "not ANN neighbours" if stats.get("blocking") == "ann" else "no shared entity/day"
+    print("✂️  Pair pruning:")
+    print(f"   all pairs:             {total}")
+    print(f"   - {reason}: {not_blocked}")
+    print(f"   - same source:          {stats.get('same_source_pairs', 0)}")
+    print(f"   - outside ±{stats.get('window_days', 2)} days:      {stats.get('out_of_window_pairs', 0)}")
+    print(f"   = compared:             {candidates}")
+    print(f"   - below thresholds:     {candidates - matches}")
 
-    for comp in comparisons:
-        s1 = comp["claim1"]["sentence"]
-        s2 = comp["claim2"]["sentence"]
-        G.add_node(s1, **comp["claim1"])
-        G.add_node(s2, **comp["claim2"])
-        G.add_edge(s1, s2, weight=comp["similarity"], label=comp["label"])
 
-    clusters = list(nx.connected_components(G))
-    events = []
+# ======== EVENT CLUSTERING ========
 
-    for i, cluster in enumerate(clusters, 1):
-        cluster_claims = [G.nodes[n] for n in cluster]
-        edges = [G.edges[e] for e in G.edges(cluster)]
-        avg_sim = sum(e["weight"] for e in edges) / max(len(edges), 1)
-        labels = [e["label"] for e in edges]
-        if not cluster_claims:
-            continue
-        events.append({
-            "event_id": f"event_{i}",
-            "claims": cluster_claims,
-            "average_similarity": round(avg_sim, 3),
-            "dominant_label": max(set(labels), key=labels.count) if labels else "Unknown"
-        })
-
-    print(f"🧩 Formed {len(events)} event clusters.")
+def cluster_events(comparisons, clusters=None):
+    """
+    Merge comparisons into same-event clusters and return the event list.
+    Without a persistent EventClusters, clusters are built from scratch.
+    """
+    if clusters is None:
+        clusters = EventClusters(":memory:")
+    with metrics.stage("cluster", items=len(comparisons)):
+        added = clusters.add(comparisons)
+        events = list(clusters.events())
+    print(f"🧩 {added} new links → {len(events)} event clusters.")
     return events
 
 
 # ======== MAIN PIPELINE ========
 
 def main():
+    parser = argparse.ArgumentParser(description="Veritas cross-source comparison")
+    parser.add_argument("--candidates", choices=["entity", "ann"], default="entity",
+                        help="candidate generation: shared-entity blocking or ANN neighbours")
+    parser.add_argument("--rebuild-events", action="store_true",
+                        help="discard the persisted event clusters and rebuild them from this run")
+    parser.add_argument("--format", choices=sorted(storage.EXTENSIONS), default=None,
+                        help="events file format (default: storage.DEFAULT_FORMAT)")
+    args = parser.parse_args()
+
     print("🚀 Starting Veritas cross-source comparison pipeline...")
+    os.makedirs(SAVE_DIR, exist_ok=True)
     all_claims = load_all_claims()
-    comparisons = compare_claims(all_claims)
-    events = cluster_events(comparisons)
-
-    save_path = os.path.join(SAVE_DIR, "events_clusters.json")
-    with open(save_path, "w", encoding="utf-8") as f:
-        json.dump(events, f, ensure_ascii=False, indent=2)
+    # The API server updates the same store and index when it starts.
+    with store_lock(wait_message="⏳ Waiting for another process using the embedding store..."):
+        store = EmbeddingStore(MODEL_NAME)
+        comparisons = compare_claims(all_claims, store=store, candidates=args.candidates)
+        evicted = store.maybe_compact()
+
+    if args.rebuild_events and os.path.exists(EVENTS_DB):
+        os.remove(EVENTS_DB)
+    clusters = EventClusters(EVENTS_DB)
+    events = cluster_events(comparisons, clusters)
+    updated = clusters.save()
+    clusters.close()
+    print(f"🗂  {updated} events created or updated in {EVENTS_DB}")
+
+    save_path = storage.path_for(SAVE_DIR, "events_clusters", args.format)
+    storage.write_records(save_path, events, schema="events")
 
     print(f"\n✅ Done. Saved {len(events)} clustered events.")
     print(f"📁 Output file: {save_path}")
+    print(f"💾 Embedding cache: {store.hits} hits / {store.misses} misses "
+          f"(hit rate {store.hit_rate:.1%}), {store.count} rows stored, {evicted} evicted.")
+    metrics.count("events_written", len(events))
+    print(f"📊 Run report: {metrics.write_report(SAVE_DIR, 'compare_claims', candidates=args.candidates)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,313 @@
+"""
+Veritas - Embedding Store
+-------------------------
+Content-addressed on-disk cache of sentence embeddings, so a comparison
+run only encodes sentences it has never seen before.
+
+Layout (one directory per model under data/embeddings/):
+  - vectors.bin     raw row-major float32/float16 matrix (memory-mapped)
+  - keys.npy        sha1 digest of each row's sentence (S20, append order)
+  - last_used.npy   run number in which each row was last requested
+  - meta.json       model id, dim, dtype, row count, current run number
+                    and compaction generation
+
+Compaction reorders rows, so it writes a new generation of the three data
+files (vectors.<n>.bin, keys.<n>.npy, last_used.<n>.npy) and switches to it
+by replacing meta.json. A crash at any point leaves meta.json naming one
+complete, consistent generation; leftovers of the other are removed on load.
+
+Lookups go through a sorted copy of the digests (np.searchsorted) rather
+than a Python dict, so the index stays compact for millions of rows.
+
+A store is written by one process at a time: processes that update it
+(and the ANN index built from it) hold store_lock() while they do.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+# ======== CONFIG ========
+STORE_DIR = "data/embeddings"
+MAX_AGE_RUNS = 30          # rows unused for this many runs are stale
+COMPACT_STALE_RATIO = 0.25  # compact once this share of rows is stale
+
+# Data files of any generation, plus their temp files.
+DATA_FILE = re.compile(r"(vectors(\.\d+)?\.bin|(keys|last_used)(\.\d+)?\.npy)(\.tmp)?")
+
+
+@contextmanager
+def store_lock(root=STORE_DIR, wait_message=None):
+    """
+    Exclusive lock on the embedding stores under `root` and the ANN index
+    built from them, across processes. Blocks until it is free, printing
+    `wait_message` first if another process holds it.
+    """
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, ".lock"), "a+b") as f:
+        if not _try_lock(f):
+            if wait_message:
+                print(wait_message)
+            while not _try_lock(f):
+                time.sleep(1.0)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _try_lock(f):
+    try:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def sentence_key(sentence):
+    """
+    sha1 digest of a sentence, used as its content address.
+    """
+    return hashlib.sha1(sentence.encode("utf-8")).digest()
+
+
+class EmbeddingStore:
+    """
+    Persistent embedding cache for a single model, keyed by sentence sha1.
+    """
+
+    def __init__(self, model_name, root=STORE_DIR, dtype="float32"):
+        self.model_name = model_name
+        self.dir = os.path.join(root, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        os.makedirs(self.dir, exist_ok=True)
+
+        self.meta_path = os.path.join(self.dir, "meta.json")
+
+        self.hits = 0
+        self.misses = 0
+
+        meta = {}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+
+        valid = bool(meta) and meta.get("model") == model_name
+        self._set_generation(meta.get("generation", 0) if valid else 0)
+        self._remove_other_generations()
+
+        if valid:
+            self.dtype = np.dtype(meta["dtype"])
+            self.dim = meta["dim"]
+            self.count = meta["count"]
+            self.run = meta["run"] + 1
+            self.keys = np.load(self.keys_path)[:self.count]
+            self.last_used = np.load(self.last_used_path)[:self.count]
+            # Drop rows written after the last successful save (crash recovery).
+            self._truncate_vectors(self.count)
+        else:
+            self.dtype = np.dtype(dtype)
+            self.dim = None
+            self.count = 0
+            self.run = 1
+            self.keys = np.zeros(0, dtype="S20")
+            self.last_used = np.zeros(0, dtype=np.int32)
+            if os.path.exists(self.vectors_path):
+                os.remove(self.vectors_path)
+
+        self._vectors = None
+        self._reindex()
+
+    # ======== INTERNALS ========
+
+    def _data_paths(self, generation):
+        suffix = f".{generation}" if generation else ""
+        return (os.path.join(self.dir, f"vectors{suffix}.bin"),
+                os.path.join(self.dir, f"keys{suffix}.npy"),
+                os.path.join(self.dir, f"last_used{suffix}.npy"))
+
+    def _set_generation(self, generation):
+        self.generation = generation
+        self.vectors_path, self.keys_path, self.last_used_path = self._data_paths(generation)
+
+    def _remove_other_generations(self):
+        current = set(self._data_paths(self.generation))
+        for name in os.listdir(self.dir):
+            path = os.path.join(self.dir, name)
+            if path not in current and DATA_FILE.fullmatch(name):
+                os.remove(path)
+
+    @staticmethod
+    def _save_array(path, array):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+
+    def _truncate_vectors(self, rows):
+        if not os.path.exists(self.vectors_path) or not self.dim:
+            return
+        size = rows * self.dim * self.dtype.itemsize
+        if os.path.getsize(self.vectors_path) > size:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(size)
+
+    def _reindex(self):
+        self._order = np.argsort(self.keys, kind="stable")
+        self._sorted_keys = self.keys[self._order]
+
+    def _open_vectors(self):
+        if self._vectors is None and self.count:
+            self._vectors = np.memmap(
+                self.vectors_path, dtype=self.dtype, mode="r", shape=(self.count, self.dim)
+            )
+        return self._vectors
+
+    def _lookup(self, keys):
+        """
+        Return the row of each key, or -1 where the key is not stored.
+        """
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        if not self.count or not len(keys):
+            return rows
+        pos = np.searchsorted(self._sorted_keys, keys)
+        pos_clipped = np.minimum(pos, self.count - 1)
+        found = self._sorted_keys[pos_clipped] == keys
+        rows[found] = self._order[pos_clipped[found]]
+        return rows
+
+    def _append(self, keys, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype=self.dtype)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        with open(self.vectors_path, "ab") as f:
+            f.write(vectors.tobytes())
+
+        start = self.count
+        self.count += len(keys)
+        self.keys = np.concatenate([self.keys, keys])
+        self.last_used = np.concatenate(
+            [self.last_used, np.full(len(keys), self.run, dtype=np.int32)]
+        )
+        self._vectors = None
+        self._reindex()
+        return np.arange(start, self.count, dtype=np.int64)
+
+    # ======== PUBLIC API ========
+
+    def get_or_encode(self, sentences, encode_fn):
+        """
+        Return a float32 matrix with one row per sentence. Only sentences
+        missing from the store are passed to encode_fn (a list -> matrix
+        callable); their vectors are appended to the store.
+        """
+        keys = np.array([sentence_key(s) for s in sentences], dtype="S20")
+        rows = self._lookup(keys)
+
+        missing = np.flatnonzero(rows < 0)
+        self.hits += len(sentences) - len(missing)
+        self.misses += len(missing)
+
+        if len(missing):
+            encoded = np.asarray(encode_fn([sentences[k] for k in missing]))
+            rows[missing] = self._append(keys[missing], encoded)
+
+        self.last_used[rows] = self.run
+        vectors = self._open_vectors()
+        if vectors is None:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.asarray(vectors[rows], dtype=np.float32)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stale_rows(self, max_age=MAX_AGE_RUNS):
+        return int(np.count_nonzero(self.last_used <= self.run - max_age))
+
+    def compact(self, max_age=MAX_AGE_RUNS):
+        """
+        Rewrite the store without rows unused for more than max_age runs.
+        Returns the number of rows evicted.
+        """
+        keep = np.flatnonzero(self.last_used > self.run - max_age)
+        evicted = self.count - len(keep)
+        if not evicted:
+            return 0
+
+        # Write the next generation beside the current one; it only becomes
+        # live when meta.json names it.
+        vectors = self._open_vectors()
+        old_paths = self._data_paths(self.generation)
+        vectors_path, keys_path, last_used_path = self._data_paths(self.generation + 1)
+        with open(vectors_path, "wb") as f:
+            for start in range(0, len(keep), 65536):
+                f.write(np.ascontiguousarray(vectors[keep[start:start + 65536]]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self._vectors = None
+
+        self.keys = self.keys[keep]
+        self.last_used = self.last_used[keep]
+        self.count = len(keep)
+        self._reindex()
+        self._set_generation(self.generation + 1)
+        self.save()
+        for path in old_paths:
+            if os.path.exists(path):
+                os.remove(path)
+        return evicted
+
+    def maybe_compact(self, max_age=MAX_AGE_RUNS, ratio=COMPACT_STALE_RATIO):
+        """
+        Compact only once enough of the store has gone stale.
+        """
+        if self.count and self.stale_rows(max_age) / self.count >= ratio:
+            return self.compact(max_age)
+        return 0
+
+    def save(self):
+        """
+        Persist the key index and metadata. vectors.bin is already on disk;
+        meta.json is written last so a crash never points past valid rows.
+        """
+        self._save_array(self.keys_path, self.keys)
+        self._save_array(self.last_used_path, self.last_used)
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "model": self.model_name,
+                "dim": self.dim,
+                "dtype": self.dtype.name,
+                "count": self.count,
+                "run": self.run,
+                "generation": self.generation
+            }, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def summary(self):
+        return {
+            "model": self.model_name,
+            "rows": self.count,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4)
+        }
@@ -0,0 +1,242 @@
+"""
+Veritas - Incremental Event Clustering
+--------------------------------------
+Groups matched claims into same-event clusters with a union-find
+(disjoint-set) over integer claim ids. Each cluster root carries running
+aggregates — size, edge count, similarity sum and label counts — so a
+new day's comparisons merge into the existing events without revisiting
+old edges.
+
+Everything is persisted in SQLite (data/events/events.sqlite):
+  - claims:  id, identity key (source + url + sentence), parent, record
+  - edges:   every (a, b) pair already counted, so re-compared pairs are
+             ignored on later runs
+  - events:  one row per cluster root with its aggregates and a stable
+             event_id (a merged cluster keeps the older id)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+# ======== CONFIG ========
+EVENTS_DB = "data/events/events.sqlite"
+LABELS = ("Core", "Partial", "Disputed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS claims (
+    id      INTEGER PRIMARY KEY,
+    key     BLOB NOT NULL UNIQUE,
+    parent  INTEGER NOT NULL,
+    record  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS edges (
+    a          INTEGER NOT NULL,
+    b          INTEGER NOT NULL,
+    similarity REAL NOT NULL,
+    label      TEXT NOT NULL,
+    PRIMARY KEY (a, b)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    root        INTEGER PRIMARY KEY,
+    event_id    TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    edge_count  INTEGER NOT NULL,
+    sim_sum     REAL NOT NULL,
+    core        INTEGER NOT NULL,
+    partial     INTEGER NOT NULL,
+    disputed    INTEGER NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Aggregate slots per root.
+SIZE, EDGES, SIM_SUM, EVENT_NO = 0, 1, 2, 3
+LABEL_SLOT = {label: 4 + i for i, label in enumerate(LABELS)}
+
+
+def claim_key(claim):
+    """Identity of a claim: the same sentence from two sources is two claims."""
+    raw = "\0".join((claim.get("source") or "", claim.get("url") or "", claim["sentence"]))
+    return hashlib.sha1(raw.encode("utf-8")).digest()
+
+
+class EventClusters:
+    """
+    Persistent union-find of claims. add() merges comparisons, save()
+    writes back only what changed, events() lists the current clusters.
+    Use path=":memory:" for a throwaway clustering.
+    """
+
+    def __init__(self, path=EVENTS_DB):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+        self.ids = {}
+        self.parent = []
+        for claim_id, key, parent in self.db.execute("SELECT id, key, parent FROM claims ORDER BY id"):
+            self.ids[key] = claim_id
+            self.parent.append(parent)
+
+        # root -> [size, edges, sim_sum, event_no, core, partial, disputed]
+        self.agg = {}
+        for root, event_id, *values in self.db.execute(
+                "SELECT root, event_id, size, edge_count, sim_sum, core, partial, disputed FROM events"):
+            size, edges, sim_sum, *labels = values
+            self.agg[root] = [size, edges, sim_sum, int(event_id.rsplit("_", 1)[1]), *labels]
+        for claim_id, parent in enumerate(self.parent):
+            if parent == claim_id and claim_id not in self.agg:
+                self.agg[claim_id] = [1, 0, 0.0, 0] + [0] * len(LABELS)
+
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'next_event'").fetchone()
+        self.next_event = int(row[0]) if row else 1
+
+        self.new_claims = []      # (id, key, record)
+        self.new_edges = []       # (a, b, similarity, label)
+        self.pending_edges = set()
+        self.moved = set()        # ids whose parent changed
+        self.dirty = set()        # roots whose aggregates changed
+        self.merged = set()       # roots absorbed into another cluster
+
+    def __len__(self):
+        return len(self.parent)
+
+    # ---------- union-find ----------
+    def claim_id(self, claim):
+        key = claim_key(claim)
+        claim_id = self.ids.get(key)
+        if claim_id is None:
+            claim_id = len(self.parent)
+            self.ids[key] = claim_id
+            self.parent.append(claim_id)
+            self.agg[claim_id] = [1, 0, 0.0, 0] + [0] * len(LABELS)
+            self.new_claims.append((claim_id, key, json.dumps(claim, ensure_ascii=False)))
+        return claim_id
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            # Path halving.
+            parent[x] = parent[parent[x]]
+            self.moved.add(x)
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        if self.agg[ra][SIZE] < self.agg[rb][SIZE]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.moved.add(rb)
+
+        keep, gone = self.agg[ra], self.agg.pop(rb)
+        for slot in range(len(keep)):
+            if slot != EVENT_NO:
+                keep[slot] += gone[slot]
+        # The merged event keeps the older id.
+        if gone[EVENT_NO] and (not keep[EVENT_NO] or gone[EVENT_NO] < keep[EVENT_NO]):
+            keep[EVENT_NO] = gone[EVENT_NO]
+
+        self.dirty.discard(rb)
+        self.merged.add(rb)
+        self.dirty.add(ra)
+        return ra
+
+    def _edge_known(self, a, b):
+        if (a, b) in self.pending_edges:
+            return True
+        return self.db.execute("SELECT 1 FROM edges WHERE a = ? AND b = ?", (a, b)).fetchone() is not None
+
+    def add(self, comparisons):
+        """Merge comparisons ({claim1, claim2, similarity, label}); returns new edges counted."""
+        added = 0
+        for comp in comparisons:
+            a, b = self.claim_id(comp["claim1"]), self.claim_id(comp["claim2"])
+            if a == b:
+                continue
+            a, b = min(a, b), max(a, b)
+            if self._edge_known(a, b):
+                continue
+            self.pending_edges.add((a, b))
+            self.new_edges.append((a, b, comp["similarity"], comp["label"]))
+
+            root = self.union(a, b)
+            agg = self.agg[root]
+            agg[EDGES] += 1
+            agg[SIM_SUM] += comp["similarity"]
+            if comp["label"] in LABEL_SLOT:
+                agg[LABEL_SLOT[comp["label"]]] += 1
+            if not agg[EVENT_NO]:
+                agg[EVENT_NO] = self.next_event
+                self.next_event += 1
+            added += 1
+        return added
+
+    # ---------- persistence ----------
+    def save(self):
+        now = time.time()
+        db = self.db
+        db.executemany("INSERT INTO claims (id, key, parent, record) VALUES (?, ?, ?, ?)",
+                       ((i, key, self.parent[i], record) for i, key, record in self.new_claims))
+        db.executemany("UPDATE claims SET parent = ? WHERE id = ?",
+                       ((self.parent[i], i) for i in self.moved))
+        db.executemany("INSERT OR IGNORE INTO edges (a, b, similarity, label) VALUES (?, ?, ?, ?)",
+                       self.new_edges)
+        db.executemany("DELETE FROM events WHERE root = ?", ((r,) for r in self.merged))
+        db.executemany(
+            "INSERT OR REPLACE INTO events (root, event_id, size, edge_count, sim_sum, "
+            "core, partial, disputed, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((r, f"event_{a[EVENT_NO]}", a[SIZE], a[EDGES], a[SIM_SUM], *a[4:], now)
+             for r, a in ((r, self.agg[r]) for r in self.dirty))
+        )
+        db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('next_event', ?)", (str(self.next_event),))
+        db.commit()
+
+        updated = len(self.dirty)
+        self.new_claims, self.new_edges = [], []
+        self.pending_edges, self.moved, self.dirty, self.merged = set(), set(), set(), set()
+        return updated
+
+    # ---------- output ----------
+    def event_summary(self, root):
+        agg = self.agg[root]
+        counts = {label: agg[LABEL_SLOT[label]] for label in LABELS}
+        return {
+            "event_id": f"event_{agg[EVENT_NO]}",
+            "size": agg[SIZE],
+            "edge_count": agg[EDGES],
+            "average_similarity": round(agg[SIM_SUM] / max(agg[EDGES], 1), 3),
+            "label_counts": counts,
+            # Ties go to the first label in LABELS order.
+            "dominant_label": max(LABELS, key=counts.get) if agg[EDGES] else "Unknown"
+        }
+
+    def events(self):
+        """All clusters with at least one edge, oldest event first, claims included."""
+        members = {}
+        for claim_id, record in self._records():
+            root = self.find(claim_id)
+            if self.agg[root][EDGES]:
+                members.setdefault(root, []).append(json.loads(record))
+
+        for root in sorted(members, key=lambda r: self.agg[r][EVENT_NO]):
+            event = self.event_summary(root)
+            event["claims"] = members[root]
+            yield event
+
+    def _records(self):
+        yield from self.db.execute("SELECT id, record FROM claims ORDER BY id")
+        # Claims added since the last save aren't in the table yet.
+        for claim_id, _, record in self.new_claims:
+            yield claim_id, record
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,161 @@
+"""
+Veritas - Ingestion Schema
+--------------------------
+One record type for every article source, and a streaming normalizer
+that turns the on-disk output of each scraper into it:
+
+  - "rss"  backend/web-scraping/scrape.py   data/raw/articles_*
+           {source, bias, title, url, date, authors, text, fetched_at}
+  - "lbc"  web-scraper/LBC                  data/lbc_articles.jsonl
+  - "mtv"  web-scraper/MTV                  data/mtv_articles.jsonl
+           {source, url, title, text, section, image_url, author,
+            published_at, scraped_at}
+
+Timestamps go through timestamp_standard.parse_timestamp and come out as
+UTC "YYYY-MM-DDTHH:MM:SSZ" (None when missing or unparseable). Records
+without a bias get DEFAULT_BIAS, so downstream code can rely on it.
+Passing `languages` runs langfilter over the texts in batches and drops
+articles in other languages.
+"""
+
+import os
+import re
+import sys
+from itertools import islice
+from dataclasses import dataclass, fields
+
+BACKEND_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.join(BACKEND_DIR, "..", "web-scraper"))
+
+import storage
+import langfilter
+from instrumentation import metrics
+from timestamp_standard import parse_timestamp
+
+# ======== CONFIG ========
+RAW_DIR = "data/raw"
+LBC_FILE = "data/lbc_articles.jsonl"
+MTV_FILE = "data/mtv_articles.jsonl"
+DEFAULT_BIAS = "unrated"
+LANGUAGE_BATCH = 256       # articles per langfilter call
+
+_FRACTION = re.compile(r"\.\d+(?=Z$)")
+
+
+@dataclass(slots=True)
+class Article:
+    source: str
+    url: str
+    title: str
+    text: str
+    bias: str = DEFAULT_BIAS
+    published_at: str | None = None
+    author: str | None = None
+    section: str | None = None
+    image_url: str | None = None
+    fetched_at: str | None = None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in FIELD_NAMES}
+
+
+FIELD_NAMES = tuple(f.name for f in fields(Article))
+
+
+def article_key(url, source, title):
+    """Identity of an article across runs: its URL, else source + title."""
+    return url or f"{source}|{title}"
+
+
+# ======== ADAPTERS ========
+
+def _timestamp(raw, fmt):
+    """parse_timestamp that passes through already-normalized values and
+    maps failures to None. Fractional seconds (isoformat() of a utcnow())
+    are dropped, so every value reads YYYY-MM-DDTHH:MM:SSZ."""
+    if not raw:
+        return None
+    raw = str(raw).strip()
+    if not (raw.endswith("Z") and "T" in raw):
+        try:
+            raw = parse_timestamp(raw, fmt)
+        except (ValueError, TypeError, OverflowError):
+            return None
+        if raw is None:
+            return None
+    return _FRACTION.sub("", raw)
+
+
+def from_rss(record):
+    authors = record.get("authors") or []
+    return Article(
+        source=record.get("source") or "",
+        url=record.get("url") or "",
+        title=record.get("title") or "",
+        text=record.get("text") or "",
+        bias=record.get("bias") or DEFAULT_BIAS,
+        published_at=_timestamp(record.get("date"), "RSS"),
+        author=", ".join(authors) if authors else None,
+        fetched_at=_timestamp(record.get("fetched_at"), "RSS"),
+    )
+
+
+def _from_scraper(record, source, fmt):
+    return Article(
+        source=record.get("source") or source,
+        url=record.get("url") or "",
+        title=record.get("title") or "",
+        text=record.get("text") or "",
+        bias=record.get("bias") or DEFAULT_BIAS,
+        # Normally already "<timestamp>Z"; raw site formats are re-parsed.
+        published_at=_timestamp(record.get("published_at"), fmt),
+        author=record.get("author"),
+        section=record.get("section") or None,
+        image_url=record.get("image_url"),
+        fetched_at=_timestamp(record.get("scraped_at"), "RSS"),
+    )
+
+
+def from_lbc(record):
+    return _from_scraper(record, "LBC", "LBC")
+
+
+def from_mtv(record):
+    return _from_scraper(record, "MTV", "MTV")
+
+
+ADAPTERS = {"rss": from_rss, "lbc": from_lbc, "mtv": from_mtv}
+
+
+# ======== NORMALIZER ========
+
+def input_files(raw_dir=RAW_DIR, lbc_file=LBC_FILE, mtv_file=MTV_FILE):
+    """(path, kind) for every ingestion output currently on disk."""
+    inputs = [(p, "rss") for p in storage.list_record_files(raw_dir, "articles_")]
+    inputs += [(p, kind) for p, kind in ((lbc_file, "lbc"), (mtv_file, "mtv")) if os.path.exists(p)]
+    return inputs
+
+
+def filter_languages(articles, languages=langfilter.LANGUAGES, batch_size=LANGUAGE_BATCH):
+    """Keep the Articles whose text is in one of `languages`."""
+    articles = iter(articles)
+    while batch := list(islice(articles, batch_size)):
+        with metrics.stage("langfilter", items=len(batch)):
+            keep = langfilter.filter_texts([a.text for a in batch], languages)
+        yield from (a for a, ok in zip(batch, keep) if ok)
+
+
+def iter_source(path, kind, languages=None):
+    """Stream Articles from one scraper output file."""
+    adapt = ADAPTERS[kind]
+    articles = (adapt(record) for record in storage.iter_records(path))
+    if languages is not None:
+        articles = filter_languages(articles, languages)
+    yield from articles
+
+
+def iter_articles(inputs=None, languages=None):
+    """Stream Articles from every source in one pass."""
+    for path, kind in inputs if inputs is not None else input_files():
+        yield from iter_source(path, kind, languages)
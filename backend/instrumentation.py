@@ -0,0 +1,257 @@
+"""
+Veritas - Instrumentation
+-------------------------
+Process-wide stage metrics shared by the scrapers, the batch scripts and
+the API:
+
+  - per stage (fetch, parse, clean, langfilter, sentences, ner, embed,
+    sentiment, compare, cluster, ...): calls, items, total / max seconds,
+    errors, cache hits / misses, and the process peak RSS at its last call
+  - free-form counters
+  - sampled logging: log() prints the first and every LOG_EVERY-th message
+    per key, and formats only the lines it prints
+  - write_report() saves a JSON run report next to a script's outputs;
+    prometheus() renders the same numbers in Prometheus text format
+
+Recording is a lock and a few additions, cheap enough for per-URL or
+per-batch calls (time per-string work at the batch level). Stages timed in
+worker processes use Laps and are merged back with metrics.add_laps().
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ======== CONFIG ========
+LOG_EVERY = int(os.environ.get("VERITAS_LOG_EVERY", "100"))
+STAGES = ("fetch", "parse", "clean", "langfilter", "sentences", "ner", "embed", "sentiment",
+          "compare", "cluster")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return round(peak / (1 << 20) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+class StageStats:
+    __slots__ = ("calls", "items", "seconds", "max_seconds", "errors", "cache_hits", "cache_misses",
+                 "peak_rss_mb")
+
+    def __init__(self):
+        self.calls = self.items = self.errors = self.cache_hits = self.cache_misses = 0
+        self.seconds = self.max_seconds = 0.0
+        self.peak_rss_mb = None
+
+    def to_dict(self):
+        out = {name: getattr(self, name) for name in self.__slots__}
+        out["seconds"] = round(self.seconds, 6)
+        out["max_seconds"] = round(self.max_seconds, 6)
+        out["items_per_sec"] = round(self.items / self.seconds, 1) if self.seconds else None
+        return out
+
+
+class Laps:
+    """
+    Stage timings taken where the shared metrics aren't reachable (a worker
+    process). Send export() back with the result and merge it in the parent.
+    """
+
+    def __init__(self):
+        self.laps = {}
+
+    @contextmanager
+    def __call__(self, name, items=1):
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            lap = self.laps.setdefault(name, [0.0, 0, 0])
+            lap[0] += time.perf_counter() - started
+            lap[1] += items
+            lap[2] += failed
+
+    def export(self):
+        return self.laps
+
+
+class Metrics:
+    """Thread-safe stage statistics and counters for one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+            self._log_counts = {}
+            self.started_at = datetime.now(timezone.utc)
+            self._started = time.perf_counter()
+
+    def _stage(self, name):
+        s = self.stages.get(name)
+        if s is None:
+            s = self.stages[name] = StageStats()
+        return s
+
+    # ---------- recording ----------
+    def record(self, name, seconds, items=1, errors=0, calls=1):
+        rss = peak_rss_mb()
+        with self._lock:
+            s = self._stage(name)
+            s.calls += calls
+            s.items += items
+            s.seconds += seconds
+            s.errors += errors
+            if seconds > s.max_seconds:
+                s.max_seconds = seconds
+            s.peak_rss_mb = rss
+
+    @contextmanager
+    def stage(self, name, items=1):
+        """Time a block as one call of `name`; an exception counts as an error."""
+        started = time.perf_counter()
+        failed = 0
+        try:
+            yield
+        except BaseException:
+            failed = 1
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, items, failed)
+
+    def timed_iter(self, name, iterable):
+        """Yield from `iterable`, charging the time spent producing each item to `name`."""
+        it = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            self.record(name, time.perf_counter() - started)
+            yield item
+
+    def add_laps(self, laps):
+        """Merge a Laps.export() from a worker."""
+        for name, (seconds, items, errors) in laps.items():
+            self.record(name, seconds, items, errors)
+
+    def error(self, name, n=1):
+        with self._lock:
+            self._stage(name).errors += n
+
+    def cache(self, name, hits=0, misses=0):
+        with self._lock:
+            s = self._stage(name)
+            s.cache_hits += hits
+            s.cache_misses += misses
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # ---------- sampled logging ----------
+    def log(self, key, message, *args, every=None):
+        """
+        Print `message % args` for the first and every `every`-th call with
+        this key (LOG_EVERY by default). Returns True when printed.
+        """
+        every = every or LOG_EVERY
+        with self._lock:
+            n = self._log_counts[key] = self._log_counts.get(key, 0) + 1
+        if n != 1 and n % every:
+            return False
+        text = message % args if args else message
+        print(text if n == 1 else f"{text}  [{n} {key}]")
+        return True
+
+    # ---------- export ----------
+    def snapshot(self):
+        with self._lock:
+            stages = {name: s.to_dict() for name, s in self.stages.items()}
+            counters = dict(self.counters)
+        return {
+            "started_at": self.started_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "wall_seconds": round(time.perf_counter() - self._started, 3),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": stages,
+            "counters": counters,
+        }
+
+    def write_report(self, directory, name, **extra):
+        """Write run_report_<name>.json in `directory`; returns its path."""
+        os.makedirs(directory or ".", exist_ok=True)
+        path = os.path.join(directory, f"run_report_{name}.json")
+        report = {"script": name, "pid": os.getpid(), **self.snapshot(), **extra}
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+        return path
+
+    def prometheus(self, prefix="veritas"):
+        """Prometheus text exposition (version 0.0.4) of the current numbers."""
+        snap = self.snapshot()
+        series = [
+            ("stage_calls_total", "counter", "Timed calls per stage", "calls"),
+            ("stage_items_total", "counter", "Items processed per stage", "items"),
+            ("stage_seconds_total", "counter", "Seconds spent per stage", "seconds"),
+            ("stage_max_seconds", "gauge", "Slowest single call per stage", "max_seconds"),
+            ("stage_errors_total", "counter", "Errors per stage", "errors"),
+            ("stage_cache_hits_total", "counter", "Cache hits per stage", "cache_hits"),
+            ("stage_cache_misses_total", "counter", "Cache misses per stage", "cache_misses"),
+        ]
+        lines = []
+        for metric, kind, help_text, field in series:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}.")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name, s in sorted(snap["stages"].items()):
+                lines.append(f'{prefix}_{metric}{{stage="{_label(name)}"}} {s[field]}')
+        for name, value in sorted(snap["counters"].items()):
+            metric = f"{prefix}_{_metric_name(name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        if snap["peak_rss_mb"] is not None:
+            lines += [f"# HELP {prefix}_peak_rss_bytes Peak resident set size.",
+                      f"# TYPE {prefix}_peak_rss_bytes gauge",
+                      f"{prefix}_peak_rss_bytes {int(snap['peak_rss_mb'] * (1 << 20))}"]
+        lines += [f"# TYPE {prefix}_uptime_seconds gauge", f"{prefix}_uptime_seconds {snap['wall_seconds']}"]
+        return "\n".join(lines) + "\n"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _metric_name(value):
+    return "".join(c if c.isalnum() or c == "_" else "_" for c in value)
+
+
+# Process-wide instance and shortcuts.
+metrics = Metrics()
+stage = metrics.stage
+record = metrics.record
+timed_iter = metrics.timed_iter
+error = metrics.error
+cache = metrics.cache
+count = metrics.count
+log = metrics.log
+write_report = metrics.write_report
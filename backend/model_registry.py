@@ -0,0 +1,169 @@
+"""
+Veritas - Model Registry
+------------------------
+Process-wide, lazily loaded NLP models shared by every backend module:
+  - "spacy"      en_core_web_sm (sentence segmentation, POS, parsing)
+  - "ner"        dslim/bert-base-NER token-classification pipeline
+  - "embedder"   SentenceTransformer used for claim similarity
+  - "sentiment"  default transformers sentiment-analysis pipeline
+
+Nothing heavy is imported until a model is first requested, so importing
+helpers like parse_date or clean_sentence stays cheap. A server can call
+warm_up() at startup to preload exactly the models it serves, and
+release() to drop them again. fingerprint() names the models and library
+versions in use, for anything that persists model output.
+
+transformers pipelines keep per-call state, so callers that may run in
+several threads (the API's inference pool) hold call_lock(name) around
+each call.
+"""
+
+import gc
+import sys
+import threading
+from importlib import metadata
+
+# ======== CONFIG ========
+SPACY_MODEL = "en_core_web_sm"
+NER_MODEL = "dslim/bert-base-NER"
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+_LOADERS = {}
+_models = {}
+_locks = {}
+_call_locks = {}
+_registry_lock = threading.Lock()
+
+
+def register(name):
+    """
+    Decorator: register a zero-argument loader under `name`.
+    """
+    def wrap(loader):
+        _LOADERS[name] = loader
+        _locks[name] = threading.Lock()
+        _call_locks.setdefault(name, threading.Lock())
+        return loader
+    return wrap
+
+
+# ======== LOADERS ========
+
+@register("spacy")
+def _load_spacy():
+    import spacy
+    return spacy.load(SPACY_MODEL)
+
+
+@register("ner")
+def _load_ner():
+    from transformers import pipeline
+    return pipeline("ner", model=NER_MODEL, aggregation_strategy="simple")
+
+
+@register("embedder")
+def _load_embedder():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+@register("sentiment")
+def _load_sentiment():
+    from transformers import pipeline
+    return pipeline("sentiment-analysis")
+
+
+# Packages whose installed versions identify each model's behaviour, for
+# caches keyed on model output (see fingerprint()).
+_VERSION_PACKAGES = {
+    "spacy": ("spacy", SPACY_MODEL),
+    "ner": ("transformers", "torch"),
+    "embedder": ("sentence-transformers",),
+    "sentiment": ("transformers", "torch"),
+}
+_MODEL_IDS = {
+    "spacy": SPACY_MODEL,
+    "ner": NER_MODEL,
+    "embedder": EMBEDDING_MODEL,
+    "sentiment": "transformers-default",
+}
+
+
+# ======== PUBLIC API ========
+
+def get(name):
+    """
+    Return the model registered as `name`, loading it on first use.
+    Concurrent callers wait for a single load.
+    """
+    model = _models.get(name)
+    if model is not None:
+        return model
+    if name not in _LOADERS:
+        raise KeyError(f"Unknown model '{name}'. Known: {', '.join(sorted(_LOADERS))}")
+
+    with _locks[name]:
+        model = _models.get(name)
+        if model is None:
+            print(f"🧠 Loading {name} model...")
+            model = _LOADERS[name]()
+            with _registry_lock:
+                _models[name] = model
+    return model
+
+
+def call_lock(name):
+    """
+    Lock serializing calls into the model registered as `name`, for
+    models that aren't safe to run from several threads at once.
+    """
+    return _call_locks[name]
+
+
+def warm_up(*names):
+    """
+    Preload the given models (all registered models if none are given).
+    """
+    for name in names or tuple(_LOADERS):
+        get(name)
+
+
+def release(*names):
+    """
+    Drop the given models (all loaded models if none are given) so their
+    memory can be reclaimed. They reload on next use.
+    """
+    with _registry_lock:
+        for name in names or tuple(_models):
+            _models.pop(name, None)
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def loaded():
+    """
+    Names of the models currently held in memory.
+    """
+    return sorted(_models)
+
+
+def _package_version(package):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return "missing"
+
+
+def fingerprint(*names):
+    """
+    Stable string identifying the given models and the library versions
+    behind them, without loading anything. Persisted results computed by
+    these models are stale when it changes.
+    """
+    parts = []
+    for name in sorted(names):
+        packages = ",".join(f"{p}=={_package_version(p)}" for p in _VERSION_PACKAGES.get(name, ()))
+        parts.append(f"{name}:{_MODEL_IDS.get(name, name)}[{packages}]")
+    return ";".join(parts)
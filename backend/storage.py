@@ -0,0 +1,307 @@
+"""
+Veritas - Record Storage
+------------------------
+One storage layer for every pipeline stage (raw articles, claims, events):
+
+  - JSONL (default): one record per line, read and written as a stream
+  - Parquet (optional, needs pyarrow): columnar, read in row batches with
+    column projection so e.g. the comparison step never loads article text
+  - legacy .json arrays written by older runs are still readable
+
+Parquet files of each record kind (SCHEMA_KINDS) are written with a fixed
+schema, so a column that happens to be empty in the first batch doesn't
+get typed as null; keys outside the schema are not stored.
+
+Stages only deal with iterables of dicts, so memory is bounded by the
+batch size rather than by the size of a file.
+
+    with RecordWriter("data/claims/claims_x.jsonl", schema="claims") as w:
+        w.write(record)
+    for record in iter_records(path, columns=["source", "claims"]):
+        ...
+"""
+
+import os
+import json
+
+# "jsonl" or "parquet"; stages write in this format unless told otherwise.
+DEFAULT_FORMAT = os.environ.get("VERITAS_STORAGE_FORMAT", "jsonl")
+PARQUET_BATCH_ROWS = 1000
+
+EXTENSIONS = {"jsonl": ".jsonl", "parquet": ".parquet"}
+READABLE = (".jsonl", ".parquet", ".json")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Parquet storage needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+# ======== PARQUET SCHEMAS ========
+
+SCHEMA_KINDS = ("articles", "claims", "events", "duplicate_groups")
+# File stem prefix -> record kind, for files written before schemas existed.
+KIND_PREFIXES = {"articles_": "articles", "claims_": "claims", "events_": "events",
+                 "duplicate_groups": "duplicate_groups"}
+_SCHEMAS = {}
+
+
+def schema_for(kind):
+    """Arrow schema of a record kind (one of SCHEMA_KINDS)."""
+    if kind not in SCHEMA_KINDS:
+        raise ValueError(f"Unknown record kind: {kind!r}")
+    if not _SCHEMAS:
+        pa = _pyarrow()
+        strings = pa.list_(pa.string())
+        structure = pa.struct([(slot, strings) for slot in ("WHO", "WHAT", "WHEN", "WHERE", "HOW_MUCH")])
+        event_claim = pa.struct([
+            ("source", pa.string()), ("sources", strings), ("urls", strings), ("title", pa.string()),
+            ("url", pa.string()), ("sentence", pa.string()), ("entities", strings), ("date", pa.string()),
+            ("polarity", pa.string()),
+        ])
+        _SCHEMAS.update({
+            # Raw scraper output (web-scraping/scrape.py).
+            "articles": pa.schema([
+                ("source", pa.string()), ("bias", pa.string()), ("title", pa.string()), ("url", pa.string()),
+                ("date", pa.string()), ("authors", strings), ("text", pa.string()), ("fetched_at", pa.string()),
+            ]),
+            # claims_<stem> files (extract_claims.py).
+            "claims": pa.schema([
+                ("source", pa.string()), ("bias", pa.string()), ("title", pa.string()), ("url", pa.string()),
+                ("date", pa.string()),
+                ("claims", pa.list_(pa.struct([
+                    ("sentence", pa.string()), ("entities", strings), ("structure", structure),
+                ]))),
+            ]),
+            # events_clusters (compare_claims.py / EventClusters.events()).
+            "events": pa.schema([
+                ("event_id", pa.string()), ("size", pa.int64()), ("edge_count", pa.int64()),
+                ("average_similarity", pa.float64()),
+                ("label_counts", pa.struct([(label, pa.int64()) for label in ("Core", "Partial", "Disputed")])),
+                ("dominant_label", pa.string()), ("claims", pa.list_(event_claim)),
+            ]),
+            # ClaimsManifest.duplicate_groups().
+            "duplicate_groups": pa.schema([
+                ("canonical", pa.string()),
+                ("members", pa.list_(pa.struct([
+                    ("source", pa.string()), ("url", pa.string()), ("bias", pa.string()),
+                    ("title", pa.string()), ("date", pa.string()),
+                ]))),
+            ]),
+        })
+    return _SCHEMAS[kind]
+
+
+def kind_of(path):
+    """Record kind implied by a file's name (articles_*, claims_*, events_*...), or None."""
+    stem = stem_of(path)
+    for prefix, kind in KIND_PREFIXES.items():
+        if stem.startswith(prefix):
+            return kind
+    return None
+
+
+def format_of(path):
+    ext = os.path.splitext(path)[1]
+    for fmt, e in EXTENSIONS.items():
+        if ext == e:
+            return fmt
+    if ext == ".json":
+        return "json"
+    raise ValueError(f"Unsupported record file: {path}")
+
+
+def path_for(directory, stem, fmt=None):
+    """Output path for `stem` in the given (or default) format."""
+    return os.path.join(directory, stem + EXTENSIONS[fmt or DEFAULT_FORMAT])
+
+
+def stem_of(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def list_record_files(directory, prefix=""):
+    """Readable record files in `directory`, sorted by name."""
+    if not os.path.isdir(directory):
+        return []
+    names = [n for n in sorted(os.listdir(directory)) if n.startswith(prefix) and n.endswith(READABLE)]
+    # A migrated legacy file is kept alongside its replacement; read only one.
+    converted = {stem_of(n) for n in names if not n.endswith(".json")}
+    return [
+        os.path.join(directory, n) for n in names
+        if not (n.endswith(".json") and stem_of(n) in converted)
+    ]
+
+
+# ======== READING ========
+
+def _project(record, columns):
+    if columns is None:
+        return record
+    return {c: record.get(c) for c in columns}
+
+
+def iter_records(path, columns=None):
+    """
+    Stream records (dicts) from a file. `columns` limits the returned keys;
+    for Parquet only those columns are read from disk.
+    """
+    fmt = format_of(path)
+
+    if fmt == "parquet":
+        pq = _pyarrow().parquet
+        pf = pq.ParquetFile(path)
+        if columns is not None:
+            present = set(pf.schema_arrow.names)
+            read = [c for c in columns if c in present]
+        else:
+            read = None
+        for batch in pf.iter_batches(batch_size=PARQUET_BATCH_ROWS, columns=read):
+            for record in batch.to_pylist():
+                yield _project(record, columns)
+
+    elif fmt == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield _project(json.loads(line), columns)
+
+    else:
+        # Legacy indented arrays: no way to stream these without a parser
+        # dependency, so they are loaded whole. Rewrite them with migrate().
+        with open(path, "r", encoding="utf-8") as f:
+            for record in json.load(f):
+                yield _project(record, columns)
+
+
+def iter_dir(directory, prefix="", columns=None):
+    """Stream records from every record file in a directory."""
+    for path in list_record_files(directory, prefix):
+        yield from iter_records(path, columns)
+
+
+# ======== WRITING ========
+
+class RecordWriter:
+    """
+    Append records to a new file. Data goes to `<path>.part` and is renamed
+    into place on close, so readers never see a half-written file. Nothing
+    is created until the first record arrives.
+
+    `schema` is a record kind (see schema_for) or an Arrow schema; without
+    one, a Parquet schema is inferred from the first batch.
+    """
+
+    def __init__(self, path, fmt=None, schema=None, batch_rows=PARQUET_BATCH_ROWS):
+        self.path = path
+        self.fmt = fmt or format_of(path)
+        if self.fmt not in EXTENSIONS:
+            raise ValueError(f"Cannot write {self.fmt!r} records: {path}")
+        if isinstance(schema, str):
+            schema = schema_for(schema) if self.fmt == "parquet" else None
+        self.schema = schema
+        self.batch_rows = batch_rows
+        self.count = 0
+        self._f = None
+        self._pq_writer = None
+        self._batch = []
+
+    @property
+    def part_path(self):
+        return self.path + ".part"
+
+    def write(self, record):
+        if self.fmt == "jsonl":
+            if self._f is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._f = open(self.part_path, "w", encoding="utf-8")
+            self._f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            self._batch.append(record)
+            if len(self._batch) >= self.batch_rows:
+                self._flush_parquet()
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def _flush_parquet(self):
+        if not self._batch:
+            return
+        pa = _pyarrow()
+        table = pa.Table.from_pylist(self._batch, schema=self.schema)
+        if self._pq_writer is None:
+            # Schema comes from the first batch unless given explicitly.
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.schema = table.schema
+            self._pq_writer = pa.parquet.ParquetWriter(self.part_path, self.schema)
+        self._pq_writer.write_table(table)
+        self._batch = []
+
+    def close(self):
+        if self.fmt == "parquet":
+            self._flush_parquet()
+            if self._pq_writer is None:
+                return
+            self._pq_writer.close()
+        else:
+            if self._f is None:
+                return
+            self._f.close()
+        os.replace(self.part_path, self.path)
+
+    def abort(self):
+        """Drop everything written so far."""
+        if self._pq_writer is not None:
+            self._pq_writer.close()
+        if self._f is not None:
+            self._f.close()
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_records(path, records, fmt=None, schema=None):
+    """Write an iterable of records to `path`; returns the count."""
+    with RecordWriter(path, fmt, schema) as w:
+        w.write_many(records)
+    return w.count
+
+
+def migrate(path, fmt=None):
+    """Rewrite a legacy .json array as JSONL/Parquet next to it; returns the new path."""
+    target = path_for(os.path.dirname(path), stem_of(path), fmt)
+    write_records(target, iter_records(path), schema=kind_of(path))
+    return target
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert legacy .json record files")
+    parser.add_argument("directories", nargs="+")
+    parser.add_argument("--format", choices=sorted(EXTENSIONS), default=DEFAULT_FORMAT)
+    parser.add_argument("--delete", action="store_true", help="remove the .json file after converting")
+    args = parser.parse_args()
+
+    for d in args.directories:
+        for p in list_record_files(d):
+            if format_of(p) != "json":
+                continue
+            target = migrate(p, args.format)
+            print(f"{p} → {target}")
+            if args.delete:
+                os.remove(p)
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import storage
+
+
+# ========== CONFIG ==========
+STATE_PATH = "data/raw/feed_state.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    rss        TEXT PRIMARY KEY,
+    etag       TEXT,
+    modified   TEXT,
+    status     INTEGER,
+    polled_at  REAL
+);
+CREATE TABLE IF NOT EXISTS seen (
+    url_hash   BLOB PRIMARY KEY,
+    url        TEXT NOT NULL,
+    seen_at    REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def url_hash(url: str) -> bytes:
+    """sha1 of the URL without fragment or trailing slash."""
+    parts = urlsplit(url.strip())
+    canonical = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+    return hashlib.sha1(canonical.encode("utf-8")).digest()
+
+
+class FeedState:
+    """Persistent polling state for RSS collection: ETag/Last-Modified per
+    feed, plus the index of article URLs already downloaded and parsed.
+    Use from a single thread."""
+
+    def __init__(self, path=STATE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    # ---------- feeds ----------
+    def validators(self, rss):
+        """(etag, modified) stored for a feed, or (None, None)."""
+        row = self.db.execute("SELECT etag, modified FROM feeds WHERE rss = ?", (rss,)).fetchone()
+        return row if row else (None, None)
+
+    def update_feed(self, rss, status, etag=None, modified=None):
+        # Keep the previous validators when a 304 doesn't resend them.
+        old_etag, old_modified = self.validators(rss)
+        self.db.execute(
+            "INSERT OR REPLACE INTO feeds (rss, etag, modified, status, polled_at) VALUES (?, ?, ?, ?, ?)",
+            (rss, etag or old_etag, modified or old_modified, status, time.time())
+        )
+        self.db.commit()
+
+    # ---------- seen URLs ----------
+    def is_seen(self, url):
+        return self.db.execute("SELECT 1 FROM seen WHERE url_hash = ?", (url_hash(url),)).fetchone() is not None
+
+    def mark_seen(self, url):
+        self.db.execute(
+            "INSERT OR IGNORE INTO seen (url_hash, url, seen_at) VALUES (?, ?, ?)",
+            (url_hash(url), url, time.time())
+        )
+        self.db.commit()
+
+    def mark_seen_many(self, urls):
+        now = time.time()
+        self.db.executemany(
+            "INSERT OR IGNORE INTO seen (url_hash, url, seen_at) VALUES (?, ?, ?)",
+            [(url_hash(u), u, now) for u in urls]
+        )
+        self.db.commit()
+
+    def seen_count(self):
+        return self.db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def bootstrap_from_raw(self, raw_dir):
+        """One-time import of URLs already stored in earlier articles_* files."""
+        if self.db.execute("SELECT value FROM meta WHERE key = 'bootstrapped'").fetchone():
+            return 0
+
+        now = time.time()
+        rows = [
+            (url_hash(a["url"]), a["url"], now)
+            for a in storage.iter_dir(raw_dir, prefix="articles_", columns=["url"])
+            if a.get("url")
+        ]
+
+        self.db.executemany("INSERT OR IGNORE INTO seen (url_hash, url, seen_at) VALUES (?, ?, ?)", rows)
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('bootstrapped', '1')")
+        self.db.commit()
+        return len(rows)
+
+    def close(self):
+        self.db.close()
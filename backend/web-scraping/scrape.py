@@ -1,12 +1,23 @@
-
 import os
-import re
-import json
+import sys
 import time
+import argparse
+import threading
 from datetime import datetime
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 import feedparser
 from newspaper import Article
-from langdetect import detect, LangDetectException
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "web-scraper")))
+
+import storage
+import cleaning
+import langfilter
+from feed_state import FeedState, url_hash
+from instrumentation import metrics, Laps
 
 
 # ========== CONFIG ==========
@@ -23,30 +34,44 @@ news_sources = [
 
 
 SAVE_DIR = "data/raw"
-os.makedirs(SAVE_DIR, exist_ok=True)
+FEED_WORKERS = len(news_sources)   # all RSS feeds fetched at once
+DOWNLOAD_WORKERS = 16              # concurrent article downloads
+PARSE_WORKERS = os.cpu_count() or 2
+PER_HOST_INTERVAL = 1.0            # seconds between requests to the same host
+STATE_PATH = os.path.join(SAVE_DIR, "feed_state.sqlite")
 
 
 # ========== HELPERS ==========
 def clean_text(text: str) -> str:
     """Basic cleaning to remove URLs, extra whitespace, and HTML junk."""
-    text = re.sub(r"http\S+", "", text)
-    text = re.sub(r"\s+", " ", text)
-    text = text.replace("\xa0", " ").strip()
-    return text
+    return cleaning.clean_text(text, strip_urls=True)
 
 
 def is_valid_article(text: str) -> bool:
-    """Check if article has enough words and is in English or Arabic."""
-    try:
-        lang = detect(text)
-        return len(text.split()) > 100 and lang in ["en"]
-    except LangDetectException:
-        return False
+    """Check if article has enough words and is in English (see langfilter)."""
+    return langfilter.is_valid(text, languages=("en",), min_words=100)
+
+
+def poll_feed(source, etag=None, modified=None):
+    """Conditionally fetch an RSS feed. A 304 response comes back with no
+    entries; the new validators are returned for the next poll."""
+    with metrics.stage("feed"):
+        feed = feedparser.parse(source["rss"], etag=etag, modified=modified)
+    status = feed.get("status")
+    return {
+        "status": status,
+        "etag": feed.get("etag"),
+        "modified": feed.get("modified"),
+        "entries": [] if status == 304 else _feed_entries(feed, source)
+    }
 
 
 def fetch_rss_articles(source):
     """Fetch article URLs from an RSS feed."""
-    feed = feedparser.parse(source["rss"])
+    return poll_feed(source)["entries"]
+
+
+def _feed_entries(feed, source):
     entries = []
     for e in feed.entries:
         entries.append({
@@ -59,15 +84,53 @@ def fetch_rss_articles(source):
     return entries
 
 
-def extract_full_article(entry):
-    """Download and parse full article content using newspaper3k."""
+class HostRateLimiter:
+    """Thread-safe per-host spacing: at most one request per `interval` seconds per host."""
+
+    def __init__(self, interval=PER_HOST_INTERVAL):
+        self.interval = interval
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def download_article(entry, limiter=None):
+    """Download an article's HTML (network-bound, runs in a thread)."""
+    try:
+        if limiter:
+            limiter.wait(entry["url"])
+        with metrics.stage("fetch"):
+            a = Article(entry["url"])
+            a.download()
+        return a.html
+    except Exception as e:
+        metrics.log("failed downloads", "[x] Failed to download %s — %s", entry["url"], e, every=20)
+        return None
+
+
+def parse_article(entry, html, laps=None):
+    """Parse downloaded HTML and validate it (CPU-bound, runs in a worker process).
+    Stage timings go into `laps` when given."""
+    laps = laps if laps is not None else Laps()
     try:
-        a = Article(entry["url"])
-        a.download()
-        a.parse()
-        text = clean_text(a.text)
+        with laps("parse"):
+            a = Article(entry["url"])
+            a.download(input_html=html)
+            a.parse()
+        with laps("clean"):
+            text = clean_text(a.text)
+        with laps("langfilter"):
+            valid = is_valid_article(text)
 
-        if not is_valid_article(text):
+        if not valid:
             return None
 
         return {
@@ -85,35 +148,184 @@ def extract_full_article(entry):
         return None
 
 
+def parse_job(entry, html):
+    """Process-pool entry point: (article or None, stage laps)."""
+    laps = Laps()
+    article = parse_article(entry, html, laps)
+    return article, laps.export()
+
+
+def extract_full_article(entry):
+    """Download and parse full article content using newspaper3k."""
+    html = download_article(entry)
+    return parse_article(entry, html) if html else None
+
+
 # ========== MAIN PIPELINE ==========
-def main():
-    print("🚀 Starting Veritas Data Pipeline...")
-    all_articles = []
+def output_path():
+    """Daily file; later polls on the same day get a timestamped file."""
+    now = datetime.now()
+    daily = f"articles_{now:%Y-%m-%d}"
+    if any(storage.stem_of(p) == daily for p in storage.list_record_files(SAVE_DIR, daily)):
+        return storage.path_for(SAVE_DIR, f"articles_{now:%Y-%m-%d_%H%M%S}")
+    return storage.path_for(SAVE_DIR, daily)
+
+
+def collect(state):
+    """One polling round: conditional feed fetches, then download and parse
+    only entries not in the seen-URL index or already queued by another feed."""
+    save_path = output_path()
+    limiter = HostRateLimiter()
+    skipped = not_modified = 0
+    # Feeds whose new entries are still in flight, by source name. Their new
+    # validators are saved only once every entry is through, so a failed
+    # download doesn't turn the next poll into a 304.
+    open_feeds = {}
+    # Parsed URLs and feed validators are committed to the state only once
+    # the output file is in place. If the poll dies first, the writer drops
+    # its .part file and the next poll fetches those articles again.
+    parsed_urls = []
+    finished_feeds = []
+    # URLs (by url_hash) already queued in this poll: an article listed by
+    # several feeds is only downloaded once.
+    queued = set()
+
+    def entry_done(entry, ok):
+        f = open_feeds[entry["source"]]
+        f["left"] -= 1
+        f["failed"] |= not ok
+        if f["left"]:
+            return
+        del open_feeds[entry["source"]]
+        feed = f["feed"]
+        if f["failed"]:
+            # Keep the old validators: the next poll refetches the feed and
+            # retries the entries that aren't in the seen index.
+            finished_feeds.append((f["rss"], feed["status"], None, None))
+        else:
+            finished_feeds.append((f["rss"], feed["status"], feed["etag"], feed["modified"]))
 
-    for source in SOURCES:
-        print(f"\n🔗 Fetching from {source['name']} ...")
-        entries = fetch_rss_articles(source)
-        print(f"  → Found {len(entries)} links.")
+    # Feeds → downloads (threads, per-host spacing) → parse + language filter
+    # (processes). Each stage starts as soon as its input is ready. The pools
+    # drain before the writer closes.
+    with storage.RecordWriter(save_path, schema="articles") as writer, \
+            ThreadPoolExecutor(FEED_WORKERS) as feed_pool, \
+            ThreadPoolExecutor(DOWNLOAD_WORKERS) as download_pool, \
+            ProcessPoolExecutor(PARSE_WORKERS) as parse_pool:
 
-        for entry in entries:
-            article = extract_full_article(entry)
-            if article:
-                all_articles.append(article)
-                print(f"    ✅ Saved: {article['title'][:60]}")
+        stage = {}
+        for source in news_sources:
+            etag, modified = state.validators(source["rss"])
+            stage[feed_pool.submit(poll_feed, source, etag, modified)] = ("feed", source)
+        pending = set(stage)
 
-            # Optional: prevent rate-limiting
-            time.sleep(1)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                kind, item = stage.pop(fut)
 
-    # Save all results as a daily JSON file
-    today = datetime.now().strftime("%Y-%m-%d")
-    save_path = os.path.join(SAVE_DIR, f"articles_{today}.json")
+                if kind == "feed":
+                    try:
+                        feed = fut.result()
+                    except Exception as e:
+                        print(f"[x] Feed {item['name']} failed — {e}")
+                        continue
+                    if feed["status"] == 304:
+                        state.update_feed(item["rss"], feed["status"])
+                        not_modified += 1
+                        metrics.cache("feed", hits=1)
+                        print(f"💤 {item['name']}: not modified.")
+                        continue
 
-    with open(save_path, "w", encoding="utf-8") as f:
-        json.dump(all_articles, f, ensure_ascii=False, indent=2)
+                    metrics.cache("feed", misses=1)
+                    entries = []
+                    for e in feed["entries"]:
+                        key = url_hash(e["url"])
+                        if key not in queued and not state.is_seen(e["url"]):
+                            queued.add(key)
+                            entries.append(e)
+                    skipped += len(feed["entries"]) - len(entries)
+                    metrics.cache("seen_urls", hits=len(feed["entries"]) - len(entries), misses=len(entries))
+                    print(f"🔗 {item['name']}: {len(feed['entries'])} links, {len(entries)} new.")
+                    if not entries:
+                        finished_feeds.append((item["rss"], feed["status"], feed["etag"], feed["modified"]))
+                        continue
+                    open_feeds[item["name"]] = {"rss": item["rss"], "feed": feed, "left": len(entries),
+                                                "failed": False}
+                    for entry in entries:
+                        f = download_pool.submit(download_article, entry, limiter)
+                        stage[f] = ("download", entry)
+                        pending.add(f)
 
-    print(f"\n✅ Done. Collected {len(all_articles)} valid articles.")
-    print(f"📁 Saved to: {save_path}")
+                elif kind == "download":
+                    html = fut.result()
+                    if not html:
+                        entry_done(item, ok=False)
+                        continue
+                    try:
+                        f = parse_pool.submit(parse_job, item, html)
+                    except BrokenProcessPool as e:
+                        metrics.error("parse")
+                        print(f"[x] Failed to parse {item['url']} — {e}")
+                        entry_done(item, ok=False)
+                        continue
+                    stage[f] = ("parse", item)
+                    pending.add(f)
+
+                else:
+                    try:
+                        article, laps = fut.result()
+                    except Exception as e:
+                        # A crashed worker (BrokenProcessPool) or parser bug
+                        # costs this entry, not the whole poll.
+                        metrics.error("parse")
+                        print(f"[x] Failed to parse {item['url']} — {e}")
+                        entry_done(item, ok=False)
+                        continue
+                    metrics.add_laps(laps)
+                    # Seen once parsed, valid or not, so rejected pages aren't refetched.
+                    parsed_urls.append(item["url"])
+                    entry_done(item, ok=True)
+                    if article:
+                        writer.write(article)
+                        metrics.log("articles saved", "    ✅ Saved: %s", article["title"][:60])
+                    else:
+                        metrics.count("articles_rejected")
+
+    state.mark_seen_many(parsed_urls)
+    for rss, status, etag, modified in finished_feeds:
+        state.update_feed(rss, status, etag, modified)
+    metrics.count("articles_written", writer.count)
+    print(f"\n✅ Done. Collected {writer.count} valid articles "
+          f"({skipped} already-seen links skipped, {not_modified} feeds unchanged).")
+    if writer.count:
+        print(f"📁 Saved to: {save_path}")
+    print(f"📊 Run report: {metrics.write_report(SAVE_DIR, 'rss_collect')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Veritas RSS collector")
+    parser.add_argument("--every", type=float, default=0,
+                        help="poll again every N minutes (default: run once)")
+    args = parser.parse_args()
+
+    print("🚀 Starting Veritas Data Pipeline...")
+    os.makedirs(SAVE_DIR, exist_ok=True)
+    state = FeedState(STATE_PATH)
+    imported = state.bootstrap_from_raw(SAVE_DIR)
+    if imported:
+        print(f"📚 Indexed {imported} URLs from earlier raw files.")
+
+    try:
+        while True:
+            collect(state)
+            if not args.every:
+                break
+            print(f"⏳ Next poll in {args.every:g} min...")
+            time.sleep(args.every * 60)
+    finally:
+        state.close()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
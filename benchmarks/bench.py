@@ -0,0 +1,103 @@
+"""
+Veritas - Benchmark Harness
+---------------------------
+Shared helpers for microbench.py and end_to_end.py: import paths, best-of-N
+timing, peak RSS and the results file.
+
+Every run appends one JSON line to RESULTS_PATH with the git revision,
+machine and scale, so runs before and after a change can be compared:
+    python benchmarks/end_to_end.py --claims 100000 --compare
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import resource
+import subprocess
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.abspath(os.path.dirname(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results.jsonl")
+
+for _p in ("backend", "backend/comparison", "backend/claim_extraction", "web-scraper", "web-scraper/LBC",
+           "web-scraper/MTV"):
+    sys.path.append(os.path.join(REPO_DIR, _p))
+sys.path.append(BENCH_DIR)
+
+
+def timed(fn, repeat=3):
+    """(result of the last call, best wall time in seconds over `repeat` calls)."""
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return out, best
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_info(kind, **params):
+    """Header fields identifying a run and what it is comparable with."""
+    return {
+        "kind": kind,
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} cpu",
+        "params": params,
+    }
+
+
+def previous_result(kind, params, path=RESULTS_PATH):
+    """The latest earlier result of the same kind and parameters, or None."""
+    if not os.path.exists(path):
+        return None
+    found = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                r = json.loads(line)
+            except ValueError:
+                continue
+            if r.get("kind") == kind and r.get("params") == params:
+                found = r
+    return found
+
+
+def append_result(result, path=RESULTS_PATH):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+def print_stages(stages, previous=None):
+    """Table of stage timings, with the change against `previous` if given."""
+    before = (previous or {}).get("stages", {})
+    print(f"{'stage':<16}{'items':>10}{'seconds':>10}{'items/sec':>14}   vs previous")
+    for name, s in stages.items():
+        line = f"{name:<16}{s['items']:>10}{s['seconds']:>10.3f}{s['per_sec']:>14.1f}"
+        if name in before and before[name]["seconds"] > 0:
+            line += f"   {s['seconds'] / before[name]['seconds'] - 1:+.1%}"
+        print(line)
+
+
+def stage(items, seconds, **extra):
+    return {"items": items, "seconds": round(seconds, 6), "per_sec": round(items / max(seconds, 1e-9), 1), **extra}
@@ -0,0 +1,155 @@
+"""
+Veritas - End-to-End Benchmark
+------------------------------
+Runs the pipeline on synthetic data in a scratch directory, through the
+same functions the scripts use:
+
+  ingest    raw RSS records -> storage -> ingestion.Article -> clean_text
+  dedup     MinHash + LSH near-duplicate grouping (dedup.py)
+  extract   extract_claims_batch (only with --real-models; otherwise the
+            synthetic claims stand in for its output)
+  load      claims files -> compare_claims.load_all_claims
+  compare   compare_claims.compare_claims (embedding store, blocking,
+            scoring, sentiment, labels)
+  cluster   EventClusters union-find + save, events written via storage
+
+Wall time per stage, claims/sec, peak RSS and the pipeline's own
+instrumentation stages (instrumentation.py) are appended to results.jsonl;
+--compare prints the change against the last run at the same scale.
+
+    python benchmarks/end_to_end.py --claims 100000 --compare
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+import bench
+import synthetic
+
+
+def run(n_claims, n_articles, real_models=False, fmt=None, workdir=None):
+    import cleaning
+    import storage
+    import ingestion
+    import compare_claims as cc
+    from dedup import LSHIndex, minhash
+    from embedding_store import EmbeddingStore
+    from event_clusters import EventClusters
+    from instrumentation import metrics
+
+    claims = synthetic.generate_claims(n_claims)
+    raw = synthetic.generate_articles(n_articles)
+    stages = {}
+    started = time.perf_counter()
+
+    def timed_stage(name, items, fn, **extra):
+        t0 = time.perf_counter()
+        out = fn()
+        stages[name] = bench.stage(items, time.perf_counter() - t0, **extra)
+        return out
+
+    raw_dir = os.path.join(workdir, "raw")
+    claim_dir = os.path.join(workdir, "claims")
+    raw_path = storage.path_for(raw_dir, "articles_bench", fmt)
+    storage.write_records(raw_path, raw, fmt, schema="articles")
+
+    def ingest():
+        out = []
+        for a in ingestion.iter_source(raw_path, "rss"):
+            a.text = cleaning.clean_text(a.text)
+            out.append(a)
+        return out
+
+    articles = timed_stage("ingest", len(raw), ingest, bytes=os.path.getsize(raw_path))
+
+    def dedup():
+        index, duplicates = LSHIndex(), 0
+        for a in articles:
+            sig = minhash(a.text)
+            if sig is None:
+                continue
+            if index.query(sig) is not None:
+                duplicates += 1
+            else:
+                index.add(a.url, sig)
+        return duplicates
+
+    duplicates = timed_stage("dedup", len(articles), dedup)
+    stages["dedup"]["duplicates"] = duplicates
+
+    if real_models:
+        import extract_claims as ec
+        timed_stage("extract", len(articles), lambda: sum(1 for _ in ec.extract_claims_batch(a.text for a in articles)))
+
+    storage.write_records(storage.path_for(claim_dir, "claims_bench", fmt), synthetic.claims_to_articles(claims), fmt,
+                          schema="claims")
+    cc.CLAIM_DIR = claim_dir
+    loaded = timed_stage("load", n_claims, cc.load_all_claims)
+
+    store = EmbeddingStore(cc.MODEL_NAME, root=os.path.join(workdir, "embeddings"))
+    comparisons = timed_stage("compare", len(loaded), lambda: cc.compare_claims(loaded, store=store))
+    stages["compare"]["matches"] = len(comparisons)
+
+    def cluster():
+        clusters = EventClusters(os.path.join(workdir, "events.sqlite"))
+        events = cc.cluster_events(comparisons, clusters)
+        clusters.save()
+        clusters.close()
+        storage.write_records(storage.path_for(workdir, "events_clusters", fmt), events, fmt, schema="events")
+        return events
+
+    events = timed_stage("cluster", len(comparisons), cluster)
+    stages["cluster"]["events"] = len(events)
+
+    wall = time.perf_counter() - started
+    return {
+        "stages": stages,
+        "instrumentation": metrics.snapshot()["stages"],
+        "wall_seconds": round(wall, 3),
+        "claims_per_sec": round(n_claims / max(wall, 1e-9), 1),
+        "peak_rss_mb": round(bench.peak_rss_mb(), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Veritas end-to-end benchmark on synthetic data")
+    parser.add_argument("--claims", type=int, default=10_000, help="synthetic claims (1k .. 1M)")
+    parser.add_argument("--articles", type=int, default=None,
+                        help="synthetic raw articles for ingest/dedup (default: claims / 10)")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default=None)
+    parser.add_argument("--real-models", action="store_true", help="use the real NLP models")
+    parser.add_argument("--workdir", default=None, help="keep outputs here instead of a temp dir")
+    parser.add_argument("--compare", action="store_true", help="show the change against the last matching run")
+    parser.add_argument("--no-save", action="store_true", help="don't append to results.jsonl")
+    args = parser.parse_args()
+
+    if not args.real_models:
+        synthetic.use_synthetic_models()
+    n_articles = args.articles or max(1, args.claims // 10)
+    params = {"claims": args.claims, "articles": n_articles, "format": args.format, "real_models": args.real_models}
+
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        outcome = run(args.claims, n_articles, args.real_models, args.format, args.workdir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="veritas-bench-") as workdir:
+            outcome = run(args.claims, n_articles, args.real_models, args.format, workdir)
+
+    result = {**bench.run_info("end_to_end", **params), **outcome}
+    previous = bench.previous_result("end_to_end", params) if args.compare else None
+    print()
+    bench.print_stages(outcome["stages"], previous)
+    line = (f"wall {outcome['wall_seconds']:.1f}s, {outcome['claims_per_sec']:.0f} claims/sec, "
+            f"peak RSS {outcome['peak_rss_mb']:.0f} MB")
+    if previous:
+        line += f"  (previous {previous['revision']}: wall {previous['wall_seconds']:.1f}s, " \
+                f"peak RSS {previous['peak_rss_mb']:.0f} MB)"
+    print(line)
+    if not args.no_save:
+        bench.append_result(result)
+
+
+if __name__ == "__main__":
+    main()
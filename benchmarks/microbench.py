@@ -0,0 +1,174 @@
+"""
+Veritas - Per-Stage Microbenchmarks
+-----------------------------------
+Times one stage at a time on fixed inputs (best of --repeat runs):
+
+  - clean       cleaning.clean_text over fixture and synthetic article text
+  - timestamps  timestamp_standard.parse_timestamp over LBC/MTV/RSS formats
+  - parse       LBC page parsing (synthetic pages in web-scraper/LBC/fixtures), MTV record
+                building and RSS feed parsing on saved fixtures
+  - candidates  compare_claims.generate_candidate_pairs (entity blocking)
+  - embedding   encode_claims through a warm EmbeddingStore + pair scoring
+  - clustering  EventClusters union-find over the labelled pairs
+
+Embeddings and sentiment come from the synthetic stand-ins unless
+--real-models is given. Results are appended to results.jsonl.
+
+    python benchmarks/microbench.py --claims 20000
+    python benchmarks/microbench.py --stages clean parse --compare
+"""
+
+import os
+import json
+import random
+import argparse
+import tempfile
+
+import bench
+import synthetic
+
+STAGES = ("clean", "timestamps", "parse", "candidates", "embedding", "clustering")
+
+
+def _mtv_items():
+    with open(os.path.join(bench.FIXTURE_DIR, "mtv", "articles.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def bench_clean(ctx, repeat):
+    import cleaning
+    texts = [item["Text"] for item in _mtv_items()] * 50
+    texts += [a["text"] for a in synthetic.generate_articles(2000)]
+    _, seconds = bench.timed(lambda: list(cleaning.clean_texts(texts)), repeat)
+    return bench.stage(len(texts), seconds, chars=sum(map(len, texts)))
+
+
+def bench_timestamps(ctx, repeat):
+    from timestamp_standard import parse_timestamp
+    rng = random.Random(synthetic.SEED)
+    values = []
+    for _ in range(5000):
+        d, h, m = rng.randint(1, 28), rng.randint(0, 23), rng.randint(0, 59)
+        values += [(f"{d:02d}-05-2024 | {h:02d}:{m:02d}", "LBC"),
+                   (f"2024-05-{d:02d}T{h:02d}:{m:02d}:00", "MTV"),
+                   (f"Tue, {d:02d} May 2024 {h:02d}:{m:02d}:00 +0300", "RSS"),
+                   (f"2024-05-{d:02d} {h:02d}:{m:02d}:00+03:00", "RSS")]
+    _, seconds = bench.timed(lambda: [parse_timestamp(raw, fmt) for raw, fmt in values], repeat)
+    return bench.stage(len(values), seconds)
+
+
+def bench_parse(ctx, repeat):
+    import feedparser
+    from lbcArticleScraper import parse_lbc_article
+    from mtvScraper import to_record
+    from parse_benchmark import load_fixtures
+    pages = load_fixtures() * 25
+    items = _mtv_items() * 25
+    with open(os.path.join(bench.FIXTURE_DIR, "rss", "feed.xml"), "r", encoding="utf-8") as f:
+        feeds = [f.read()] * 10
+
+    def run():
+        for url, html in pages:
+            parse_lbc_article(html, url, "2000-01-01T00:00:00Z")
+        for item in items:
+            to_record(item, "2000-01-01T00:00:00Z")
+        for xml in feeds:
+            feedparser.parse(xml)
+
+    _, seconds = bench.timed(run, repeat)
+    return bench.stage(len(pages) + len(items) + len(feeds), seconds,
+                       pages=len(pages), records=len(items), feeds=len(feeds))
+
+
+def bench_candidates(ctx, repeat):
+    import compare_claims as cc
+    claims = ctx["claims"]
+    pairs, seconds = bench.timed(lambda: list(cc.generate_candidate_pairs(claims, days=2)), repeat)
+    ctx["pairs"] = pairs
+    return bench.stage(len(claims), seconds, pairs=len(pairs))
+
+
+def bench_embedding(ctx, repeat):
+    import numpy as np
+    import compare_claims as cc
+    from embedding_store import EmbeddingStore
+    claims, pairs = ctx["claims"], ctx.get("pairs")
+    if pairs is None:
+        pairs = ctx["pairs"] = list(cc.generate_candidate_pairs(claims, days=2))
+
+    with tempfile.TemporaryDirectory() as root:
+        store = EmbeddingStore(cc.MODEL_NAME, root=root)
+        cc.encode_claims(claims, store=store)       # cold: fills the store
+        (embeddings, rows), seconds = bench.timed(lambda: cc.encode_claims(claims, store=store), repeat)
+
+    def score():
+        sims = [cc.pair_similarities(embeddings, rows, left, right) for left, right in cc.iter_pair_chunks(pairs)]
+        return np.concatenate(sims) if sims else np.zeros(0, dtype=np.float32)
+
+    sims, score_seconds = bench.timed(score, repeat)
+    ctx["scored"] = [(i, j, s) for (i, j), s in zip(pairs, sims.tolist()) if s > 0.65]
+    return bench.stage(len(claims), seconds + score_seconds, store_seconds=round(seconds, 6),
+                       score_seconds=round(score_seconds, 6), pairs=len(pairs))
+
+
+def bench_clustering(ctx, repeat):
+    from event_clusters import EventClusters
+    if "scored" not in ctx:
+        bench_embedding(ctx, 1)
+    claims = ctx["claims"]
+    comparisons = [{"claim1": claims[i], "claim2": claims[j], "similarity": round(s, 3),
+                    "label": "Core" if s > 0.85 else "Partial"} for i, j, s in ctx["scored"]]
+
+    def run():
+        clusters = EventClusters(":memory:")
+        clusters.add(comparisons)
+        clusters.save()
+        events = list(clusters.events())
+        clusters.close()
+        return events
+
+    events, seconds = bench.timed(run, repeat)
+    return bench.stage(len(comparisons), seconds, events=len(events))
+
+
+BENCHMARKS = {
+    "clean": bench_clean,
+    "timestamps": bench_timestamps,
+    "parse": bench_parse,
+    "candidates": bench_candidates,
+    "embedding": bench_embedding,
+    "clustering": bench_clustering,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Veritas per-stage microbenchmarks")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--claims", type=int, default=10_000, help="synthetic claims for the comparison stages")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--real-models", action="store_true", help="use the real embedder and sentiment models")
+    parser.add_argument("--compare", action="store_true", help="show the change against the last matching run")
+    parser.add_argument("--no-save", action="store_true", help="don't append to results.jsonl")
+    args = parser.parse_args()
+
+    if not args.real_models:
+        synthetic.use_synthetic_models()
+    params = {"claims": args.claims, "real_models": args.real_models}
+    ctx = {"claims": synthetic.generate_claims(args.claims)}
+
+    stages = {}
+    for name in args.stages:
+        try:
+            stages[name] = BENCHMARKS[name](ctx, args.repeat)
+        except ImportError as e:
+            print(f"[!] {name}: skipped ({e})")
+
+    result = {**bench.run_info("microbench", **params), "stages": stages, "peak_rss_mb": round(bench.peak_rss_mb(), 1)}
+    bench.print_stages(stages, bench.previous_result("microbench", params) if args.compare else None)
+    print(f"peak RSS: {result['peak_rss_mb']} MB")
+    if not args.no_save:
+        bench.append_result(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Veritas - Synthetic Benchmark Data
+----------------------------------
+Deterministic articles, claims and sentence vectors at any scale
+(1k -> 1M claims), shaped like the real pipeline's data:
+
+  - source mix:      weighted like the scraped outlets (LBC and MTV
+                     dominate, RSS feeds make up the rest)
+  - entity overlap:  entities are drawn Zipf-style, so a few (Beirut,
+                     Hezbollah, the army...) appear in most events and
+                     blocking buckets are as skewed as in production
+  - events:          each claim retells one event; events have 2-4 core
+                     entities and a size that is itself long-tailed
+  - date spread:     events are spread over DAYS days, claims land within
+                     a day or two of their event
+
+HashingEncoder and SyntheticSentiment stand in for the embedder and the
+sentiment pipeline (registered through model_registry) so the comparison
+code can be timed without loading models.
+
+    python benchmarks/synthetic.py --claims 100000 --out data/bench/claims
+writes claims_synthetic.jsonl that compare_claims can read (CLAIM_DIR).
+"""
+
+import os
+import sys
+import zlib
+import random
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+
+BENCH_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "backend"))
+
+import storage
+
+# ======== CONFIG ========
+SEED = 7
+DAYS = 90
+START_DATE = datetime(2025, 1, 1)
+CLAIMS_PER_EVENT = 8          # mean; actual sizes are long-tailed
+CLAIMS_PER_ARTICLE = 4
+DIM = 384                     # all-MiniLM-L6-v2 width
+
+SOURCE_MIX = {
+    "LBC": 0.30,
+    "MTV": 0.25,
+    "Al Jazeera": 0.10,
+    "An-Nahar": 0.08,
+    "Lebanon24": 0.08,
+    "The961": 0.07,
+    "Al-Akhbar": 0.06,
+    "Al-Liwa": 0.06,
+}
+BIAS = {"Al Jazeera": "center-left", "Al-Akhbar": "left-leaning, pro-resistance",
+        "Al-Liwa": "Sunni-oriented", "Lebanon24": "center"}
+
+COMMON_ENTITIES = ["Lebanon", "Beirut", "Hezbollah", "Israel", "Lebanese Army", "Parliament",
+                   "Central Bank", "United Nations", "Syria", "Tripoli", "Sidon", "Tyre"]
+_SYLLABLES = ["ka", "ra", "mi", "sa", "lo", "na", "be", "ha", "di", "ja", "ou", "el", "fa", "ti", "zo"]
+VERBS = ["said", "announced", "confirmed", "reported", "stated", "declared"]
+ACTIONS = ["an agreement on", "new measures for", "talks about", "a decision on", "an investigation into",
+           "funding for", "an attack on", "a plan for"]
+TOPICS = ["electricity supply", "the border", "fuel prices", "the budget", "reconstruction",
+          "refugee returns", "the port", "bank deposits", "elections", "the exchange rate"]
+NEGATIONS = ["denied", "rejected", "did not confirm"]
+FILLER = ["Officials spoke to reporters after the meeting on {w}.",
+          "Further details about {w} are expected in the coming days.",
+          "Sources familiar with {w} said talks would continue.",
+          "The statement came after a week of tension over {w}.",
+          "Residents of {w} described the situation as difficult."]
+
+
+def _word(rng):
+    return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def _entity_names(n, rng):
+    names = list(COMMON_ENTITIES)
+    while len(names) < n:
+        names.append(_word(rng).capitalize() + rng.choice(["", " Group", " Ministry", " Council", " Bank", ""]))
+    return names[:n]
+
+
+def generate_claims(n_claims, seed=SEED, days=DAYS, source_mix=SOURCE_MIX):
+    """
+    List of claim dicts in compare_claims.load_all_claims() shape (source,
+    sources, urls, title, url, sentence, entities, date), plus "event": the
+    synthetic event each claim was drawn from.
+    """
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    n_events = max(1, n_claims // CLAIMS_PER_EVENT)
+    entities = _entity_names(max(200, n_claims // 20), rng)
+    # Zipf-like popularity: rank r is picked with weight 1 / r^1.1.
+    popularity = 1.0 / np.arange(1, len(entities) + 1) ** 1.1
+    popularity /= popularity.sum()
+    sources, source_weights = zip(*source_mix.items())
+
+    # Entity draws are made up front: choice() with p is O(len(entities)) per call.
+    core_draws = np_rng.choice(len(entities), (n_events, 4), p=popularity).tolist()
+    extra_draws = np_rng.choice(len(entities), n_claims, p=popularity).tolist()
+
+    events = []
+    for e in range(n_events):
+        core = [entities[k] for k in dict.fromkeys(core_draws[e][:rng.randint(2, 4)])]
+        events.append({
+            "core": core,
+            "date": START_DATE + timedelta(days=rng.randrange(days), hours=rng.randrange(24)),
+            "action": rng.choice(ACTIONS),
+            "topic": rng.choice(TOPICS),
+            # Names, places and figures that only this story mentions.
+            "detail": " ".join(_word(rng) for _ in range(3)) + f" worth {rng.randint(2, 900)} million",
+        })
+    # Long-tailed event sizes: a few stories get ~20x the average coverage.
+    sizes = np_rng.lognormal(0.0, 1.0, n_events)
+    event_of = np_rng.choice(n_events, n_claims, p=sizes / sizes.sum())
+
+    claims = []
+    per_source = {}
+    for i, e in enumerate(event_of.tolist()):
+        ev = events[e]
+        source = rng.choices(sources, source_weights)[0]
+        ents = [x for x in ev["core"] if rng.random() < 0.8] or ev["core"][:1]
+        if rng.random() < 0.3:
+            ents.append(entities[extra_draws[i]])
+        verb = rng.choice(NEGATIONS) if rng.random() < 0.05 else rng.choice(VERBS)
+        date = ev["date"] + timedelta(hours=rng.randrange(-12, 48))
+        sentence = (f"{ents[0]} {verb} {ev['action']} {ev['topic']} with "
+                    f"{', '.join(ents[1:]) or 'local officials'} on {date:%d %B}, covering {ev['detail']}.")
+        n = per_source[e, source] = per_source.get((e, source), -1) + 1
+        url = f"https://example.{source.lower().replace(' ', '')}.com/{e}/{n // CLAIMS_PER_ARTICLE}"
+        claims.append({
+            "source": source,
+            "sources": [source],
+            "urls": [url],
+            "title": f"{ev['core'][0]}: {ev['action']} {ev['topic']}",
+            "url": url,
+            "sentence": sentence,
+            "entities": list(dict.fromkeys(ents)),
+            "date": date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "event": e,
+        })
+    return claims
+
+
+def claims_to_articles(claims):
+    """Group claims back into claims-file records ({source, ..., claims})."""
+    articles = {}
+    for c in claims:
+        a = articles.setdefault(c["url"], {
+            "source": c["source"], "bias": BIAS.get(c["source"], "unrated"), "title": c["title"],
+            "url": c["url"], "date": c["date"], "claims": []
+        })
+        a["claims"].append({"sentence": c["sentence"], "entities": c["entities"],
+                            "structure": {"WHO": c["entities"][:1], "WHAT": [], "WHEN": [c["date"][:10]],
+                                          "WHERE": c["entities"][1:], "HOW_MUCH": []}})
+    return list(articles.values())
+
+
+def generate_articles(n_articles, seed=SEED, days=DAYS, html=True):
+    """
+    Raw article records in the RSS scraper's shape. Texts are built from
+    claim sentences plus filler; with html=True a share of them carries
+    markup, entities and typographic quotes the way scraped text does.
+    """
+    rng = random.Random(seed)
+    claims = generate_claims(n_articles * CLAIMS_PER_ARTICLE, seed, days)
+    articles = []
+    for a in claims_to_articles(claims)[:n_articles]:
+        paragraphs = [c["sentence"] for c in a["claims"]]
+        paragraphs += [rng.choice(FILLER).format(w=_word(rng).capitalize()) for _ in range(rng.randint(4, 12))]
+        if html and rng.random() < 0.5:
+            text = "".join(f"<p>{p.replace(', covering ', ', covering &ldquo;').replace(' million.', ' million&rdquo;.')}</p>\n"
+                           for p in paragraphs)
+        else:
+            text = "\n".join(paragraphs)
+        articles.append({
+            "source": a["source"], "bias": a["bias"], "title": a["title"], "url": a["url"],
+            "date": a["date"], "authors": [], "text": text, "fetched_at": a["date"],
+        })
+    return articles
+
+
+# ======== MODEL STAND-INS ========
+
+class HashingEncoder:
+    """
+    Bag-of-words stand-in for SentenceTransformer: each word hashes to a
+    fixed random vector, a sentence is their normalized sum. Retellings of
+    the same event share most words and land close together.
+    """
+
+    def __init__(self, dim=DIM, buckets=1 << 15, seed=SEED):
+        self.dim = dim
+        self.buckets = buckets
+        self.table = np.random.default_rng(seed).standard_normal((buckets, dim)).astype(np.float32)
+
+    def encode(self, sentences, batch_size=None, convert_to_numpy=True,
+               normalize_embeddings=True, show_progress_bar=False):
+        out = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for i, s in enumerate(sentences):
+            idx = [zlib.crc32(w.encode("utf-8")) % self.buckets for w in s.lower().split()]
+            if idx:
+                out[i] = self.table[idx].sum(axis=0)
+        if normalize_embeddings:
+            out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out
+
+
+class SyntheticSentiment:
+    """Stand-in for the sentiment pipeline: NEGATIVE iff a negation appears."""
+
+    def __call__(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        labels = [{"label": "NEGATIVE" if any(n in t for n in NEGATIONS) else "POSITIVE", "score": 1.0}
+                  for t in ([texts] if single else texts)]
+        return labels
+
+
+def use_synthetic_models():
+    """Register the stand-ins as "embedder" and "sentiment" in model_registry."""
+    import model_registry as models
+    models.register("embedder")(HashingEncoder)
+    models.register("sentiment")(SyntheticSentiment)
+    models.release("embedder", "sentiment")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic claims file")
+    parser.add_argument("--claims", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=DAYS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", default="data/bench/claims")
+    parser.add_argument("--format", choices=sorted(storage.EXTENSIONS), default=None)
+    args = parser.parse_args()
+
+    claims = generate_claims(args.claims, args.seed, args.days)
+    path = storage.path_for(args.out, "claims_synthetic", args.format)
+    n = storage.write_records(path, claims_to_articles(claims), args.format, schema="claims")
+    print(f"✅ {len(claims)} claims in {n} articles → {path}")
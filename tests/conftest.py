@@ -0,0 +1,13 @@
+"""
+Test setup: the pipeline's scripts import each other as top-level modules,
+so their directories go on sys.path the same way benchmarks/bench.py does.
+"""
+
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for _p in ("backend", "backend/api", "backend/comparison", "backend/claim_extraction", "backend/web-scraping",
+           "web-scraper", "web-scraper/LBC", "web-scraper/MTV"):
+    sys.path.append(os.path.join(REPO_DIR, _p))
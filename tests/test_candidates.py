@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("tqdm")
+
+import compare_claims
+
+ENTITIES = ["Beirut", "beirut", "Aoun", "IMF", "UN", "Hezbollah", "EDL", "Tripoli"]
+DATES = ["", None, "not a date", "2025-01-05", "2025-01-07T00:00:00Z", "2025-01-03T23:59:59"]
+
+
+def synthetic_claims(n, seed):
+    rng = random.Random(seed)
+    claims = []
+    for _ in range(n):
+        if rng.random() < 0.5:
+            date = f"2025-01-{rng.randint(1, 12):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00"
+        else:
+            date = rng.choice(DATES)
+        claims.append({
+            "source": rng.choice(["LBC", "MTV", "Al Jadeed"]),
+            "entities": rng.sample(ENTITIES, rng.randint(0, 3)),
+            "date": date,
+        })
+    return claims
+
+
+@pytest.mark.parametrize("days", [0, 1, 2, 5])
+@pytest.mark.parametrize("seed", range(5))
+def test_entity_blocking_matches_brute_force(seed, days):
+    claims = synthetic_claims(300, seed)
+    stats = {}
+    blocked = list(compare_claims.generate_candidate_pairs(claims, days=days, stats=stats))
+
+    assert blocked == list(compare_claims.reference_candidate_pairs(claims, days=days))
+    assert stats["candidate_pairs"] == len(blocked)
+    assert stats["candidate_pairs"] + stats["same_source_pairs"] + stats["out_of_window_pairs"] \
+        == stats["blocked_pairs"]
@@ -0,0 +1,49 @@
+import random
+import warnings
+
+import pytest
+
+pytest.importorskip("bs4")
+
+from cleaning import clean_text, reference_clean_text
+
+CASES = [
+    "",
+    "plain text, nothing to do",
+    "<p>Beirut&nbsp;&ndash; the “cabinet” met</p><p>on Monday</p>",
+    "a</br>b<br/>c",
+    "<br>a</br>b",
+    "</b><br>a</br>a",
+    "<div>b <br>&amp;</br>aa<br/>",
+    "a</BR >b</br/>c<br>d",
+    "<img src='x.jpg'>caption</img>text",
+    "<script>var x = '</br>';</script>after",
+    "x​‪y z\x07w",
+    "<!-- note -->a<![CDATA[b]]>c",
+    "fish &chips &amp; &bogus; &#x41;",
+]
+
+# Fragments the scrapers run into, including every spelling of </br>.
+PIECES = ["a", "b ", " ", "\n", "\n\n", "\t", "</br>", "<br>", "<br/>", "<BR >", "</BR >", "<br />", "</br/>",
+          "<p>", "</p>", "<div>", "</div>", "<b>", "</b>", "&amp;", "&nbsp;", "“q”", "<!-- c -->",
+          "<img src='x.jpg'>", "</img>", "<hr/>", "</hr>", "<input type=text>", "</input>", "<wbr>", "</wbr>",
+          "<brx>", "</brx>", "<br class=\"a>b\">", "<script>x</br></script>", "&bogus", "​", " "]
+
+
+@pytest.fixture(autouse=True)
+def _quiet_bs4():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_matches_reference(text):
+    assert clean_text(text) == reference_clean_text(text)
+
+
+def test_matches_reference_on_fuzzed_fragments():
+    rng = random.Random(20)
+    for _ in range(5000):
+        text = "".join(rng.choice(PIECES) for _ in range(rng.randint(1, 10)))
+        assert clean_text(text) == reference_clean_text(text), text
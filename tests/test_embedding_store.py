@@ -0,0 +1,83 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+import embedding_store
+from embedding_store import EmbeddingStore
+
+DIM = 8
+
+
+def encode(sentences):
+    # Deterministic per sentence, so a wrong row is visible.
+    return np.stack([np.random.default_rng(sum(map(ord, s))).standard_normal(DIM) for s in sentences]).astype(np.float32)
+
+
+def filled_store(root, runs=3):
+    """Store whose first sentences go stale: each run touches only its own batch."""
+    for run in range(runs):
+        store = EmbeddingStore("test-model", root=str(root))
+        store.get_or_encode([f"run {run} sentence {i}" for i in range(20)], encode)
+        store.save()
+    return EmbeddingStore("test-model", root=str(root))
+
+
+def check_lookups(store, runs=3):
+    sentences = [f"run {run} sentence {i}" for run in range(runs) for i in range(20)]
+    rows = store._lookup(np.array([embedding_store.sentence_key(s) for s in sentences], dtype="S20"))
+    present = [s for s, row in zip(sentences, rows) if row >= 0]
+    got = store.get_or_encode(present, lambda _: pytest.fail("stored sentence re-encoded"))
+    np.testing.assert_array_equal(got, encode(present))
+    return len(present)
+
+
+def test_compact_keeps_lookups_consistent(tmp_path):
+    store = filled_store(tmp_path)
+    assert store.compact(max_age=2) == 40
+    assert check_lookups(EmbeddingStore("test-model", root=str(tmp_path))) == 20
+
+
+def test_crash_before_switch_keeps_old_generation(tmp_path, monkeypatch):
+    store = filled_store(tmp_path)
+    monkeypatch.setattr(EmbeddingStore, "save", lambda self: (_ for _ in ()).throw(OSError("crash")))
+    with pytest.raises(OSError):
+        store.compact(max_age=2)
+    monkeypatch.undo()
+
+    reopened = EmbeddingStore("test-model", root=str(tmp_path))
+    assert reopened.generation == 0 and reopened.count == 60
+    assert check_lookups(reopened) == 60
+    assert sorted(os.listdir(reopened.dir)) == ["keys.npy", "last_used.npy", "meta.json", "vectors.bin"]
+
+
+def test_crash_after_switch_uses_new_generation(tmp_path, monkeypatch):
+    store = filled_store(tmp_path)
+    monkeypatch.setattr(os, "remove", lambda path: (_ for _ in ()).throw(OSError("crash")))
+    with pytest.raises(OSError):
+        store.compact(max_age=2)
+    monkeypatch.undo()
+
+    reopened = EmbeddingStore("test-model", root=str(tmp_path))
+    assert reopened.generation == 1 and reopened.count == 20
+    assert check_lookups(reopened) == 20
+    assert sorted(os.listdir(reopened.dir)) == ["keys.1.npy", "last_used.1.npy", "meta.json", "vectors.1.bin"]
+
+
+def test_store_lock_excludes_a_second_holder(tmp_path, capsys):
+    events = []
+
+    def second():
+        with embedding_store.store_lock(str(tmp_path), wait_message="waiting"):
+            events.append("second")
+
+    with embedding_store.store_lock(str(tmp_path)):
+        t = threading.Thread(target=second)
+        t.start()
+        t.join(0.3)
+        assert t.is_alive()
+        events.append("first released")
+    t.join(5)
+    assert events == ["first released", "second"]
+    assert "waiting" in capsys.readouterr().out
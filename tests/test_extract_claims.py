@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("tqdm")
+
+import extract_claims
+
+WIRE = ("The finance ministry said on Monday that the state electricity company would receive an "
+        "emergency advance to buy fuel for its power plants, after a week of blackouts across Beirut "
+        "and the north, and that parliament would vote on the new budget before the end of the month. "
+        "Officials at the company said the advance would cover about three weeks of fuel imports, and "
+        "that talks with the central bank on a longer arrangement were expected to resume next week "
+        "once the cabinet had approved the terms set out by the ministry.")
+
+
+class Crash(Exception):
+    pass
+
+
+def write_raw(path, *articles):
+    with open(path, "w", encoding="utf-8") as f:
+        for url, text in articles:
+            f.write(json.dumps({"source": "Wire", "bias": "center", "title": url, "url": url, "date": "2025-01-01",
+                                "authors": [], "text": text, "fetched_at": "2025-01-01 00:00:00"}) + "\n")
+
+
+@pytest.fixture
+def extractor(tmp_path, monkeypatch):
+    """extract_claims run in tmp_path with a stand-in for the spaCy/NER batch."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data" / "raw").mkdir(parents=True)
+    calls = {"texts": [], "crash_on": None}
+
+    def fake_batch(texts, n_process=1, **kwargs):
+        for text in texts:
+            if calls["crash_on"] and calls["crash_on"] in text:
+                raise Crash()
+            calls["texts"].append(text)
+            yield [{"sentence": text.split(",")[0], "entities": [], "structure": {}}]
+
+    monkeypatch.setattr(extract_claims, "extract_claims_batch", fake_batch)
+    return calls
+
+
+def test_near_duplicate_found_after_run_died_mid_way(tmp_path, extractor):
+    raw = tmp_path / "data" / "raw"
+    local = "Local news: " + WIRE[::-1]
+    write_raw(raw / "articles_2025-01-01.jsonl", ("https://a.example/1", WIRE))
+    write_raw(raw / "articles_2025-01-02.jsonl", ("https://b.example/1", WIRE.replace("Monday", "Tuesday")),
+              ("https://b.example/2", local))
+
+    # The first file is committed to the manifest, then the run dies in the second.
+    extractor["crash_on"] = "Local news"
+    with pytest.raises(Crash):
+        extract_claims.process_articles()
+
+    extractor["crash_on"], extractor["texts"] = None, []
+    extract_claims.process_articles()
+    assert extractor["texts"] == [local]
+    groups = list(extract_claims.storage.iter_records("data/claims/duplicate_groups.jsonl"))
+    assert [[m["url"] for m in g["members"]] for g in groups] == [["https://b.example/1"]]
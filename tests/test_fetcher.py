@@ -0,0 +1,105 @@
+"""fetcher.py against a local aiohttp server standing in for a news site."""
+
+import time
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp import web
+
+from fetcher import fetch_iter
+
+
+class StandInSite:
+    """
+    Local HTTP server with per-path behaviour:
+      /ok/<n>        200 after `delay` seconds, tracking concurrent requests
+      /flaky/<n>     503 for the first `failures` requests of each path, then 200
+      /slow/<n>      first request of each path hangs `hang` seconds, then 200
+    """
+
+    def __init__(self, delay=0.0, failures=2, hang=1.0):
+        self.delay, self.failures, self.hang = delay, failures, hang
+        self.hits = {}
+        self.times = []
+        self.in_flight = self.max_in_flight = 0
+        app = web.Application()
+        app.router.add_get("/{kind}/{n}", self.handle)
+        self.runner = web.AppRunner(app)
+
+    async def start(self):
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        host, port = self.runner.addresses[0][:2]
+        self.base = f"http://{host}:{port}"
+        return self
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def handle(self, request):
+        path = request.path
+        n = self.hits[path] = self.hits.get(path, 0) + 1
+        self.times.append(time.monotonic())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            kind = request.match_info["kind"]
+            if kind == "flaky" and n <= self.failures:
+                return web.Response(status=503, text="try later")
+            if kind == "slow" and n == 1:
+                await asyncio.sleep(self.hang)
+            await asyncio.sleep(self.delay)
+            return web.Response(text=f"page {path}")
+        finally:
+            self.in_flight -= 1
+
+
+def fetch_all(site, paths, **kwargs):
+    async def scenario():
+        await site.start()
+        try:
+            return [r async for r in fetch_iter([site.base + p for p in paths], **kwargs)]
+        finally:
+            await site.stop()
+    return asyncio.run(scenario())
+
+
+def test_retries_5xx_until_success():
+    site = StandInSite(failures=2)
+    results = fetch_all(site, ["/flaky/1", "/flaky/2"], rate=0, retries=3, backoff=0.01)
+    assert all(r["status"] == 200 and r["error"] is None for r in results)
+    assert [r["attempts"] for r in results] == [3, 3]
+
+
+def test_gives_up_after_retries():
+    site = StandInSite(failures=10)
+    [result] = fetch_all(site, ["/flaky/1"], rate=0, retries=2, backoff=0.01)
+    assert result["error"] == "HTTP 503" and result["attempts"] == 3 and result["text"] is None
+
+
+def test_retries_a_timed_out_request():
+    site = StandInSite(hang=1.0)
+    [result] = fetch_all(site, ["/slow/1"], rate=0, retries=2, backoff=0.01, timeout=0.2)
+    assert result["status"] == 200 and result["error"] is None
+    assert result["attempts"] == 2
+
+
+def test_per_host_connection_cap():
+    site = StandInSite(delay=0.05)
+    results = fetch_all(site, [f"/ok/{i}" for i in range(24)], concurrency=12, per_host=3, rate=0)
+    assert len(results) == 24 and all(r["error"] is None for r in results)
+    assert site.max_in_flight == 3
+
+
+def test_token_bucket_spaces_requests_to_one_host():
+    site = StandInSite()
+    rate, burst, n = 20.0, 2, 12
+    results = fetch_all(site, [f"/ok/{i}" for i in range(n)], concurrency=8, per_host=8, rate=rate, burst=burst)
+    assert all(r["error"] is None for r in results)
+    # The first `burst` requests go out at once; the rest at `rate` per second.
+    span = max(site.times) - min(site.times)
+    assert span >= (n - burst) / rate * 0.9
+    assert span < (n - burst) / rate + 0.5
@@ -0,0 +1,29 @@
+import time
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("uvicorn")
+server = pytest.importorskip("server")
+
+
+def test_timed_out_job_keeps_its_slot_until_the_thread_finishes():
+    async def scenario():
+        pool = server.InferencePool(workers=1, max_queue=0)
+        slow = pool.submit(time.sleep, 0.3)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(slow, timeout=0.05)
+
+        assert pool.pending == 1
+        with pytest.raises(server.PoolFull):
+            pool.submit(time.sleep, 0)
+
+        await asyncio.sleep(0.4)
+        assert pool.pending == 0
+        assert await pool.submit(lambda: 42) == 42
+        await asyncio.sleep(0)
+        assert pool.pending == 0
+        pool.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,30 @@
+import re
+
+import pytest
+
+import ingestion
+
+ISO = re.compile(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ")
+
+
+@pytest.mark.parametrize("raw,fmt,expected", [
+    ("2025-01-17 13:44:00.123456", "RSS", "2025-01-17T13:44:00Z"),
+    ("2025-01-17 15:44:00+02:00", "RSS", "2025-01-17T13:44:00Z"),
+    ("Fri, 17 Jan 2025 13:44:00 +0200", "RSS", "2025-01-17T11:44:00Z"),
+    ("2025-01-17T13:44:00.5Z", "RSS", "2025-01-17T13:44:00Z"),
+    ("17-01-2023 | 10:06", "LBC", "2023-01-17T10:06:00Z"),
+    ("2025-01-17T13:44:00", "MTV", "2025-01-17T13:44:00Z"),
+    ("not a date", "RSS", None),
+    ("", "RSS", None),
+])
+def test_timestamps_have_one_format(raw, fmt, expected):
+    assert ingestion._timestamp(raw, fmt) == expected
+
+
+def test_adapters_normalize_fetch_times():
+    rss = ingestion.from_rss({"url": "u", "date": "2025-01-17 13:44:00", "fetched_at": "2025-01-17 14:00:00.250000"})
+    lbc = ingestion.from_lbc({"url": "u", "published_at": "2025-01-17T13:44:00Z",
+                              "scraped_at": "2025-01-17T14:00:00.250000Z"})
+    for article in (rss, lbc):
+        assert ISO.fullmatch(article.published_at)
+        assert article.fetched_at == "2025-01-17T14:00:00Z"
@@ -0,0 +1,59 @@
+import json
+import random
+
+import pytest
+
+pytest.importorskip("bs4")
+
+from lbcArticleScraper import parse_lbc_article
+from parse_benchmark import load_fixtures
+
+PAGES = load_fixtures()
+SCRAPED_AT = "2000-01-01T00:00:00Z"
+DATE = '<span id="ctl00_MainContent_ArticleDetailsPresentation16_lblDate">01-05-2024 | 10:00</span>'
+
+
+def _both(html, url):
+    return [json.dumps(parse_lbc_article(html, url, SCRAPED_AT, fast=fast), ensure_ascii=False)
+            for fast in (True, False)]
+
+
+@pytest.mark.parametrize("url,html", PAGES, ids=[url.split("/")[-2] for url, _ in PAGES])
+def test_fast_parse_matches_full_parse_on_fixture_pages(url, html):
+    fast, full = _both(html, url)
+    assert fast == full
+
+
+def _page(long_desc):
+    return f'<html><body>{DATE}<div class="LongDesc">{long_desc}</div><p>tail</p></body></html>'
+
+
+@pytest.mark.parametrize("long_desc", [
+    "<div>a</br>b<br/>c</div>",
+    "<div>a</BR >b</br/>c<br>d</div>",
+    "<div>a</br></div><div>x</br></br>y</div>",
+    "<div><p>a</br><p>b</div>",
+    "<div>a<br>b</br>c</div>",
+    "<div>para one</p>para two</div>",
+    "<div>a</span>b<em>By Jane Doe</em></em>c</div>",
+    "<div><p>x</p>a</p>b<!-- </p> -->c</div>",
+    "<div><b>a<i>b</b>c</i></div><div>d</div>",
+    "<div><span/>a</div>",
+])
+def test_fast_parse_treats_stray_end_tags_like_html_parser(long_desc):
+    fast, full = _both(_page(long_desc), "https://www.lbcgroup.tv/news/1/x/en")
+    assert fast == full
+
+
+TOKENS = ["word", "two words", "&amp;", "<em>By Jane Doe</em>", "<b>", "</b>", "<i>", "</i>", "<p>", "</p>",
+          "<span>", "</span>", "<span/>", "</em>", "<br>", "<br/>", "</br>", "</BR >", "<div>", "</div>",
+          "<li>", "</li>", "<a href='/x'>", "</a>", "<!-- note -->", "<bannerinjection>", "</bannerinjection>",
+          "\n", " "]
+
+
+def test_fast_parse_matches_full_parse_on_random_markup():
+    rng = random.Random(0)
+    for _ in range(500):
+        long_desc = "<div>" + "".join(rng.choice(TOKENS) for _ in range(rng.randint(1, 20))) + "</div>"
+        fast, full = _both(_page(long_desc), "https://www.lbcgroup.tv/news/1/x/en")
+        assert fast == full, long_desc
@@ -0,0 +1,46 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("requests")
+
+import mtvScraper
+
+
+def item(n, published):
+    return {"Url": f"/en/news/{n}", "publishDate": published, "Title": f"title {n}", "Body": "body"}
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    feed = []
+    monkeypatch.setattr(mtvScraper, "out_path", str(tmp_path / "mtv_articles.jsonl"))
+    monkeypatch.setattr(mtvScraper, "state_path", str(tmp_path / "mtv_ingest_state.json"))
+    monkeypatch.setattr(mtvScraper, "fetch_chunk", lambda session, start, end: feed[start:end])
+    return feed
+
+
+def ingested_urls():
+    with open(mtvScraper.out_path, encoding="utf-8") as f:
+        return [json.loads(line)["url"] for line in f]
+
+
+def test_articles_in_the_watermark_second_are_not_skipped(site):
+    site[:] = [item(2, "2024-01-01T10:00:00"), item(1, "2024-01-01T09:00:00")]
+    assert mtvScraper.ingest(chunk_size=1) == 2
+
+    # A3 was published in the same second as the watermark, after the last run.
+    site[:] = [item(3, "2024-01-01T10:00:00")] + site
+    assert mtvScraper.ingest(chunk_size=1) == 1
+    assert mtvScraper.ingest(chunk_size=1) == 0
+    assert sorted(ingested_urls()) == sorted(f"https://www.mtv.com.lb/en/news/{n}" for n in (1, 2, 3))
+
+
+def test_watermark_urls_derived_from_existing_dump(site):
+    site[:] = [item(2, "2024-01-01T10:00:00"), item(1, "2024-01-01T09:00:00")]
+    mtvScraper.ingest()
+    state = mtvScraper.load_state()
+
+    os.remove(mtvScraper.state_path)
+    assert mtvScraper.load_state() == state
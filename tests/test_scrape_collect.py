@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("feedparser")
+pytest.importorskip("newspaper")
+
+import scrape
+import storage
+from feed_state import FeedState
+
+SOURCES = [{"name": "Feed A", "rss": "https://a.example/rss", "bias": "center"},
+           {"name": "Feed B", "rss": "https://b.example/rss", "bias": "center"}]
+URLS = {"Feed A": [f"https://a.example/news/{n}" for n in range(4)],
+        "Feed B": [f"https://b.example/news/{n}" for n in range(4)]}
+
+
+class Site:
+    """Feeds, downloads and parsing without the network or newspaper3k."""
+
+    def __init__(self, monkeypatch, tmp_path, urls=URLS):
+        self.urls = urls
+        self.downloaded = []
+        self.parsed = 0
+        self.interrupt_after = None
+        monkeypatch.setattr(scrape, "SAVE_DIR", str(tmp_path))
+        monkeypatch.setattr(scrape, "news_sources", SOURCES)
+        monkeypatch.setattr(scrape, "ProcessPoolExecutor", ThreadPoolExecutor)
+        monkeypatch.setattr(scrape, "poll_feed", self.poll_feed)
+        monkeypatch.setattr(scrape, "download_article", self.download_article)
+        monkeypatch.setattr(scrape, "parse_job", self.parse_job)
+
+    def poll_feed(self, source, etag=None, modified=None):
+        if etag == "v1":
+            return {"status": 304, "etag": None, "modified": None, "entries": []}
+        entries = [{"title": url, "url": url, "published": "", "source": source["name"], "bias": source["bias"]}
+                   for url in self.urls[source["name"]]]
+        return {"status": 200, "etag": "v1", "modified": None, "entries": entries}
+
+    def download_article(self, entry, limiter=None):
+        self.downloaded.append(entry["url"])
+        return "<html></html>"
+
+    def parse_job(self, entry, html):
+        self.parsed += 1
+        if self.parsed == self.interrupt_after:
+            raise KeyboardInterrupt
+        article = {"source": entry["source"], "bias": entry["bias"], "title": entry["title"],
+                   "url": entry["url"], "date": "", "authors": [], "text": "body", "fetched_at": ""}
+        return article, {}
+
+
+def stored_urls(directory):
+    return sorted(a["url"] for a in storage.iter_dir(directory, prefix="articles_"))
+
+
+def test_interrupted_poll_fetches_its_articles_again(monkeypatch, tmp_path):
+    site = Site(monkeypatch, tmp_path)
+    state = FeedState(str(tmp_path / "feed_state.sqlite"))
+    all_urls = sorted(URLS["Feed A"] + URLS["Feed B"])
+
+    site.interrupt_after = 5
+    with pytest.raises(KeyboardInterrupt):
+        scrape.collect(state)
+    assert state.seen_count() == 0
+    assert state.validators(SOURCES[0]["rss"]) == (None, None)
+    assert stored_urls(str(tmp_path)) == []
+    assert not list(tmp_path.glob("*.part"))
+
+    site.interrupt_after, site.downloaded = None, []
+    scrape.collect(state)
+    assert sorted(site.downloaded) == all_urls
+    assert stored_urls(str(tmp_path)) == all_urls
+    assert state.seen_count() == len(all_urls)
+
+    site.downloaded = []
+    scrape.collect(state)
+    assert site.downloaded == []
+    state.close()
+
+
+def test_article_listed_by_two_feeds_is_downloaded_once(monkeypatch, tmp_path):
+    shared = "https://a.example/news/0"
+    urls = {"Feed A": URLS["Feed A"], "Feed B": URLS["Feed B"] + [shared, shared + "/"]}
+    site = Site(monkeypatch, tmp_path, urls)
+    state = FeedState(str(tmp_path / "feed_state.sqlite"))
+
+    scrape.collect(state)
+    assert sorted(site.downloaded) == sorted(URLS["Feed A"] + URLS["Feed B"])
+    assert stored_urls(str(tmp_path)) == sorted(site.downloaded)
+    state.close()
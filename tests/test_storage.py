@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+import storage
+
+pytest.importorskip("pyarrow")
+
+
+def _article(i, **fields):
+    record = {"source": "LBC", "bias": "center", "title": f"t{i}", "url": f"https://x/{i}", "date": None,
+              "authors": [], "text": "body", "fetched_at": "2025-01-01 00:00:00"}
+    record.update(fields)
+    return record
+
+
+def test_parquet_later_batch_fills_a_column_null_in_the_first(tmp_path):
+    path = str(tmp_path / "articles_x.parquet")
+    first = [_article(i) for i in range(3)]
+    second = [_article(3, date="2025-01-02", authors=["A. Writer"])]
+    with storage.RecordWriter(path, schema="articles", batch_rows=3) as w:
+        w.write_many(first + second)
+
+    out = list(storage.iter_records(path))
+    assert out == first + second
+
+
+def test_parquet_claims_with_empty_entity_slots_first(tmp_path):
+    path = str(tmp_path / "claims_x.parquet")
+    empty = {"WHO": [], "WHAT": [], "WHEN": [], "WHERE": [], "HOW_MUCH": []}
+    full = {"WHO": ["Army"], "WHAT": [], "WHEN": ["Monday"], "WHERE": ["Beirut"], "HOW_MUCH": ["$5 million"]}
+    records = [
+        {"source": "MTV", "bias": "b", "title": "a", "url": "u1", "date": "",
+         "claims": [{"sentence": "s1", "entities": [], "structure": empty}]},
+        {"source": "MTV", "bias": "b", "title": "b", "url": "u2", "date": "2025-01-01",
+         "claims": [{"sentence": "s2", "entities": ["Army", "Beirut"], "structure": full}]},
+    ]
+    with storage.RecordWriter(path, schema="claims", batch_rows=1) as w:
+        w.write_many(records)
+
+    assert list(storage.iter_records(path)) == records
+
+
+def test_kind_of():
+    assert storage.kind_of("data/raw/articles_2025-01-01.jsonl") == "articles"
+    assert storage.kind_of("data/claims/claims_articles_2025-01-01.parquet") == "claims"
+    assert storage.kind_of("data/events/events_clusters.json") == "events"
+    assert storage.kind_of("data/claims/duplicate_groups.jsonl") == "duplicate_groups"
+    assert storage.kind_of("data/other.jsonl") is None
+
+
+_STRUCTURE = {"WHO": ["Army"], "WHAT": [], "WHEN": ["Monday"], "WHERE": ["Beirut"], "HOW_MUCH": []}
+_MEMBER = {"source": "LBC", "url": "https://x/1", "bias": "center", "title": "t1", "date": "2025-01-01"}
+_EVENT_CLAIM = {"source": "MTV", "sources": ["MTV"], "urls": ["https://x/2"], "title": "t2", "url": "https://x/2",
+                "sentence": "The army deployed in Beirut.", "entities": ["Beirut"], "date": None,
+                "polarity": "POSITIVE"}
+ROUND_TRIP = {
+    "articles": [_article(0), _article(1, date="2025-01-02", authors=["A. Writer", "B. Writer"], text="é “q” ")],
+    "claims": [
+        {"source": "LBC", "bias": "center", "title": "t", "url": "https://x/1", "date": "2025-01-01",
+         "claims": [{"sentence": "s", "entities": ["Army"], "structure": _STRUCTURE}]},
+        {"source": "MTV", "bias": "right", "title": "u", "url": "https://x/2", "date": None, "claims": []},
+    ],
+    "events": [
+        {"event_id": "e1", "size": 2, "edge_count": 1, "average_similarity": 0.8125,
+         "label_counts": {"Core": 1, "Partial": 0, "Disputed": 0}, "dominant_label": "Core",
+         "claims": [_EVENT_CLAIM, dict(_EVENT_CLAIM, sources=["LBC", "MTV"], date="2025-01-01")]},
+    ],
+    "duplicate_groups": [{"canonical": "https://x/1", "members": [_MEMBER, dict(_MEMBER, source="MTV")]}],
+}
+
+
+@pytest.mark.parametrize("kind", sorted(ROUND_TRIP))
+def test_jsonl_and_parquet_round_trip_identically(tmp_path, kind):
+    records = ROUND_TRIP[kind]
+    jsonl = storage.path_for(str(tmp_path), f"{kind}_x", "jsonl")
+    parquet = storage.path_for(str(tmp_path), f"{kind}_x", "parquet")
+    assert storage.write_records(jsonl, records, schema=kind) == len(records)
+    assert storage.write_records(parquet, records, schema=kind) == len(records)
+
+    assert list(storage.iter_records(jsonl)) == records
+    assert list(storage.iter_records(parquet)) == records
+
+    columns = list(records[0])[:2]
+    assert list(storage.iter_records(parquet, columns)) == list(storage.iter_records(jsonl, columns))
+
+
+def test_migrated_json_reads_back_the_same(tmp_path):
+    legacy = tmp_path / "claims_x.json"
+    legacy.write_text(json.dumps(ROUND_TRIP["claims"]), encoding="utf-8")
+    for fmt in ("jsonl", "parquet"):
+        assert list(storage.iter_records(storage.migrate(str(legacy), fmt))) == ROUND_TRIP["claims"]
@@ -1,7 +1,12 @@
 import json
 import time
+import asyncio
+import argparse
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4 import FeatureNotFound
+from bs4.builder import HTMLTreeBuilder
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import os
 import re
@@ -9,9 +14,13 @@ import sys
 
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(parent_dir)
+sys.path.append(os.path.join(parent_dir, "..", "backend"))
 
 from timestamp_standard import parse_timestamp
 from cleaning import clean_text, clean_url
+from fetcher import fetch_iter
+from crawl_state import CrawlState, default_worker_id
+from instrumentation import metrics, Laps
 
 # -----------------------------
 # CONFIG
@@ -19,10 +28,151 @@ from cleaning import clean_text, clean_url
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 URL_FILE = "lbc_article_urls.txt"
 OUTPUT_FILE = f"{BASE_DIR}/../../data/lbc_articles.jsonl"
+STATE_FILE = f"{BASE_DIR}/../../data/lbc_crawl_state.sqlite"
 
-START_INDEX = 8495 #0  # where to resume scraping
+CONCURRENCY = 16      # simultaneous requests overall
+PER_HOST = 8          # open connections to lbcgroup.tv
+RATE = 8.0            # requests / second to lbcgroup.tv
+RETRIES = 3
+CLAIM_BATCH = 500     # URLs claimed from the state DB at a time
+PARSE_WORKERS = os.cpu_count() or 2   # HTML parsing processes (0 = parse inline)
+PARSE_BACKLOG = 64    # fetched pages allowed to wait for a parser
+PARSER = "lxml"       # falls back to html.parser when lxml isn't installed
 
 
+# -----------------------------
+# PARSING
+# -----------------------------
+# Only these elements are read, so the parser builds just their subtrees
+# instead of the whole ASP.NET page.
+ARTICLE_IDS = {
+    "ctl00_MainContent_ArticleDetailsPresentation16_lblTitle",
+    "ctl00_MainContent_ArticleDetailsPresentation16_lblDate",
+    "ctl00_MainContent_ArticleDetailsPresentation16_lblCatTitle",
+    "ctl00_MainContent_ArticleDetailsPresentation16_ArticleImage",
+    "ctl00_MainContent_ArticleDetailsDescription15_lblShortDesc",
+}
+
+
+def _wanted(name, attrs):
+    attrs = attrs or {}
+    if attrs.get("id") in ARTICLE_IDS:
+        return True
+    classes = attrs.get("class") or ""
+    return "LongDesc" in (classes.split() if isinstance(classes, str) else classes)
+
+
+try:
+    from bs4 import ElementFilter   # bs4 >= 4.13
+
+    class _ArticleFilter(ElementFilter):
+        def allow_tag_creation(self, nsprefix, name, attrs):
+            return _wanted(name, attrs)
+
+        def allow_string_creation(self, string):
+            # Only strings inside the wanted subtrees.
+            return False
+
+    ARTICLE_STRAINER = _ArticleFilter()
+except ImportError:
+    ARTICLE_STRAINER = SoupStrainer(_wanted)
+
+
+# The fast path has to give the same records as the full html.parser tree.
+# Two things differ between the parsers:
+#   - html.parser ends the current text node at every end tag it sees, even
+#     one that closes nothing; lxml drops stray end tags and joins the text
+#     around them ("one</p>two" reads "one two" vs "onetwo"). An empty
+#     comment before each end tag gives lxml the same text boundaries. Void
+#     end tags (</br>) create no element in html.parser: one following an
+#     unclosed start tag of that name is swallowed, any other only ends the
+#     text node.
+#   - html.parser nests tags exactly as written and closes whatever is open
+#     above a matching end tag; lxml repairs misnested markup its own way.
+#     Pages where that happens inside an article element are parsed in full.
+VOID_TAGS = HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS
+# Elements both parsers close implicitly at an enclosing end tag
+# ("<div><p>text</div>").
+OPTIONAL_END = frozenset({"p", "li", "dt", "dd"})
+TAG_EVENTS = re.compile(
+    r"<!--.*?-->"
+    r"|<(script|style)\b[^>]*>.*?</\1\s*>"
+    r"|<(/?)([a-zA-Z][^\t\n\r\f />\x00]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>",
+    re.S | re.I
+)
+ATTR = re.compile(r"""\b(id|class)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+TEXT_BREAK = "<!---->"
+
+
+def _wanted_tag(name, attrs):
+    if "LongDesc" not in attrs and "ctl00_MainContent_Article" not in attrs:
+        return False
+    found = {k.lower(): a or b or c for k, a, b, c in ATTR.findall(attrs)}
+    return _wanted(name, found)
+
+
+def prepare_fast(html):
+    """
+    (html with TEXT_BREAKs, whether lxml builds the article elements the
+    way html.parser does). Tracks html.parser's stack of open tags.
+    """
+    stack = []
+    unclosed_void = []
+    article_depth = None   # stack depth of the article element we are in
+    clean = True
+
+    def mark(m):
+        nonlocal article_depth, clean
+        tag, closing, name = m.group(0), m.group(2), m.group(3)
+        if not name:
+            return tag
+        name = name.lower()
+        inside = article_depth is not None
+
+        if name in VOID_TAGS:
+            if not closing:
+                if not tag.endswith("/>"):
+                    unclosed_void.append(name)
+                return tag
+            if name in unclosed_void:
+                unclosed_void.remove(name)
+                return ""
+            return TEXT_BREAK
+
+        if not closing:
+            if tag.endswith("/>"):
+                # html.parser: an empty element; lxml: an open tag.
+                if inside:
+                    clean = False
+                return tag
+            if not inside and _wanted_tag(name, m.group(4)):
+                article_depth = len(stack)
+            stack.append(name)
+            return tag
+
+        if stack and stack[-1] == name:
+            stack.pop()
+        elif name in stack:
+            at = len(stack) - 1 - stack[::-1].index(name)
+            if inside and not OPTIONAL_END.issuperset(stack[at + 1:]):
+                clean = False
+            del stack[at:]
+        if inside and len(stack) <= article_depth:
+            article_depth = None
+        return TEXT_BREAK + tag
+
+    return TAG_EVENTS.sub(mark, html), clean
+
+
+def make_soup(html, fast=True):
+    """Full html.parser tree, or (fast) just the article subtrees built by lxml."""
+    marked, clean = prepare_fast(html) if fast else (html, False)
+    if not clean:
+        return BeautifulSoup(html, "html.parser")
+    try:
+        return BeautifulSoup(marked, PARSER, parse_only=ARTICLE_STRAINER)
+    except FeatureNotFound:
+        return BeautifulSoup(marked, "html.parser", parse_only=ARTICLE_STRAINER)
 
 
 # -----------------------------
@@ -30,10 +180,14 @@ START_INDEX = 8495 #0  # where to resume scraping
 # -----------------------------
 def scrape_lbc_article(url):
     r = requests.get(url, timeout=10)
-    soup = BeautifulSoup(r.text, "html.parser")
+    return parse_lbc_article(r.text, url)
+
+
+def parse_lbc_article(html, url, scraped_at=None, fast=True):
+    soup = make_soup(html, fast)
 
     source = "LBC"
-    scraped_at = datetime.utcnow().isoformat() + "Z"
+    scraped_at = scraped_at or datetime.utcnow().isoformat() + "Z"
 
     # TITLE
     title_tag = soup.select_one("#ctl00_MainContent_ArticleDetailsPresentation16_lblTitle")
@@ -113,63 +267,133 @@ def scrape_lbc_article(url):
     return article
 
 
-# -----------------------------
-# LOAD URL LIST
-# -----------------------------
-with open(URL_FILE, "r", encoding="utf-8") as f:
-    urls = [line.strip() for line in f if line.strip()]
-
-total = len(urls)
-print(f"Loaded {total} URLs.")
-print(f"Starting from index {START_INDEX}.")
-
-
-# -----------------------------
-# PERSISTENT DUPLICATE SET
-# -----------------------------
-already = set()
-if os.path.exists(OUTPUT_FILE):
-    print("Loading existing scraped URLs...")
-    with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-        for line in f:
-            try:
-                obj = json.loads(line)
-                u = obj.get("url")
-                if u:
-                    already.add(u)
-            except:
-                pass
-
-print(f"Loaded {len(already)} previously scraped URLs.\n")
+def parse_job(html, url):
+    """Process-pool entry point: (article, None, laps) or (None, error, laps)."""
+    laps = Laps()
+    try:
+        with laps("parse"):
+            article = parse_lbc_article(html, url)
+    except Exception as e:
+        return None, f"parse: {e}", laps.export()
+    return article, None, laps.export()
 
 
 # -----------------------------
 # MAIN SCRAPING LOOP
 # -----------------------------
-with open(OUTPUT_FILE, "a", encoding="utf-8") as out:
-    for i, url in enumerate(urls, start=1):
-
-        if i < START_INDEX:
-            continue
-
-        print(f"Scraping {i} / {total}: {url}")
-
-        if url in already:
-            print("   → Already scraped, skipping.")
-            continue
-
-        try:
-            article = scrape_lbc_article(url)
-
-            out.write(json.dumps(article, ensure_ascii=False) + "\n")
-            out.flush()
-
-            already.add(url)
-
-           # time.sleep(0.5)  # safer + faster balance
-
-        except Exception as e:
-            print("   → FAILED:", e)
-            time.sleep(3)  # slow down after failure
-
-print("Done.")
\ No newline at end of file
+async def scrape_urls(urls, output_file=OUTPUT_FILE, concurrency=CONCURRENCY,
+                      per_host=PER_HOST, rate=RATE, retries=RETRIES, state=None, pool=None,
+                      parse_backlog=PARSE_BACKLOG):
+    """
+    Fetch `urls` concurrently and append one JSON line per parsed article.
+    Pages are parsed in `pool` (a ProcessPoolExecutor) while fetching
+    continues; without a pool they are parsed inline. Lines are written in
+    completion order, so the file is order-independent. With a CrawlState,
+    each URL is marked fetched/failed as it completes.
+    """
+    loop = asyncio.get_running_loop()
+    done = failed = 0
+    started = time.monotonic()
+    parsing = {}
+
+    def record(out, url, article, error, attempts):
+        nonlocal done, failed
+        if error:
+            failed += 1
+            metrics.log("failed URLs", "   → FAILED: %s (%s, %d attempts)", url, error, attempts, every=20)
+            if state:
+                state.mark_failed(url, error)
+            return
+
+        out.write(json.dumps(article, ensure_ascii=False) + "\n")
+        # Flush before recording success so a crash never marks a URL
+        # fetched without its line on disk.
+        out.flush()
+        if state:
+            state.mark_fetched(url)
+        done += 1
+        if done % 100 == 0:
+            rate_now = done / max(time.monotonic() - started, 1e-9)
+            print(f"Scraped {done} / {len(urls)} ({rate_now:.1f} articles/sec, {failed} failed)")
+
+    async def drain(out, block_until):
+        while len(parsing) > block_until:
+            finished, _ = await asyncio.wait(parsing, return_when=asyncio.FIRST_COMPLETED)
+            for fut in finished:
+                url, attempts = parsing.pop(fut)
+                article, error, laps = fut.result()
+                metrics.add_laps(laps)
+                record(out, url, article, error, attempts)
+
+    with open(output_file, "a", encoding="utf-8") as out:
+        async for result in fetch_iter(urls, concurrency=concurrency, per_host=per_host,
+                                       rate=rate, burst=per_host, retries=retries):
+            url = result["url"]
+            metrics.record("fetch", result["elapsed"], errors=int(bool(result["error"])))
+            if result["error"]:
+                record(out, url, None, result["error"], result["attempts"])
+            elif pool is None:
+                article, error, laps = parse_job(result["text"], url)
+                metrics.add_laps(laps)
+                record(out, url, article, error, result["attempts"])
+            else:
+                fut = loop.run_in_executor(pool, parse_job, result["text"], url)
+                parsing[fut] = (url, result["attempts"])
+                # Bound pages held in memory while parsers catch up.
+                await drain(out, parse_backlog)
+        await drain(out, 0)
+
+    return done, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent, resumable LBC article scraper")
+    parser.add_argument("--order", choices=["asc", "desc"], default="asc",
+                        help="walk the URL file forwards or backwards")
+    parser.add_argument("--from-index", type=int, help="first 1-based URL file index to claim")
+    parser.add_argument("--to-index", type=int, help="last 1-based URL file index to claim")
+    parser.add_argument("--worker", default=default_worker_id())
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--per-host", type=int, default=PER_HOST)
+    parser.add_argument("--rate", type=float, default=RATE, help="requests/second per host")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS,
+                        help="HTML parsing processes (0 = parse in the fetch loop)")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--state", default=STATE_FILE)
+    args = parser.parse_args()
+
+    state = CrawlState(args.state)
+    added = state.seed_from_file(URL_FILE)
+    migrated = state.import_fetched_jsonl(args.output)
+    print(f"Crawl state: {state.count()} URLs ({added} new, {migrated} imported from output) → {state.summary()}")
+
+    pool = ProcessPoolExecutor(args.parse_workers) if args.parse_workers > 0 else None
+    done = failed = 0
+    try:
+        while True:
+            batch = state.claim(args.worker, CLAIM_BATCH, order=args.order,
+                                start=args.from_index, end=args.to_index)
+            if not batch:
+                break
+            print(f"[{args.worker}] claimed {len(batch)} URLs (idx {batch[0][0]} → {batch[-1][0]})")
+            d, f = asyncio.run(scrape_urls(
+                [url for _, url in batch], output_file=args.output, concurrency=args.concurrency,
+                per_host=args.per_host, rate=args.rate, state=state, pool=pool,
+            ))
+            done += d
+            failed += f
+    finally:
+        if pool:
+            pool.shutdown()
+        state.release(args.worker)
+        print(f"Done. {done} scraped, {failed} failed. State: {state.summary()}")
+        metrics.count("articles_written", done)
+        metrics.count("urls_failed", failed)
+        report = metrics.write_report(os.path.dirname(os.path.abspath(args.output)), "lbc_articles",
+                                      worker=args.worker)
+        print(f"Run report: {report}")
+        state.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,26 @@ from bs4 import BeautifulSoup
 import time
 import json
 import os
+import sys
+import asyncio
+import argparse
+from urllib.parse import urlencode
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(parent_dir)
+
+from fetcher import fetch_iter
 
 BASE_URL = "https://www.lbcgroup.tv/Website/DynamicPages/LoadMore/Loadmore_LatestNews.aspx"
 
-def fetch_page(loadindex: int):
-    """Fetch one page of article HTML blocks using the LBC AJAX endpoint."""
-    params = {
+WINDOW = 8          # pages fetched concurrently per round
+RATE = 4.0          # requests / second to lbcgroup.tv
+START_PAGE = 1      # loadindex=1 is the newest page
+RETRY_ROUNDS = 2    # passes over pages that still failed during the walk
+
+
+def page_params(loadindex: int):
+    return {
         "loadindex": loadindex,
         "lang": "en",
         "rnd": 1720,             # can be any number, avoids caching
@@ -16,8 +30,15 @@ def fetch_page(loadindex: int):
         "rownumber": 8
     }
 
+
+def page_url(loadindex: int):
+    return f"{BASE_URL}?{urlencode(page_params(loadindex))}"
+
+
+def fetch_page(loadindex: int):
+    """Fetch one page of article HTML blocks using the LBC AJAX endpoint."""
     try:
-        r = requests.get(BASE_URL, params=params, timeout=10)
+        r = requests.get(BASE_URL, params=page_params(loadindex), timeout=10)
         if r.status_code == 200:
             return r.text.strip()
         else:
@@ -55,69 +76,146 @@ def load_existing_urls():
 
     with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
         return set(line.strip() for line in f if line.strip())
-    
-def save_new_url(url):
-    """Append a new URL to the file."""
+
+def save_new_urls(urls):
+    """Append a batch of new URLs to the file in one write."""
+    if not urls:
+        return
     with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
-        f.write(url + "\n")
-    
-def scrape_all_article_urls(max_pages=2000):
-    """Loop through paginated endpoint until no more articles appear."""
-    existing_urls = load_existing_urls()
-    all_urls = set()
-    page = 1843
-
-    while True:
-        print(f"[+] Fetching loadindex={page} ...")
-        html = fetch_page(page)
-        #print(html)
-        with open("lbc_html.json", "w", encoding="utf-8") as f:
-            f.write(html)
-        # Stop if empty/no more results
-        if not html or len(html) < 30:
-            print("[DONE] Reached the end of pagination.")
+        f.write("".join(u + "\n" for u in urls))
+
+
+async def fetch_window(pages, rate):
+    """Fetch a window of pages concurrently; returns {page: html}."""
+    by_url = {page_url(p): p for p in pages}
+    html = {}
+    async for result in fetch_iter(list(by_url), concurrency=len(pages), per_host=len(pages),
+                                   rate=rate, burst=len(pages)):
+        page = by_url[result["url"]]
+        if result["error"]:
+            print(f"[!] Failed on loadindex={page}, {result['error']}")
+            html[page] = None
+        else:
+            html[page] = (result["text"] or "").strip()
+    return html
+
+
+def retry_failed_pages(failed, existing_urls, window=WINDOW, rate=RATE, rounds=RETRY_ROUNDS):
+    """
+    Fetch listing pages that failed during the walk again, `window` at a
+    time, for up to `rounds` passes. New URLs are saved and added to
+    `existing_urls`. Returns (new URLs, pages that still failed).
+    """
+    found = []
+    for _ in range(rounds):
+        if not failed:
             break
-
-        # Extract URLs from page
-        urls = extract_article_urls(html)
-
-        if not urls:
-            print("[STOP] No URLs found on this page → stopping.")
+        print(f"[+] Retrying {len(failed)} failed page(s) ...")
+        still_failed = []
+        for start in range(0, len(failed), window):
+            pages = failed[start:start + window]
+            html_by_page = asyncio.run(fetch_window(pages, rate))
+            new = []
+            for p in pages:
+                html = html_by_page.get(p)
+                if html is None:
+                    still_failed.append(p)
+                    continue
+                urls = extract_article_urls(html) if len(html) >= 30 else []
+                page_new = [u for u in dict.fromkeys(urls) if u not in existing_urls]
+                existing_urls.update(page_new)
+                new.extend(page_new)
+                print(f"    page {p}: {len(urls)} URLs, {len(page_new)} new")
+            save_new_urls(new)
+            found.extend(new)
+        failed = still_failed
+    return found, failed
+
+
+def scrape_all_article_urls(start_page=START_PAGE, max_pages=2000, incremental=False,
+                            window=WINDOW, rate=RATE):
+    """
+    Walk the paginated endpoint `window` pages at a time until pagination
+    ends. In incremental mode, stop at the first page whose URLs are all
+    already known — daily top-ups then only touch the newest pages.
+    Pages that still fail after the fetcher's retries are fetched again at
+    the end; any left are reported. Returns the list of newly discovered
+    URLs.
+    """
+    existing_urls = load_existing_urls()
+    all_urls = []
+    failed = []
+    page = start_page
+
+    while page < max_pages:
+        pages = list(range(page, min(page + window, max_pages)))
+        print(f"[+] Fetching loadindex={pages[0]}..{pages[-1]} ...")
+        html_by_page = asyncio.run(fetch_window(pages, rate))
+
+        stop = False
+        window_new = []
+        # Process in page order so stop conditions and output order match a serial walk.
+        for p in pages:
+            html = html_by_page.get(p)
+            if html is None:
+                # Transient failure after retries: don't mistake it for the
+                # end, and come back to it once the walk is done.
+                failed.append(p)
+                continue
+
+            # Stop if empty/no more results
+            if len(html) < 30:
+                print(f"[DONE] Reached the end of pagination (page = {p}).")
+                stop = True
+                break
+
+            urls = extract_article_urls(html)
+            if not urls:
+                print(f"[STOP] No URLs found on page {p} → stopping.")
+                stop = True
+                break
+
+            new = [u for u in dict.fromkeys(urls) if u not in existing_urls]
+            existing_urls.update(new)
+            window_new.extend(new)
+            print(f"    page {p}: {len(urls)} URLs, {len(new)} new")
+
+            if incremental and not new:
+                print(f"[STOP] Page {p} is fully known → incremental update complete.")
+                stop = True
+                break
+
+        save_new_urls(window_new)
+        all_urls.extend(window_new)
+
+        if stop:
             break
+        page += window
+    else:
+        print("[WARNING] Max pages reached, stopping.")
 
-        print(f"    Found {len(urls)} URLs")
-
-        # Add to set to avoid duplicates
-        for u in urls:
-            if u not in existing_urls:
-                existing_urls.add(u)
-                save_new_url(u)
-                print(f"    [+] NEW: {u} (page = {page})")
-            else:
-                print(f"    [-] Already saved: {u} (page = {page})")
-        # for u in urls:
-        #     all_urls.add(u)
+    found, failed = retry_failed_pages(failed, existing_urls, window, rate)
+    all_urls.extend(found)
+    if failed:
+        print(f"[!] {len(failed)} page(s) still failing, their URLs were not collected: "
+              f"{', '.join(map(str, failed))}")
 
-        page += 1
-        time.sleep(0.5)  # stay polite and avoid rate limits
-
-        if page >= max_pages:
-            print("[WARNING] Max pages reached, stopping.")
-            break
-        
-        # if page == 20:
-        #     break
-
-    return list(all_urls)
+    return all_urls
 
 
 if __name__ == "__main__":
-    urls = scrape_all_article_urls()
-
-    print(f"\nTotal unique articles found: {len(urls)}")
-
-    # Save to JSON
-    # with open("lbc_article_urls.json", "w", encoding="utf-8") as f:
-    #     json.dump(urls, f, ensure_ascii=False, indent=2)
-
-    print("Saved to lbc_article_urls.json")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Discover LBC article URLs")
+    parser.add_argument("--incremental", action="store_true",
+                        help="start from the newest page and stop at the first fully-known page")
+    parser.add_argument("--start-page", type=int, default=START_PAGE)
+    parser.add_argument("--max-pages", type=int, default=2000)
+    parser.add_argument("--window", type=int, default=WINDOW, help="pages fetched concurrently")
+    parser.add_argument("--rate", type=float, default=RATE, help="requests/second")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    urls = scrape_all_article_urls(args.start_page, args.max_pages, args.incremental,
+                                   args.window, args.rate)
+
+    print(f"\nTotal new articles found: {len(urls)} in {time.monotonic() - started:.1f}s")
+    print(f"Saved to {OUTPUT_FILE}")
@@ -0,0 +1,127 @@
+# -----------------------------
+# LBC PARSER BENCHMARK
+# -----------------------------
+# Compares the fast parse path (lxml + article-only subtrees) with the
+# original full html.parser tree on LBC article pages:
+#   - every record must serialize to the same bytes
+#   - reports pages/sec for both paths and for the process pool
+#
+# fixtures/ ships a few synthetic pages laid out like LBC's ASP.NET article
+# template, with placeholder lbc.example URLs. Their .LongDesc bodies carry
+# editor-style markup the two parsers tree differently (stray </br>,
+# unclosed <p>). They are a smoke test and a timing baseline, not proof of
+# equivalence: tests/test_lbc_parse.py also checks hand-written and random
+# stray/misnested markup. Run offline:
+#   python parse_benchmark.py
+# Add real pages from the URL file (fetches the live site):
+#   python parse_benchmark.py --record 50
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from lbcArticleScraper import URL_FILE, PARSE_WORKERS, parse_lbc_article
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BASE_DIR, "fixtures")
+SCRAPED_AT = "2000-01-01T00:00:00Z"   # fixed so records are comparable
+
+
+def record_fixtures(n, url_file=URL_FILE, fixture_dir=FIXTURE_DIR):
+    """Save the first `n` article pages of the URL file as <sha1>.html + index.json."""
+    os.makedirs(fixture_dir, exist_ok=True)
+    index_path = os.path.join(fixture_dir, "index.json")
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+
+    with open(url_file, "r", encoding="utf-8") as f:
+        urls = [line.strip() for line in f if line.strip()][:n]
+
+    with requests.Session() as session:
+        for url in urls:
+            name = hashlib.sha1(url.encode("utf-8")).hexdigest() + ".html"
+            if name in index:
+                continue
+            r = session.get(url, timeout=15)
+            if r.status_code != 200:
+                print(f"[!] {url}: HTTP {r.status_code}")
+                continue
+            with open(os.path.join(fixture_dir, name), "w", encoding="utf-8") as f:
+                f.write(r.text)
+            index[name] = url
+            time.sleep(0.2)
+
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    print(f"{len(index)} fixtures in {fixture_dir}")
+
+
+def load_fixtures(fixture_dir=FIXTURE_DIR):
+    """[(url, html)] for every page in the fixture directory."""
+    with open(os.path.join(fixture_dir, "index.json"), "r", encoding="utf-8") as f:
+        index = json.load(f)
+    pages = []
+    for name, url in sorted(index.items()):
+        with open(os.path.join(fixture_dir, name), "r", encoding="utf-8") as f:
+            pages.append((url, f.read()))
+    return pages
+
+
+def _serialize(html, url, fast):
+    return json.dumps(parse_lbc_article(html, url, SCRAPED_AT, fast=fast), ensure_ascii=False)
+
+
+def _fast_job(page):
+    return _serialize(page[1], page[0], True)
+
+
+def run(pages, workers=PARSE_WORKERS, repeat=3):
+    def timed(fn):
+        best, out = None, None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            out = fn()
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        return out, best
+
+    reference, t_ref = timed(lambda: [_serialize(h, u, False) for u, h in pages])
+    fast, t_fast = timed(lambda: [_serialize(h, u, True) for u, h in pages])
+    with ProcessPoolExecutor(workers) as pool:
+        list(pool.map(_fast_job, pages[:workers]))   # start workers outside the timing
+        pooled, t_pool = timed(lambda: list(pool.map(_fast_job, pages, chunksize=4)))
+
+    mismatches = [u for (u, _), a, b, c in zip(pages, reference, fast, pooled) if not a == b == c]
+    n = len(pages)
+    print(f"{n} pages, {sum(len(h) for _, h in pages) / 1e6:.1f} MB")
+    print(f"html.parser full tree: {n / t_ref:8.1f} pages/sec")
+    print(f"lxml article subtrees: {n / t_fast:8.1f} pages/sec  (x{t_ref / t_fast:.1f})")
+    print(f"  + {workers} processes:     {n / t_pool:8.1f} pages/sec  (x{t_ref / t_pool:.1f})")
+    print(f"byte-identical records: {n - len(mismatches)}/{n}")
+    for url in mismatches[:5]:
+        print(f"  differs: {url}")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LBC parse-path benchmark on fixture pages")
+    parser.add_argument("--record", type=int, metavar="N", help="fetch and save N pages first")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--workers", type=int, default=PARSE_WORKERS)
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.record, fixture_dir=args.fixtures)
+    if not os.path.exists(os.path.join(args.fixtures, "index.json")):
+        print(f"No fixtures in {args.fixtures}; run with --record N first.")
+        sys.exit(2)
+    sys.exit(0 if run(load_fixtures(args.fixtures), args.workers) else 1)
@@ -2,40 +2,207 @@ import requests
 import json
 import os
 import sys
+import time
+import argparse
 from datetime import datetime
 
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(parent_dir)
+sys.path.append(os.path.join(parent_dir, "..", "backend"))
 
 from cleaning import clean_text, clean_url
+from instrumentation import metrics
 
-url = "https://www.mtv.com.lb/en/api/articles?start=0&end=102000&type="
-response = requests.get(url)
-data = response.json()
+# -----------------------------
+# CONFIG
+# -----------------------------
+# The articles API is paged with start/end offsets, newest first.
+API_URL = "https://www.mtv.com.lb/en/api/articles"
+CHUNK_SIZE = 500          # articles per API call (bounds peak memory)
+MAX_ARTICLES = 102000     # safety cap on offsets walked in one run
+RETRIES = 3
 
 # Output path
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 out_path = os.path.join(BASE_DIR, "../../data/mtv_articles.jsonl")
+state_path = os.path.join(BASE_DIR, "../../data/mtv_ingest_state.json")
 
-scraped_at = datetime.utcnow().isoformat() + "Z"
-    
-with open(out_path, "w", encoding="utf-8") as f:
-    for item in data:
-        article_entry = {
-            "source": "MTV",
-            "url": "https://www.mtv.com.lb" + item.get("Url", ""),
-            "title": item.get("title"),
-            "text": clean_text(item.get("Text")),
-            "section": item.get("articletype"),
-            "image_url": item.get("MediaUrl"),
-            "author": None,
-            "published_at": item.get("publishDate") + "Z",
-            "scraped_at": scraped_at
-        } 
-
-        # Write ONE json object per line
-        f.write(json.dumps(article_entry, ensure_ascii=False) + "\n")
-        
-
-
-print(f"Saved {len(data)} records to {out_path}")
\ No newline at end of file
+
+# -----------------------------
+# STATE
+# -----------------------------
+# {"watermark":      newest publishDate of the last completed run,
+#  "watermark_urls": URLs already ingested at exactly that publishDate,
+#  "pending":        progress of an interrupted run, or absent}
+def load_state():
+    if os.path.exists(state_path):
+        with open(state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    # First run with the state file: derive the watermark from an existing
+    # full dump so we don't re-ingest everything.
+    state = {"watermark": None, "watermark_urls": []}
+    if os.path.exists(out_path):
+        with open(out_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                published = (record.get("published_at") or "").rstrip("Z")
+                if not published or (state["watermark"] and published < state["watermark"]):
+                    continue
+                if published != state["watermark"]:
+                    state["watermark"], state["watermark_urls"] = published, []
+                state["watermark_urls"].append(record.get("url"))
+    return state
+
+
+def save_state(state):
+    tmp = state_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, state_path)
+
+
+# -----------------------------
+# FETCH
+# -----------------------------
+def fetch_chunk(session, start, end):
+    """One window of the articles API, with retry/backoff."""
+    for attempt in range(RETRIES + 1):
+        try:
+            r = session.get(API_URL, params={"start": start, "end": end, "type": ""}, timeout=60)
+            r.raise_for_status()
+            return r.json()
+        except (requests.RequestException, ValueError) as e:
+            if attempt == RETRIES:
+                raise
+            print(f"[!] start={start} failed ({e}), retrying...")
+            time.sleep(2 ** attempt)
+
+
+def to_record(item, scraped_at):
+    return {
+        "source": "MTV",
+        "url": "https://www.mtv.com.lb" + item.get("Url", ""),
+        "title": item.get("title"),
+        "text": clean_text(item.get("Text")),
+        "section": item.get("articletype"),
+        "image_url": item.get("MediaUrl"),
+        "author": None,
+        "published_at": item.get("publishDate") + "Z",
+        "scraped_at": scraped_at
+    }
+
+
+# -----------------------------
+# INGEST
+# -----------------------------
+def ingest(chunk_size=CHUNK_SIZE, max_articles=MAX_ARTICLES):
+    """
+    Page through the API newest-first and append only articles newer than
+    the watermark. Progress is checkpointed after every chunk, so an
+    interrupted run resumes at the same offset without duplicating lines.
+    """
+    state = load_state()
+    pending = state.get("pending") or {
+        "next_start": 0,
+        "floor": state.get("watermark"),   # stop once we reach this date
+        # URLs already ingested at the floor date (None for state files
+        # written before they were recorded: then the whole date is known).
+        "floor_urls": state.get("watermark_urls"),
+        "run_max": None,                    # newest date seen this run
+        "max_urls": [],                     # URLs written at run_max
+        "low_date": None,                   # oldest date written this run
+        "low_urls": [],                     # URLs written at low_date
+        "file_size": None                   # output size at the last checkpoint
+    }
+    # After a resume, offsets may have shifted by newly published articles;
+    # skip anything the interrupted run already wrote.
+    resume_low, resume_urls = None, set()
+    floor_urls = None if pending.get("floor_urls") is None else set(pending["floor_urls"])
+    pending.setdefault("max_urls", [])
+    if state.get("pending"):
+        resume_low, resume_urls = pending["low_date"], set(pending["low_urls"])
+        # Drop lines written after the last checkpoint; that chunk is refetched.
+        if pending.get("file_size") is not None and os.path.getsize(out_path) > pending["file_size"]:
+            with open(out_path, "r+b") as f:
+                f.truncate(pending["file_size"])
+        print(f"Resuming interrupted run at offset {pending['next_start']}.")
+    print(f"Ingesting MTV articles newer than {pending['floor'] or 'the beginning'}.")
+
+    scraped_at = datetime.utcnow().isoformat() + "Z"
+    written = 0
+    start = pending["next_start"]
+
+    with requests.Session() as session, open(out_path, "a", encoding="utf-8") as f:
+        while start < max_articles:
+            with metrics.stage("fetch"):
+                data = fetch_chunk(session, start, start + chunk_size)
+            if not data:
+                break
+
+            reached_floor = False
+            chunk_started, chunk_written = time.perf_counter(), written
+            for item in data:
+                published = item.get("publishDate") or ""
+                url = "https://www.mtv.com.lb" + item.get("Url", "")
+                if pending["floor"] and published <= pending["floor"]:
+                    # Newest first: anything older ends the walk. Articles
+                    # sharing the floor's second are new unless already
+                    # ingested; more of them may follow in the next chunk.
+                    if published < pending["floor"] or floor_urls is None:
+                        reached_floor = True
+                        continue
+                    if url in floor_urls:
+                        continue
+                if resume_low and (published > resume_low or (published == resume_low and url in resume_urls)):
+                    continue
+
+                # Write ONE json object per line
+                f.write(json.dumps(to_record(item, scraped_at), ensure_ascii=False) + "\n")
+                written += 1
+
+                if pending["run_max"] is None or published > pending["run_max"]:
+                    pending["run_max"], pending["max_urls"] = published, []
+                if published == pending["run_max"]:
+                    pending["max_urls"].append(url)
+                if pending["low_date"] != published:
+                    pending["low_date"], pending["low_urls"] = published, []
+                pending["low_urls"].append(url)
+
+            # Record building is mostly clean_text over the HTML body.
+            metrics.record("clean", time.perf_counter() - chunk_started, written - chunk_written)
+            f.flush()
+            os.fsync(f.fileno())
+            start += chunk_size
+            pending["next_start"] = start
+            pending["file_size"] = f.tell()
+            state["pending"] = pending
+            save_state(state)
+            print(f"  offset {start}: {written} new records so far")
+
+            if reached_floor or len(data) < chunk_size:
+                break
+
+    old_mark, run_max = state.get("watermark"), pending["run_max"]
+    if run_max and (old_mark is None or run_max > old_mark):
+        state["watermark"], state["watermark_urls"] = run_max, pending["max_urls"]
+    elif run_max and run_max == old_mark:
+        state["watermark_urls"] = (state.get("watermark_urls") or []) + pending["max_urls"]
+    state.pop("pending", None)
+    save_state(state)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental MTV article ingester")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--max-articles", type=int, default=MAX_ARTICLES)
+    args = parser.parse_args()
+
+    written = ingest(args.chunk_size, args.max_articles)
+    metrics.count("articles_written", written)
+    print(f"Saved {written} new records to {out_path}")
+    print(f"Run report: {metrics.write_report(os.path.dirname(os.path.abspath(out_path)), 'mtv_articles')}")
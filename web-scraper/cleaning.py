@@ -1,16 +1,158 @@
 # -----------------------------
 # CLEANING HELPERS
 # -----------------------------
-import re 
-from bs4 import BeautifulSoup
+# clean_text() is called on every MTV record and every LBC field, so it
+# avoids building a BeautifulSoup tree per string:
+#   - plain text (no "<" or "&") skips markup handling entirely
+#   - markup is stripped with one compiled tokenizer + html.unescape
+#   - zero-width / control / nbsp / quote mappings are one str.translate
+# Inputs the tokenizer can't reproduce exactly (CDATA, malformed entities,
+# "</>", <template>) fall back to BeautifulSoup, as does strict=True.
+# `python cleaning.py FILE...` checks both paths give identical output.
+import re
+import html
+from html.entities import html5
 
-def clean_text(text):
+# Zero-width / bidi marks are dropped, nbsp and control characters become
+# spaces, typographic quotes become ASCII. Stored as a list indexed by code
+# point (characters past its end are left alone), which str.translate
+# looks up faster than a dict.
+_MAPPING = {
+    **{c: None for c in range(0x200B, 0x2010)},
+    **{c: None for c in range(0x202A, 0x202F)},
+    **{c: " " for c in range(0x20)},
+    0x7F: " ",
+    0xA0: " ",
+    **{ord(k): v for k, v in {"’": "'", "‘": "'", "‚": "'", "“": '"', "”": '"', "„": '"'}.items()},
+}
+_TRANSLATE = [_MAPPING.get(c, c) for c in range(max(_MAPPING) + 1)]
+
+# Everything html.parser turns into a node boundary or drops: comments,
+# script/style bodies, declarations, processing instructions and tags
+# (quoted attribute values may contain ">").
+_MARKUP = re.compile(
+    r"<!--.*?-->"
+    r"|<(script|style)\b[^>]*>.*?</\1\s*>"
+    r"|<![^>]*>"
+    r"|<\?[^>]*>"
+    r"|</?[a-zA-Z][^\t\n\r\f />\x00<]*(?:[^>\"'<\x00]|\"[^\"]*\"|'[^']*')*>",
+    re.S | re.I
+)
+# Constructs where BeautifulSoup's output differs from the tokenizer's.
+_NEEDS_PARSER = re.compile(r"<!\[|</>|<template|<!--(?!.*-->)", re.S | re.I)
+# html.parser (through bs4) closes a void element at its start tag, then
+# swallows one later end tag of the same name per "<br>"-style start tag:
+# "a</br>b" reads "a b" but "<br>a</br>b" reads "ab". Only inputs with such
+# an end tag need the tag-by-tag replacement below.
+_VOID = frozenset({
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image", "img",
+    "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source", "spacer", "track",
+    "wbr",
+})
+_VOID_END = re.compile(r"</(?:%s)\b" % "|".join(sorted(_VOID, key=len, reverse=True)), re.I)
+_TAG_NAME = re.compile(r"<(/?)([^\t\n\r\f />\x00<]*)")
+# Anything still looking like markup after tokenizing is malformed.
+_LEFTOVER = re.compile(r"<[a-zA-Z/!?]")
+_ENTITY = re.compile(r"&(?:#[0-9]+;|#[xX][0-9a-fA-F]+;|([a-zA-Z][a-zA-Z0-9]*;))?")
+
+_SPACES = re.compile(r" {2,}")
+_WHITESPACE = re.compile(r"\s+")
+_URLS = re.compile(r"http\S+")
+
+
+def _entities_ok(text):
+    """Every "&" starts a complete, known character reference."""
+    for m in _ENTITY.finditer(text):
+        if m.end() == m.start() + 1:
+            return False
+        name = m.group(1)
+        if name and name not in html5:
+            return False
+    return True
+
+
+def _strip_tags(text):
+    """_MARKUP.sub(" ", text), except for end tags html.parser swallows."""
+    if not _VOID_END.search(text):
+        return _MARKUP.sub(" ", text)
+    unclosed = []
+
+    def gap(m):
+        tag = m.group(0)
+        closing, name = _TAG_NAME.match(tag).groups()
+        name = name.lower()
+        if name in _VOID:
+            if not closing and not tag.endswith("/>"):
+                unclosed.append(name)
+            elif closing and name in unclosed:
+                unclosed.remove(name)
+                return ""
+        return " "
+
+    return _MARKUP.sub(gap, text)
+
+
+def _soup_text(text):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(text, "html.parser").get_text(separator=" ")
+
+
+def strip_markup(text, strict=False):
+    """Visible text of an HTML fragment, with entities decoded and a space
+    wherever a tag separated two pieces of text."""
+    if strict:
+        return _soup_text(text)
+    if "<" not in text and "&" not in text:
+        return text
+    if _NEEDS_PARSER.search(text):
+        return _soup_text(text)
+    stripped = _strip_tags(text)
+    if _LEFTOVER.search(stripped):
+        return _soup_text(text)
+    if "&" in stripped:
+        if not _entities_ok(stripped):
+            return _soup_text(text)
+        stripped = html.unescape(stripped)
+    return stripped
+
+
+def clean_text(text, strip_urls=False, strict=False):
     if not text:
         return ""
 
-    # Parse HTML and extract visible text
-    soup = BeautifulSoup(text, "html.parser")
-    text = soup.get_text(separator=" ")
+    text = strip_markup(text, strict).translate(_TRANSLATE)
+    if strip_urls:
+        text = _WHITESPACE.sub(" ", _URLS.sub("", text))
+    elif "  " in text:
+        # Newlines were mapped to spaces above, so only runs of spaces remain.
+        text = _SPACES.sub(" ", text)
+    return text.strip()
+
+
+def clean_texts(texts, strip_urls=False, strict=False):
+    """clean_text over an iterable, lazily."""
+    for text in texts:
+        yield clean_text(text, strip_urls, strict)
+
+
+def clean_url(url):
+    if not url:
+        return None
+    url = url.strip()
+    url = re.sub(r"[\u200B-\u200F\u202A-\u202E]", "", url)
+    url = url.replace("\xa0", "")
+    return url
+
+
+# -----------------------------
+# EQUIVALENCE BENCHMARK
+# -----------------------------
+def reference_clean_text(text):
+    """The original BeautifulSoup-per-call implementation, for comparison."""
+    if not text:
+        return ""
+
+    text = _soup_text(text)
 
     text = re.sub(r"[\u200B-\u200F\u202A-\u202E]", "", text)
     text = text.replace("\xa0", " ")
@@ -29,10 +171,48 @@ def clean_text(text):
     return text.strip()
 
 
-def clean_url(url):
-    if not url:
-        return None
-    url = url.strip()
-    url = re.sub(r"[\u200B-\u200F\u202A-\u202E]", "", url)
-    url = url.replace("\xa0", "")
-    return url
\ No newline at end of file
+def _corpus_strings(paths):
+    """Text fields of JSON/JSONL records, or whole files for anything else."""
+    import json
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = f.read()
+        if path.endswith((".jsonl", ".json")):
+            try:
+                records = [json.loads(line) for line in raw.splitlines() if line.strip()] \
+                    if path.endswith(".jsonl") else json.loads(raw)
+            except ValueError:
+                records = None
+            if isinstance(records, list):
+                for r in records:
+                    if isinstance(r, dict):
+                        yield from (v for v in r.values() if isinstance(v, str))
+                continue
+        yield raw
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import warnings
+
+    warnings.filterwarnings("ignore", module="bs4")
+    if len(sys.argv) < 2:
+        print("usage: python cleaning.py FILE [FILE ...]   (JSON/JSONL records or HTML)")
+        sys.exit(2)
+
+    corpus = list(_corpus_strings(sys.argv[1:]))
+    t0 = time.perf_counter()
+    expected = [reference_clean_text(s) for s in corpus]
+    t1 = time.perf_counter()
+    got = list(clean_texts(corpus))
+    t2 = time.perf_counter()
+
+    mismatches = [i for i, (a, b) in enumerate(zip(expected, got)) if a != b]
+    print(f"{len(corpus)} strings, {sum(map(len, corpus)) / 1e6:.1f} MB")
+    print(f"BeautifulSoup: {t1 - t0:.3f}s   fast: {t2 - t1:.3f}s   "
+          f"speedup x{(t1 - t0) / max(t2 - t1, 1e-9):.1f}")
+    print(f"identical output: {len(corpus) - len(mismatches)}/{len(corpus)}")
+    for i in mismatches[:5]:
+        print(f"  differs: {corpus[i][:80]!r}\n    bs4:  {expected[i][:80]!r}\n    fast: {got[i][:80]!r}")
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,174 @@
+# -----------------------------
+# PERSISTENT CRAWL STATE
+# -----------------------------
+# SQLite-backed status per URL (pending / claimed / fetched / failed) so a
+# crawl resumes instantly without hand-edited start indexes or re-reading
+# the output JSONL. Several workers (threads or processes) can share one
+# database: claim() hands out disjoint batches inside a write transaction,
+# and claims from a crashed worker expire after `lease` seconds.
+import os
+import json
+import time
+import socket
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    idx        INTEGER PRIMARY KEY,   -- 1-based position in the URL file
+    url        TEXT NOT NULL UNIQUE,
+    status     TEXT NOT NULL DEFAULT 'pending',
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    worker     TEXT,
+    claimed_at REAL,
+    updated_at REAL,
+    error      TEXT
+);
+CREATE INDEX IF NOT EXISTS urls_status_idx ON urls (status, idx);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+LEASE_SECONDS = 600
+MAX_ATTEMPTS = 3
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class CrawlState:
+    def __init__(self, path, lease=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    # -----------------------------
+    # META
+    # -----------------------------
+    def _get_meta(self, key):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # -----------------------------
+    # SEEDING
+    # -----------------------------
+    def seed_from_file(self, url_file):
+        """Register every URL of the (append-only) URL file. Skipped when
+        the file hasn't changed since the last seed."""
+        st = os.stat(url_file)
+        signature = f"{st.st_size}:{st.st_mtime_ns}"
+        if self._get_meta(f"seeded:{url_file}") == signature:
+            return 0
+
+        with open(url_file, "r", encoding="utf-8") as f:
+            urls = [line.strip() for line in f if line.strip()]
+
+        before = self.count()
+        self.db.execute("BEGIN IMMEDIATE")
+        self.db.executemany(
+            "INSERT OR IGNORE INTO urls (idx, url) VALUES (?, ?)",
+            ((i, u) for i, u in enumerate(urls, start=1))
+        )
+        self._set_meta(f"seeded:{url_file}", signature)
+        self.db.execute("COMMIT")
+        return self.count() - before
+
+    def import_fetched_jsonl(self, jsonl_path):
+        """One-time migration: mark URLs already present in an output JSONL
+        (from runs before the state DB existed) as fetched."""
+        if self._get_meta(f"imported:{jsonl_path}") or not os.path.exists(jsonl_path):
+            return 0
+
+        urls = []
+        with open(jsonl_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    u = json.loads(line).get("url")
+                except ValueError:
+                    continue
+                if u:
+                    urls.append((time.time(), u))
+
+        self.db.execute("BEGIN IMMEDIATE")
+        cur = self.db.executemany(
+            "UPDATE urls SET status = 'fetched', updated_at = ? WHERE url = ?", urls
+        )
+        self._set_meta(f"imported:{jsonl_path}", "1")
+        self.db.execute("COMMIT")
+        return cur.rowcount
+
+    # -----------------------------
+    # CLAIMING
+    # -----------------------------
+    def claim(self, worker, limit=200, order="asc", start=None, end=None):
+        """Atomically claim up to `limit` URLs for `worker`: pending ones,
+        retryable failures, and claims whose lease expired. Returns
+        [(idx, url)] in the requested order."""
+        now = time.time()
+        direction = "DESC" if order == "desc" else "ASC"
+        where = ["(status = 'pending'"
+                 " OR (status = 'failed' AND attempts < ?)"
+                 " OR (status = 'claimed' AND claimed_at < ?))"]
+        params = [self.max_attempts, now - self.lease]
+        if start is not None:
+            where.append("idx >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("idx <= ?")
+            params.append(end)
+
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.db.execute(
+                f"SELECT idx, url FROM urls WHERE {' AND '.join(where)} "
+                f"ORDER BY idx {direction} LIMIT ?",
+                params + [limit]
+            ).fetchall()
+            self.db.executemany(
+                "UPDATE urls SET status = 'claimed', worker = ?, claimed_at = ? WHERE idx = ?",
+                ((worker, now, idx) for idx, _ in rows)
+            )
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        return rows
+
+    # -----------------------------
+    # RESULTS
+    # -----------------------------
+    def mark_fetched(self, url):
+        self.db.execute(
+            "UPDATE urls SET status = 'fetched', attempts = attempts + 1, error = NULL, "
+            "updated_at = ? WHERE url = ?", (time.time(), url)
+        )
+
+    def mark_failed(self, url, error):
+        self.db.execute(
+            "UPDATE urls SET status = 'failed', attempts = attempts + 1, error = ?, "
+            "updated_at = ? WHERE url = ?", (str(error)[:500], time.time(), url)
+        )
+
+    def release(self, worker):
+        """Return a worker's unfinished claims to the pending pool."""
+        self.db.execute(
+            "UPDATE urls SET status = 'pending', worker = NULL WHERE status = 'claimed' AND worker = ?",
+            (worker,)
+        )
+
+    def count(self, status=None):
+        if status is None:
+            return self.db.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+        return self.db.execute("SELECT COUNT(*) FROM urls WHERE status = ?", (status,)).fetchone()[0]
+
+    def summary(self):
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM urls GROUP BY status").fetchall())
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,120 @@
+# -----------------------------
+# CONCURRENT FETCH ENGINE
+# -----------------------------
+# Shared asyncio HTTP fetcher for the scrapers:
+#   - one pooled aiohttp session (keep-alive, DNS cache)
+#   - global + per-host connection caps
+#   - per-host token-bucket rate limit
+#   - retry with exponential backoff on 5xx / 429 / timeouts / connection errors
+#
+# Results are yielded in completion order as plain dicts:
+#   {"url", "status", "text", "error", "attempts", "elapsed"}
+import time
+import random
+import asyncio
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import aiohttp
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; VeritasBot/0.1; +https://github.com/sabaronnie/Veritas)"
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests/second with bursts up to `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+async def fetch_one(session, url, bucket, retries=3, backoff=1.0, params=None):
+    """Fetch a single URL with rate limiting and retries. Never raises."""
+    started = time.monotonic()
+    result = {"url": url, "status": None, "text": None, "error": None, "attempts": 0, "elapsed": 0.0}
+
+    for attempt in range(retries + 1):
+        result["attempts"] = attempt + 1
+        await bucket.acquire()
+        retry_after = None
+        try:
+            async with session.get(url, params=params) as r:
+                result["status"] = r.status
+                if r.status in RETRY_STATUSES:
+                    result["error"] = f"HTTP {r.status}"
+                    retry_after = r.headers.get("Retry-After")
+                else:
+                    result["text"] = await r.text(errors="replace")
+                    result["error"] = None if r.status < 400 else f"HTTP {r.status}"
+                    break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+
+        if attempt < retries:
+            delay = backoff * (2 ** attempt) + random.uniform(0, backoff)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            await asyncio.sleep(delay)
+
+    result["elapsed"] = time.monotonic() - started
+    return result
+
+
+async def fetch_iter(urls, concurrency=16, per_host=8, rate=5.0, burst=5,
+                     retries=3, backoff=1.0, timeout=15, params=None, headers=None):
+    """
+    Fetch every URL in `urls` concurrently and yield result dicts as they
+    complete. `rate`/`burst` apply per host; `per_host` caps open
+    connections per host.
+    """
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ttl_dns_cache=300)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    buckets = defaultdict(lambda: TokenBucket(rate, burst))
+    url_iter = iter(urls)
+    results = asyncio.Queue(maxsize=concurrency * 2)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                     headers=headers or DEFAULT_HEADERS) as session:
+
+        async def worker():
+            # next() on a shared iterator is safe: workers only switch at awaits.
+            for url in url_iter:
+                bucket = buckets[urlsplit(url).netloc]
+                await results.put(await fetch_one(session, url, bucket, retries, backoff, params))
+
+        async def run_workers():
+            try:
+                await asyncio.gather(*(worker() for _ in range(concurrency)))
+            finally:
+                await results.put(None)
+
+        runner = asyncio.create_task(run_workers())
+        try:
+            while True:
+                result = await results.get()
+                if result is None:
+                    break
+                yield result
+            await runner
+        finally:
+            if not runner.done():
+                runner.cancel()
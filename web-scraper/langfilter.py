@@ -0,0 +1,154 @@
+# -----------------------------
+# LANGUAGE FILTER
+# -----------------------------
+# Decides which articles are worth keeping, cheapest test first:
+#   1. word count (most rejects never reach a detector)
+#   2. Unicode script ratio on a prefix: mostly-Arabic text is "ar" and
+#      needs no model; Latin text is only sent on when a Latin-script
+#      language is wanted
+#   3. a model-based identifier on a bounded prefix: fastText lid.176
+#      when installed (LID_MODEL), otherwise langdetect with a fixed seed
+# Every path is deterministic. detect_languages()/filter_texts() take a
+# whole batch, so fastText classifies it in one call.
+# `python langfilter.py FILE...` benchmarks against the old full-text check.
+import os
+import re
+
+MIN_WORDS = 100                 # articles need more words than this
+LANGUAGES = ("en",)             # kept by default (what scrape.py always kept)
+PREFIX_CHARS = 2000             # text the model sees
+SCRIPT_SAMPLE = 4000            # text the script test sees
+SCRIPT_RATIO = 0.6              # share of letters that decides the script
+ARABIC_LANGUAGES = {"ar", "fa", "ur"}
+LID_MODEL = os.environ.get(
+    "VERITAS_LID_MODEL",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "models", "lid.176.ftz")
+)
+
+_ARABIC = re.compile(r"[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]")
+_LATIN = re.compile(r"[A-Za-z\u00C0-\u024F]")
+_WHITESPACE = re.compile(r"\s+")
+
+_detector = None
+
+
+def word_count_ok(text, min_words=MIN_WORDS):
+    return len(text.split()) > min_words
+
+
+def script_of(text):
+    """"arabic", "latin", or None when neither clearly dominates."""
+    sample = text[:SCRIPT_SAMPLE]
+    arabic = len(_ARABIC.findall(sample))
+    latin = len(_LATIN.findall(sample))
+    letters = arabic + latin
+    if not letters:
+        return None
+    if arabic >= SCRIPT_RATIO * letters:
+        return "arabic"
+    if latin >= SCRIPT_RATIO * letters:
+        return "latin"
+    return None
+
+
+def _load_detector():
+    """fastText predict over a list of strings, else seeded langdetect."""
+    global _detector
+    if _detector is None:
+        try:
+            import fasttext
+            model = fasttext.load_model(LID_MODEL) if os.path.exists(LID_MODEL) else None
+        except ImportError:
+            model = None
+
+        if model is not None:
+            def detect(texts):
+                # fastText predicts one line at a time.
+                labels, _ = model.predict([_WHITESPACE.sub(" ", t) for t in texts])
+                return [lab[0].replace("__label__", "") if lab else None for lab in labels]
+        else:
+            from langdetect import DetectorFactory, detect as _detect, LangDetectException
+            DetectorFactory.seed = 0
+
+            def detect(texts):
+                out = []
+                for t in texts:
+                    try:
+                        out.append(_detect(t))
+                    except LangDetectException:
+                        out.append(None)
+                return out
+        _detector = detect
+    return _detector
+
+
+def detect_languages(texts, languages=LANGUAGES, min_words=MIN_WORDS):
+    """
+    Language code per text (None for rejected or undetectable ones).
+    Texts that fail a cheap test never reach the model; a Latin-script
+    text is not identified further unless a non-Arabic language is wanted.
+    """
+    texts = list(texts)
+    result = [None] * len(texts)
+    wants_latin = any(lang not in ARABIC_LANGUAGES for lang in languages)
+    pending = []
+    for i, text in enumerate(texts):
+        if not text or not word_count_ok(text, min_words):
+            continue
+        script = script_of(text)
+        if script == "arabic":
+            result[i] = "ar"
+        elif script is None or wants_latin:
+            pending.append(i)
+    if pending:
+        detected = _load_detector()([texts[i][:PREFIX_CHARS] for i in pending])
+        for i, lang in zip(pending, detected):
+            result[i] = lang
+    return result
+
+
+def filter_texts(texts, languages=LANGUAGES, min_words=MIN_WORDS):
+    """One bool per text: long enough and in one of `languages`."""
+    return [lang in languages for lang in detect_languages(texts, languages, min_words)]
+
+
+def is_valid(text, languages=LANGUAGES, min_words=MIN_WORDS):
+    return filter_texts([text], languages, min_words)[0]
+
+
+# -----------------------------
+# BENCHMARK
+# -----------------------------
+def reference_is_valid(text):
+    """The original scrape.is_valid_article: langdetect over the full text."""
+    from langdetect import detect, LangDetectException
+    try:
+        lang = detect(text)
+        return len(text.split()) > 100 and lang in ["en"]
+    except LangDetectException:
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from cleaning import _corpus_strings
+
+    if len(sys.argv) < 2:
+        print("usage: python langfilter.py FILE [FILE ...]   (JSON/JSONL article records)")
+        sys.exit(2)
+
+    corpus = [s for s in _corpus_strings(sys.argv[1:]) if len(s) > 200]
+    _load_detector()
+    t0 = time.perf_counter()
+    expected = [reference_is_valid(s) for s in corpus]
+    t1 = time.perf_counter()
+    got = filter_texts(corpus)
+    t2 = time.perf_counter()
+
+    agree = sum(a == b for a, b in zip(expected, got))
+    print(f"{len(corpus)} texts, {sum(map(len, corpus)) / 1e6:.1f} MB, {sum(got)} kept")
+    print(f"full-text langdetect: {len(corpus) / max(t1 - t0, 1e-9):8.1f} texts/sec")
+    print(f"staged filter:        {len(corpus) / max(t2 - t1, 1e-9):8.1f} texts/sec  "
+          f"(x{(t1 - t0) / max(t2 - t1, 1e-9):.1f})")
+    print(f"same decision: {agree}/{len(corpus)}")
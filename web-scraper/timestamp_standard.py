@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 # 2025-01-17T13:44:00Z
 def parse_timestamp(raw, source):
@@ -20,5 +21,16 @@ def parse_timestamp(raw, source):
         # Example: "January 17, 2023 10:06 AM"
         return datetime.strptime(raw, "%B %d, %Y %I:%M %p").isoformat() + "Z"
 
+    if source == "RSS":
+        # RSS feeds / newspaper3k: "Fri, 17 Jan 2025 13:44:00 +0200"
+        # or "2025-01-17 13:44:00+02:00"; converted to UTC.
+        try:
+            dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+        except ValueError:
+            dt = parsedate_to_datetime(raw)
+        if dt.tzinfo:
+            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+        return dt.isoformat() + "Z"
+
     # fallback
     return None
\ No newline at end of file